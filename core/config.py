@@ -11,9 +11,47 @@ aws_secret_access_key = os.getenv('AWS_SECRET_ACCESS_KEY')
 region_name=os.getenv('AWS_REGION', 'ap-northeast-2')
 bucket_name=os.getenv('S3_BUCKET')
 
+# Storage Backend (s3 / local / memory), local은 LOCAL_STORAGE_ROOT 아래에 {bucket}/{key}로 저장
+STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 's3')
+LOCAL_STORAGE_ROOT = os.getenv('LOCAL_STORAGE_ROOT', 'data/storage')
+
+# S3 Transfer Settings
+S3_MAX_WORKERS = int(os.getenv('S3_MAX_WORKERS', '8'))
+S3_MULTIPART_THRESHOLD_MB = int(os.getenv('S3_MULTIPART_THRESHOLD_MB', '16'))
+S3_MULTIPART_CHUNKSIZE_MB = int(os.getenv('S3_MULTIPART_CHUNKSIZE_MB', '16'))
+S3_MULTIPART_CONCURRENCY = int(os.getenv('S3_MULTIPART_CONCURRENCY', '4'))
+S3_UPLOAD_COMPRESSION = os.getenv('S3_UPLOAD_COMPRESSION', '')  # '', 'gzip', 'zstd'
+
+# S3 Download Cache Settings (S3_CACHE_DIR를 비우면 캐시 비활성화, TTL 0이면 매번 ETag 확인)
+S3_CACHE_DIR = os.getenv('S3_CACHE_DIR', 'data/.s3cache')
+S3_CACHE_MAX_MB = int(os.getenv('S3_CACHE_MAX_MB', '1024'))
+S3_CACHE_TTL = float(os.getenv('S3_CACHE_TTL', '0'))
+
+# S3 Key Index (prefix별 key 목록 manifest, 비우면 비활성화)
+S3_INDEX_PATH = os.getenv('S3_INDEX_PATH', 'data/.s3index.json')
+# 증분 조회로는 보이지 않는 과거 날짜 key(backfill, 재업로드)를 반영하기 위해 전체 목록을 다시 받는 주기(초, 0이면 안 함)
+S3_INDEX_FULL_REFRESH_SECONDS = float(os.getenv('S3_INDEX_FULL_REFRESH_SECONDS', '86400'))
+
 # TMDB Settings
 TMDB_API_KEY = os.getenv("TMDB_API_KEY")
 TMDB_BASE_URL = "https://api.themoviedb.org/3"
+TMDB_MAX_WORKERS = int(os.getenv("TMDB_MAX_WORKERS", "1"))
+TMDB_REQUESTS_PER_SECOND = float(os.getenv("TMDB_REQUESTS_PER_SECOND", "40"))
+
+# Storage Settings (csv / parquet / arrow)
+RAW_FORMAT = os.getenv("RAW_FORMAT", "csv")
+PROCESSED_FORMAT = os.getenv("PROCESSED_FORMAT", "csv")
+
+# Training Validation Settings (교차 검증 fold 수, 0이면 생략 / kfold 또는 time)
+TRAIN_CV_FOLDS = int(os.getenv("TRAIN_CV_FOLDS", "5"))
+TRAIN_CV_METHOD = os.getenv("TRAIN_CV_METHOD", "kfold")
+
+# Model Artifact Format (joblib: joblib compress=3, mmap: .pkl과 함께 메모리 매핑 아티팩트 .mlmodel도 저장)
+MODEL_FORMAT = os.getenv("MODEL_FORMAT", "joblib")
+
+# Prometheus Metrics (batch 실행 시 지표 파일 경로 / /metrics HTTP 포트, 비우면 비활성화)
+METRICS_TEXTFILE = os.getenv("METRICS_TEXTFILE", "")
+METRICS_PORT = os.getenv("METRICS_PORT", "")
 
 # WANDB Setting
 WANDB_API_KEY = os.getenv('WANDB_API_KEY')
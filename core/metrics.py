@@ -0,0 +1,367 @@
+import math
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+try:
+    from . import config as cfg
+except ImportError:
+    import config as cfg
+
+# Prometheus text exposition format (0.0.4)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 초 단위 지연 시간 bucket (API 호출 ~ 파이프라인 단계 전체)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 3600.0)
+
+
+def _format_value(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels_text(pairs) -> str:
+    pairs = list(pairs)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class MetricsRegistry:
+    """지표 목록을 보관하고 text exposition 형식으로 내보냅니다."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"이미 등록된 지표입니다: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def get(self, name: str):
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines += metric.collect()
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path) -> str:
+        """node_exporter textfile collector / pushgateway 형식 파일로 저장합니다. (임시 파일 후 교체로 원자적 저장)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(self.render(), encoding="utf-8")
+        os.replace(tmp_path, path)
+        return str(path)
+
+    def reset(self):
+        """모든 지표 값을 비웁니다. (테스트용)"""
+        for metric in list(self._metrics.values()):
+            metric.clear()
+
+
+REGISTRY = MetricsRegistry()
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames=(), registry: MetricsRegistry | None = None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        (registry or REGISTRY).register(self)
+
+    def _key(self, labels: dict) -> tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} 지표의 label은 {list(self.labelnames)} 입니다: {sorted(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def samples(self):
+        """(이름, [(label, 값), ...], 값) 목록"""
+        raise NotImplementedError
+
+    def collect(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for name, labels, value in self.samples():
+            lines.append(f"{name}{_labels_text(labels)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    """증가만 하는 누적 값"""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        if amount < 0:
+            raise ValueError("Counter는 감소할 수 없습니다.")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        # label 없는 counter는 아직 증가하지 않았어도 0을 내보내야 increase()로 변화를 감지할 수 있음
+        if not items and not self.labelnames and self.kind == "counter":
+            items = [((), 0.0)]
+        return [(self.name, list(zip(self.labelnames, key)), value) for key, value in items]
+
+
+class Gauge(Counter):
+    """임의로 바뀌는 현재 값"""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Histogram(_Metric):
+    """bucket별 누적 개수와 합계/개수"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS, registry=None):
+        super().__init__(name, documentation, labelnames, registry)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * len(self.buckets), 0.0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            self._values[key] = (counts, total + value)
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        counts, _ = self._values.get(self._key(labels), ([0], 0.0))
+        return sum(counts)
+
+    def samples(self):
+        with self._lock:
+            items = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+        samples = []
+        for key, (counts, total) in items:
+            labels = list(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                samples.append((f"{self.name}_bucket", labels + [("le", _format_value(bound))], cumulative))
+            samples.append((f"{self.name}_sum", labels, total))
+            samples.append((f"{self.name}_count", labels, cumulative))
+        return samples
+
+
+class Summary(_Metric):
+    """최근 max_samples개 관측값의 분위수(quantile)와 전체 합계/개수"""
+
+    kind = "summary"
+
+    def __init__(self, name: str, documentation: str, labelnames=(), quantiles=(0.5, 0.9, 0.99),
+                 max_samples: int = 1024, registry=None):
+        super().__init__(name, documentation, labelnames, registry)
+        self.quantiles = tuple(quantiles)
+        self.max_samples = max_samples
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            window, count, total = self._values.get(key, (deque(maxlen=self.max_samples), 0, 0.0))
+            window.append(value)
+            self._values[key] = (window, count + 1, total + value)
+
+    def samples(self):
+        with self._lock:
+            items = sorted((key, (sorted(window), count, total)) for key, (window, count, total) in self._values.items())
+        samples = []
+        for key, (window, count, total) in items:
+            labels = list(zip(self.labelnames, key))
+            for q in self.quantiles:
+                value = window[min(len(window) - 1, int(q * len(window)))] if window else math.nan
+                samples.append((self.name, labels + [("quantile", repr(q))], value))
+            samples.append((f"{self.name}_sum", labels, total))
+            samples.append((f"{self.name}_count", labels, count))
+        return samples
+
+
+# 파이프라인 단계
+PIPELINE_RUNS = Counter("pipeline_runs_total", "Pipeline stage runs.", ["stage"])
+PIPELINE_ERRORS = Counter("pipeline_errors_total", "Pipeline stage failures.", ["stage"])
+PIPELINE_STAGE_DURATION = Histogram("pipeline_stage_duration_seconds", "Pipeline stage duration.", ["stage"])
+PIPELINE_LAST_SUCCESS = Gauge(
+    "pipeline_last_success_timestamp_seconds", "Unix time of the last successful stage run.", ["stage"]
+)
+PIPELINE_EXECUTION_DURATION = Gauge("pipeline_execution_duration_seconds", "Duration of the last full pipeline run.")
+ROWS_PROCESSED = Counter("pipeline_rows_processed_total", "Rows processed by pipeline stages.", ["stage"])
+
+# 외부 API (TMDB) / 예측 서버 요청
+API_REQUEST_DURATION = Summary("api_request_duration_seconds", "API request latency.", ["api"])
+API_REQUESTS = Counter("api_requests_total", "API requests by response status.", ["api", "status"])
+
+# S3 전송
+S3_TRANSFER_BYTES = Counter("s3_transfer_bytes_total", "Bytes transferred to/from storage.", ["direction"])
+S3_TRANSFER_DURATION = Histogram("s3_transfer_duration_seconds", "Storage transfer duration.", ["direction"])
+S3_UPLOAD_FAILURES = Counter("s3_upload_failures_total", "Failed storage uploads.")
+S3_DOWNLOAD_FAILURES = Counter("s3_download_failures_total", "Failed storage downloads.")
+
+# 모델
+MODEL_RMSE = Gauge("model_rmse", "Training RMSE of the last trained model.")
+MODEL_CV_RMSE = Gauge("model_cv_rmse", "Cross-validated RMSE of the last trained model.")
+MODEL_R2 = Gauge("model_r2", "Training R2 of the last trained model.")
+MODEL_TRAIN_SAMPLES = Gauge("model_train_samples", "Rows used to train the last model.")
+MODEL_TRAIN_DURATION = Histogram("model_train_duration_seconds", "Model training duration.", ["mode"])
+
+
+def observe_s3_transfer(direction: str, ok: bool, nbytes: int, seconds: float, missing: bool = False):
+    """S3 전송 1건의 시간/바이트/실패를 기록합니다. (direction: upload / download)
+
+    missing=True(없는 key 다운로드)는 정상적인 조회 결과이므로 실패로 집계하지 않습니다.
+    """
+    S3_TRANSFER_DURATION.observe(seconds, direction=direction)
+    if ok:
+        S3_TRANSFER_BYTES.inc(nbytes, direction=direction)
+    elif missing:
+        return
+    elif direction == "upload":
+        S3_UPLOAD_FAILURES.inc()
+    else:
+        S3_DOWNLOAD_FAILURES.inc()
+
+
+def observe_model(metrics: dict, mode: str, seconds: float):
+    """학습 결과 지표(mse/cv_mse/r2/sample_count)와 학습 시간을 기록합니다."""
+    MODEL_TRAIN_DURATION.observe(seconds, mode=mode)
+    if metrics.get("mse") is not None:
+        MODEL_RMSE.set(math.sqrt(metrics["mse"]))
+    if metrics.get("cv_mse") is not None:
+        MODEL_CV_RMSE.set(math.sqrt(metrics["cv_mse"]))
+    if metrics.get("r2") is not None:
+        MODEL_R2.set(metrics["r2"])
+    if metrics.get("sample_count") is not None:
+        MODEL_TRAIN_SAMPLES.set(metrics["sample_count"])
+
+
+def track_training(mode: str):
+    """ModelTrainer 학습 메서드의 학습 시간, 반환 지표(rmse/r2/행 수)를 기록하는 decorator"""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            metrics = fn(*args, **kwargs)
+            observe_model(metrics, mode, time.perf_counter() - start)
+            ROWS_PROCESSED.inc(metrics.get("sample_count") or 0, stage="train")
+            return metrics
+        return wrapper
+    return decorator
+
+
+def flush_textfile(path: str | None = None):
+    """METRICS_TEXTFILE(또는 path)이 설정되어 있으면 현재 지표를 파일로 씁니다. (batch 실행용)"""
+    path = path or cfg.METRICS_TEXTFILE
+    if not path:
+        return None
+    try:
+        return REGISTRY.write_textfile(path)
+    except OSError as e:
+        print(f"지표 파일 저장 실패: {e}")
+        return None
+
+
+def track_stage(stage: str):
+    """Pipeline 단계 메서드의 실행 횟수/시간/실패를 기록하는 decorator
+
+    단계 메서드는 실패를 출력하고 None을 반환하므로, 예외뿐 아니라 None 반환도 실패로 집계합니다.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            PIPELINE_RUNS.inc(stage=stage)
+            PIPELINE_ERRORS.inc(0, stage=stage)
+            start = time.perf_counter()
+            failed = True
+            try:
+                result = fn(*args, **kwargs)
+                failed = result is None
+                return result
+            finally:
+                PIPELINE_STAGE_DURATION.observe(time.perf_counter() - start, stage=stage)
+                if failed:
+                    PIPELINE_ERRORS.inc(stage=stage)
+                else:
+                    PIPELINE_LAST_SUCCESS.set(time.time(), stage=stage)
+                flush_textfile()
+        return wrapper
+    return decorator
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry = REGISTRY
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.registry.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_http_server(port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """/metrics를 제공하는 HTTP 서버를 백그라운드 스레드에서 실행합니다."""
+    server = ThreadingHTTPServer((host, int(port)), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
@@ -0,0 +1,253 @@
+import cProfile
+import json
+import os
+import platform
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import ContextDecorator
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+MB = 1024 * 1024
+
+# cProfile 결과 중 report에 남길 함수 수 (누적 시간 순)
+CPROFILE_TOP = 30
+
+
+def _rss_peak_bytes() -> int | None:
+    """프로세스 최대 RSS (Linux는 KB, macOS는 byte 단위로 반환됨)
+
+    resource가 없는 Windows에서는 psutil의 peak working set(없으면 현재 RSS)을, psutil도 없으면 None을 반환합니다.
+    """
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    if psutil is not None:
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss)
+    return None
+
+
+def _children_cpu_seconds() -> float | None:
+    """종료된 자식 프로세스(ProcessPoolExecutor 워커 등)의 누적 CPU 시간 (측정할 수 없으면 None)"""
+    if resource is not None:
+        usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+        return usage.ru_utime + usage.ru_stime
+    if psutil is not None and sys.platform != "win32":
+        times = psutil.Process().cpu_times()
+        return times.children_user + times.children_system
+    return None
+
+
+class Profiler:
+    """단계(stage)와 하위 단계(read, dropna, fit, dump, upload, download 등)별 자원 사용량을 기록합니다.
+
+    - wall_seconds / cpu_seconds: 경과 시간과 CPU 시간 (cpu/wall로 network·IO 대기인지 연산인지 구분)
+    - children_cpu_seconds: 구간 안에서 끝난 자식 프로세스의 CPU 시간
+    - alloc_peak_mb: 구간 시작 시점 대비 tracemalloc 최대 추가 할당량 (numpy/pandas 버퍼 포함)
+    - rss_peak_mb / rss_growth_mb: 구간 종료 시점의 프로세스 최대 RSS와 구간 동안 늘어난 양
+    같은 경로의 구간이 여러 번 실행되면(파일별 upload 등) 시간은 합산하고 메모리는 최댓값을 남깁니다.
+    worker 스레드에서 열린 구간은 main 스레드의 현재 구간 아래에 붙고, 시간/CPU(스레드 기준)만 기록합니다.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.cprofile = False
+        self.output_dir = None
+        self.run_id = None
+        self.started_at = None
+        self.sections = {}
+        self.call_trees = {}
+        self._main_stack = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._started_tracemalloc = False
+
+    def start(self, output_dir: str, label: str = "run", cprofile: bool = False):
+        """프로파일링을 켭니다. report는 {output_dir}/{run_id}.json 에 저장됩니다."""
+        self.enabled = True
+        self.cprofile = cprofile
+        self.output_dir = Path(output_dir)
+        self.run_id = f"{label}-{datetime.now():%Y%m%dT%H%M%S}-{os.getpid()}"
+        self.started_at = time.time()
+        self.sections = {}
+        self.call_trees = {}
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+
+    def stop(self):
+        self.enabled = False
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def _stack(self) -> list:
+        if threading.current_thread() is threading.main_thread():
+            return self._main_stack
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def _enter(self, name: str) -> dict:
+        stack = self._stack()
+        is_main = stack is self._main_stack
+        parents = stack if is_main else self._main_stack + stack
+        frame = {
+            "name": name,
+            "path": "/".join([frame["name"] for frame in parents] + [name]),
+            "main": is_main,
+            "depth": len(parents),
+            "wall": time.perf_counter(),
+            "cpu": time.process_time() if is_main else time.thread_time(),
+        }
+        if is_main:
+            # 하위 구간이 reset_peak 하기 전에 지금까지의 최댓값을 부모 구간에 반영
+            if stack:
+                stack[-1]["alloc_peak"] = max(stack[-1]["alloc_peak"], tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+            frame["alloc_start"] = tracemalloc.get_traced_memory()[0]
+            frame["alloc_peak"] = 0
+            frame["rss"] = _rss_peak_bytes()
+            frame["children_cpu"] = _children_cpu_seconds()
+            if self.cprofile and not stack:
+                frame["profile"] = cProfile.Profile()
+                frame["profile"].enable()
+        stack.append(frame)
+        return frame
+
+    def _exit(self, frame: dict):
+        wall = time.perf_counter() - frame["wall"]
+        cpu = (time.process_time() if frame["main"] else time.thread_time()) - frame["cpu"]
+        stack = self._stack()
+        stack.pop()
+
+        entry = {"wall_seconds": wall, "cpu_seconds": cpu}
+        if frame["main"]:
+            if "profile" in frame:
+                frame["profile"].disable()
+            peak = max(frame["alloc_peak"], tracemalloc.get_traced_memory()[1])
+            if stack:
+                stack[-1]["alloc_peak"] = max(stack[-1]["alloc_peak"], peak)
+            entry["alloc_peak_mb"] = max(peak - frame["alloc_start"], 0) / MB
+            # resource/psutil이 없는 플랫폼에서는 RSS와 자식 프로세스 CPU 시간을 기록하지 않음
+            rss = _rss_peak_bytes()
+            if rss is not None:
+                entry.update(rss_peak_mb=rss / MB, rss_growth_mb=(rss - frame["rss"]) / MB)
+            children_cpu = _children_cpu_seconds()
+            if children_cpu is not None:
+                entry["children_cpu_seconds"] = children_cpu - frame["children_cpu"]
+        self._record(frame, entry)
+
+        if frame["main"] and not stack:
+            if "profile" in frame:
+                self._save_call_tree(frame["path"], frame["profile"])
+            self.write_report()
+
+    def _record(self, frame: dict, entry: dict):
+        with self._lock:
+            section = self.sections.setdefault(frame["path"], {
+                "path": frame["path"],
+                "name": frame["name"],
+                "depth": frame["depth"],
+                "thread": "main" if frame["main"] else "worker",
+                "calls": 0,
+                "wall_seconds": 0.0,
+                "cpu_seconds": 0.0,
+            })
+            section["calls"] += 1
+            for key, value in entry.items():
+                if key.endswith("_seconds"):
+                    section[key] = section.get(key, 0.0) + value
+                else:
+                    section[key] = max(section.get(key, value), value)
+
+    def _save_call_tree(self, path: str, profile: cProfile.Profile):
+        """stage별 cProfile 결과를 .prof(snakeviz 등으로 열람)로 저장하고 누적 시간 상위 함수를 report에 남깁니다."""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        prof_path = self.output_dir / f"{self.run_id}.{path.replace('/', '.')}.prof"
+        profile.dump_stats(prof_path)
+        stats = pstats.Stats(profile).stats
+        top = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:CPROFILE_TOP]
+        self.call_trees[path] = {
+            "file": str(prof_path),
+            "top": [
+                {
+                    "function": f"{filename}:{line}({name})",
+                    "calls": nc,
+                    "tottime": tt,
+                    "cumtime": ct,
+                }
+                for (filename, line, name), (cc, nc, tt, ct, callers) in top
+            ],
+        }
+
+    def report(self) -> dict:
+        with self._lock:
+            sections = [dict(section) for section in self.sections.values()]
+        for section in sections:
+            wall = section["wall_seconds"]
+            section["cpu_utilization"] = section["cpu_seconds"] / wall if wall > 0 else 0.0
+        return {
+            "run_id": self.run_id,
+            "started_at": datetime.fromtimestamp(self.started_at).isoformat(),
+            "finished_at": datetime.now().isoformat(),
+            "argv": sys.argv,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "sections": sections,
+            "cprofile": self.call_trees,
+        }
+
+    def write_report(self) -> str:
+        """report를 JSON으로 저장합니다. (stage가 끝날 때마다 같은 파일을 갱신)"""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        path = self.output_dir / f"{self.run_id}.json"
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(self.report(), f, indent=2)
+        os.replace(tmp_path, path)
+        return str(path)
+
+
+PROFILER = Profiler()
+
+
+class profile_step(ContextDecorator):
+    """PROFILER가 켜져 있을 때만 구간을 기록하는 context manager / decorator (꺼져 있으면 비용 거의 없음)
+
+        with profile_step("read"):
+            df = read_table(path)
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._frame = None
+
+    def _recreate_cm(self):
+        # decorator로 쓰일 때 호출마다 새 객체를 사용 (재귀/동시 호출 대비)
+        return profile_step(self.name)
+
+    def __enter__(self):
+        if PROFILER.enabled:
+            self._frame = PROFILER._enter(self.name)
+        return self
+
+    def __exit__(self, *exc):
+        if self._frame is not None:
+            PROFILER._exit(self._frame)
+            self._frame = None
+        return False
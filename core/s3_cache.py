@@ -0,0 +1,145 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    from .storage import file_lock
+except ImportError:
+    from storage import file_lock
+
+
+class S3Cache:
+    """S3 객체를 bucket/key 단위로 보관하는 로컬 캐시 (ETag/크기로 검증, LRU 용량 제한)
+
+    ttl(초) 안에 검증된 항목은 S3 요청 없이 바로 사용하고,
+    그 외에는 head_object 1회로 ETag/크기를 확인한 뒤 재사용합니다.
+    backfill 워커처럼 여러 프로세스가 같은 cache_dir을 쓸 수 있으므로, index 변경은 파일 잠금 안에서
+    디스크의 index를 다시 읽어 병합한 뒤 저장합니다.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int, ttl: float = 0):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.cache_dir / "index.json"
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.stats = {"hits": 0, "misses": 0, "validations": 0, "evictions": 0}
+        self._lock = threading.Lock()
+        self._index = self._load_index()
+
+    def _load_index(self) -> dict:
+        if not self.index_path.exists():
+            return {}
+        try:
+            with open(self.index_path, "r") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        # 파일이 사라진 항목은 제외
+        return {k: v for k, v in index.items() if (self.cache_dir / v["file"]).exists()}
+
+    @contextmanager
+    def _transaction(self):
+        """프로세스 간 잠금을 잡고 최신 index를 다시 읽은 뒤, 블록이 끝나면 저장합니다."""
+        with self._lock, file_lock(self.cache_dir / "index.lock"):
+            self._index = self._load_index()
+            yield self._index
+            self._save_index()
+
+    def _save_index(self):
+        tmp_path = self.index_path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(self._index, f)
+        os.replace(tmp_path, self.index_path)
+
+    @staticmethod
+    def _entry_id(bucket: str, key: str) -> str:
+        return hashlib.sha1(f"{bucket}/{key}".encode()).hexdigest()
+
+    def path_for(self, bucket: str, key: str) -> Path:
+        """캐시 파일 경로"""
+        return self.cache_dir / f"{self._entry_id(bucket, key)}.bin"
+
+    def lookup(self, bucket: str, key: str) -> dict | None:
+        with self._lock:
+            # 다른 프로세스가 추가/삭제한 항목을 반영 (index.json은 원자적으로 교체되므로 잠금 없이 읽음)
+            self._index = self._load_index()
+            entry = self._index.get(self._entry_id(bucket, key))
+            return dict(entry) if entry else None
+
+    def is_fresh(self, entry: dict) -> bool:
+        """ttl 안에 검증된 항목이면 S3 확인 없이 사용할 수 있습니다."""
+        return self.ttl > 0 and time.time() - entry["validated_at"] < self.ttl
+
+    @staticmethod
+    def matches(entry: dict, etag: str, size: int) -> bool:
+        return entry["etag"] == etag and entry["size"] == size
+
+    def count_validation(self):
+        with self._lock:
+            self.stats["validations"] += 1
+
+    def hit(self, bucket: str, key: str, dest, etag: str, validated: bool = False) -> str | None:
+        """캐시 파일을 dest로 복사하고 접근 시각을 갱신합니다.
+
+        lookup() 이후 다른 프로세스가 항목을 제거했거나 다른 ETag로 바꿨으면 None을 반환합니다.
+        """
+        with self._transaction() as index:
+            entry = index.get(self._entry_id(bucket, key))
+            if entry is None or entry["etag"] != etag:
+                return None
+            entry["last_access"] = time.time()
+            if validated:
+                entry["validated_at"] = entry["last_access"]
+            self.stats["hits"] += 1
+            # 복사 중에 다른 프로세스가 파일을 evict하지 않도록 잠금 안에서 복사
+            return self._copy_out(bucket, key, dest)
+
+    def store(self, bucket: str, key: str, etag: str, size: int, dest, downloaded=None) -> str:
+        """내려받은 파일(downloaded, 생략하면 이미 path_for()에 있는 파일)을 캐시에 등록하고 dest로 복사합니다."""
+        now = time.time()
+        with self._transaction() as index:
+            if downloaded is not None:
+                # index와 캐시 파일이 같은 버전을 가리키도록 잠금 안에서 교체
+                os.replace(downloaded, self.path_for(bucket, key))
+            index[self._entry_id(bucket, key)] = {
+                "bucket": bucket,
+                "key": key,
+                "etag": etag,
+                "size": size,
+                "file": self.path_for(bucket, key).name,
+                "last_access": now,
+                "validated_at": now,
+            }
+            self.stats["misses"] += 1
+            self._evict(keep=self._entry_id(bucket, key))
+            return self._copy_out(bucket, key, dest)
+
+    def _copy_out(self, bucket: str, key: str, dest) -> str:
+        # 하드링크는 소비자가 파일을 덮어쓸 때 캐시까지 바뀌므로 복사를 사용
+        dest = Path(dest)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(self.path_for(bucket, key), dest)
+        return str(dest)
+
+    def _evict(self, keep: str | None = None):
+        """전체 크기가 max_bytes 이하가 될 때까지 오래 사용하지 않은 항목부터 삭제합니다. (lock 보유 상태)"""
+        total = sum(entry["size"] for entry in self._index.values())
+        for entry_id, entry in sorted(self._index.items(), key=lambda item: item[1]["last_access"]):
+            if total <= self.max_bytes:
+                break
+            if entry_id == keep:
+                continue
+            (self.cache_dir / entry["file"]).unlink(missing_ok=True)
+            del self._index[entry_id]
+            total -= entry["size"]
+            self.stats["evictions"] += 1
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            return sum(entry["size"] for entry in self._index.values())
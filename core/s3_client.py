@@ -1,31 +1,138 @@
+import gzip
+import io
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
 
 import boto3
+import pandas as pd
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+from botocore.exceptions import ClientError
 
 try:
     from . import config as cfg
+    from .metrics import observe_s3_transfer
+    from .profiler import profile_step
+    from .s3_cache import S3Cache
+    from .s3_index import S3KeyIndex
+    from .storage import STORAGE_BACKENDS, LocalStorageClient, MemoryStorageClient
+    from .utils import COMPRESSION_SUFFIXES, storage_format, write_table
 except ImportError:
     import config as cfg
+    from metrics import observe_s3_transfer
+    from profiler import profile_step
+    from s3_cache import S3Cache
+    from s3_index import S3KeyIndex
+    from storage import STORAGE_BACKENDS, LocalStorageClient, MemoryStorageClient
+    from utils import COMPRESSION_SUFFIXES, storage_format, write_table
+
+
+MB = 1024 * 1024
 
 
 class S3Manager:
-    def __init__(self):   
-        self.s3 = boto3.client(
+    def __init__(self, max_workers: int | None = None, use_cache: bool = True, backend: str | None = None):
+        # 배치 전송 시 동시 전송 수, 커넥션 풀은 (배치 동시성 x 파일당 multipart 동시성)을 감당하도록 설정
+        self.max_workers = max_workers or cfg.S3_MAX_WORKERS
+        self.transfer_config = TransferConfig(
+            multipart_threshold=cfg.S3_MULTIPART_THRESHOLD_MB * MB,
+            multipart_chunksize=cfg.S3_MULTIPART_CHUNKSIZE_MB * MB,
+            max_concurrency=cfg.S3_MULTIPART_CONCURRENCY,
+            use_threads=True,
+        )
+        # 저장소 backend (s3 / local / memory), boto3 client는 s3 backend에서만 생성
+        self.backend = (backend or cfg.STORAGE_BACKEND).lower()
+        if self.backend not in STORAGE_BACKENDS:
+            raise ValueError(f"지원하지 않는 저장소 backend: {self.backend} (지원: {', '.join(STORAGE_BACKENDS)})")
+        self.s3 = self._create_client()
+        self.bucket_name = cfg.bucket_name or ("local" if self.backend != "s3" else None)
+
+        # 다운로드 캐시 (S3_CACHE_DIR을 비우면 비활성화, 로컬/메모리 backend는 원본이 이미 로컬이므로 사용하지 않음)
+        self.cache = None
+        if use_cache and cfg.S3_CACHE_DIR and self.backend == "s3":
+            self.cache = S3Cache(cfg.S3_CACHE_DIR, cfg.S3_CACHE_MAX_MB * MB, ttl=cfg.S3_CACHE_TTL)
+
+        # prefix별 key 목록 manifest (S3_INDEX_PATH를 비우면 비활성화, s3 backend에서만 사용)
+        self.key_index = None
+        if cfg.S3_INDEX_PATH and self.backend == "s3":
+            self.key_index = S3KeyIndex(cfg.S3_INDEX_PATH, full_refresh_seconds=cfg.S3_INDEX_FULL_REFRESH_SECONDS)
+
+    def _create_client(self):
+        if self.backend == "local":
+            return LocalStorageClient(cfg.LOCAL_STORAGE_ROOT)
+        if self.backend == "memory":
+            return MemoryStorageClient()
+        return boto3.client(
             's3',
             aws_access_key_id = cfg.aws_access_key_id,
             aws_secret_access_key = cfg.aws_secret_access_key,
-            region_name = cfg.region_name
+            region_name = cfg.region_name,
+            config=Config(
+                max_pool_connections=self.max_workers * cfg.S3_MULTIPART_CONCURRENCY,
+                retries={'max_attempts': 5, 'mode': 'adaptive'},
+                tcp_keepalive=True,
+            ),
         )
-        self.bucket_name = cfg.bucket_name
+
+    def iter_objects(self, prefix: str = "", start_after: str | None = None, delimiter: str | None = None):
+        """paginator로 prefix 아래 객체를 1000개 제한 없이 lazy하게 yield 합니다."""
+        params = {'Bucket': self.bucket_name, 'Prefix': prefix}
+        if start_after:
+            params['StartAfter'] = start_after
+        if delimiter:
+            params['Delimiter'] = delimiter
+        paginator = self.s3.get_paginator('list_objects_v2')
+        for page in paginator.paginate(**params):
+            yield from page.get('Contents', [])
+
+    def iter_keys(self, prefix: str = "", start_after: str | None = None):
+        """prefix 아래 key를 정렬된 순서로 lazy하게 yield 합니다."""
+        for obj in self.iter_objects(prefix, start_after=start_after):
+            yield obj['Key']
+
+    def list_prefixes(self, prefixes, max_workers: int | None = None) -> dict[str, list[str]]:
+        """여러 prefix를 동시에 조회해 {prefix: [key, ...]} 로 반환합니다."""
+        prefixes = list(prefixes)
+        if not prefixes:
+            return {}
+        max_workers = min(max_workers or self.max_workers, len(prefixes))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return dict(zip(prefixes, executor.map(lambda prefix: list(self.iter_keys(prefix)), prefixes)))
+
+    def indexed_keys(self, prefix: str, full: bool = False) -> list[str]:
+        """manifest 인덱스를 StartAfter로 증분 갱신한 뒤 prefix의 key 목록을 반환합니다.
+
+        full=True 이거나 인덱스가 재조회 주기를 넘겼으면 전체 목록을 다시 받아 인덱스를 교체합니다.
+        """
+        if self.key_index is None:
+            return list(self.iter_keys(prefix))
+        start_after = None if full else self.key_index.start_after(prefix)
+        new_keys = list(self.iter_keys(prefix, start_after=start_after))
+        return self.key_index.update(prefix, new_keys, full=start_after is None)
+
+    def invalidate_keys(self, prefixes):
+        """과거 key가 추가/삭제된 prefix의 인덱스를 비워 다음 indexed_keys()에서 전체 목록을 다시 받게 합니다."""
+        if self.key_index is not None:
+            self.key_index.invalidate(prefixes)
+
+    def latest_key(self, prefix: str, suffix: str = "") -> str | None:
+        """prefix 아래에서 (suffix로 끝나는) 가장 마지막 key를 찾습니다. 예: latest_key('raw/', '.csv')"""
+        keys = [key for key in self.indexed_keys(prefix) if key.endswith(suffix)]
+        return keys[-1] if keys else None
 
     def check_all_data(self):
         try:   
-            response = self.s3.list_objects_v2(Bucket=self.bucket_name)
             print("--- 내 S3 버킷 파일 목록 ---")
-            if 'Contents' in response:
-                for obj in response['Contents']:
-                    print(obj['Key'])
-            else:
+            found = False
+            for key in self.iter_keys():
+                print(key)
+                found = True
+            if not found:
                 print("버킷이 비어 있습니다.")
         except Exception as e:
             print(f"연결 실패: {e}")
@@ -35,15 +142,12 @@ class S3Manager:
         if not folder_name.endswith('/'):
             folder_name += '/'
         try:
-            response = self.s3.list_objects_v2(
-                Bucket=self.bucket_name,
-                Prefix=folder_name
-            )
             print(f"--- [{folder_name}] 폴더 내 파일 목록 ---")
-            if 'Contents' in response:
-                for obj in response['Contents']:
-                    print(f"Key: {obj['Key']} | Size: {obj['Size']} bytes")
-            else:
+            found = False
+            for obj in self.iter_objects(folder_name):
+                print(f"Key: {obj['Key']} | Size: {obj['Size']} bytes")
+                found = True
+            if not found:
                 print("파일이 없습니다.")
 
         except Exception as e:
@@ -54,74 +158,336 @@ class S3Manager:
         # 접두사(prefix)가 폴더 형태인 경우 '/'로 끝나도록 보정
         if prefix and not prefix.endswith('/'):
             prefix += '/'
-        response = self.s3_client.list_objects_v2(
-            Bucket=self.bucket_name,
-            Prefix=prefix
-        )
-        if 'Contents' not in response:
-            print(f"조회 결과: {prefix} 경로에 파일이 없습니다.")
-            return []
-
-        # 파일 경로(Key) 목록 추출
-        file_list = [obj['Key'] for obj in response['Contents'] if obj['Key'] != prefix]
 
-        # 정렬하여 반환
-        return sorted(file_list)
+        # 파일 경로(Key) 목록 추출 (list_objects_v2는 이미 key 순서로 정렬되어 반환)
+        file_list = [key for key in self.iter_keys(prefix) if key != prefix]
+        if not file_list:
+            print(f"조회 결과: {prefix} 경로에 파일이 없습니다.")
+        return file_list
 
 
     def check_folders(self):
         try:
-            response = self.s3.list_objects_v2(
-                Bucket=self.bucket_name,
-                Delimiter='/'
-            )
-
             print(f"--- [{self.bucket_name}] 내 폴더 목록 ---")
 
-            if 'CommonPrefixes' in response:
-                for prefix in response['CommonPrefixes']:
+            paginator = self.s3.get_paginator('list_objects_v2')
+            found = False
+            for page in paginator.paginate(Bucket=self.bucket_name, Delimiter='/'):
+                for prefix in page.get('CommonPrefixes', []):
                     print(f" 폴더명: {prefix['Prefix']}")
-            else:
+                    found = True
+            if not found:
                 print("생성된 폴더가 없습니다.")
 
         except Exception as e:
             print(f"폴더 조회 실패: {e}")
 
 
-    def upload_file(self, local_path, s3_path):
+    def upload_file(self, local_path, s3_path, compression: str | None = None) -> bool:
+        """로컬 파일을 {s3_path}/{파일명} 으로 업로드하고 성공 여부를 반환합니다.
+
+        compression(gzip/zstd)을 지정하면 CSV 파일을 임시 파일 없이 압축하면서 업로드하고
+        key에 .gz/.zst 확장자를 붙입니다. (parquet/arrow는 자체 압축을 사용하므로 그대로 업로드)
+        """
         filename = Path(local_path).name
         s3_path = f"{s3_path}/{filename}"
+        if compression and storage_format(local_path) == "csv":
+            s3_path += COMPRESSION_SUFFIXES[compression]
+
+            def copy_file(sink):
+                with open(local_path, 'rb') as f:
+                    shutil.copyfileobj(f, sink, length=MB)
+
+            with profile_step("upload"):
+                result = self.upload_stream(copy_file, s3_path, compression=compression)
+            if result["ok"]:
+                print(f"{s3_path}에 업로드 완료. ({result['bytes']} bytes, {compression})")
+            else:
+                print(f"업로드 실패: {result['error']}")
+            return result["ok"]
+
+        started = time.perf_counter()
         try:
-            self.s3.upload_file(local_path, self.bucket_name, s3_path)
+            with profile_step("upload"):
+                self.s3.upload_file(local_path, self.bucket_name, s3_path, Config=self.transfer_config)
+            observe_s3_transfer("upload", True, Path(local_path).stat().st_size, time.perf_counter() - started)
             print(f"{s3_path}에 업로드 완료.")
+            return True
         except Exception as e:
+            observe_s3_transfer("upload", False, 0, time.perf_counter() - started)
             print(f"업로드 실패: {e}")
+            return False
+
+    def upload_stream(self, write_fn, s3_key: str, compression: str | None = None) -> dict:
+        """write_fn(sink)이 쓰는 내용을 임시 파일 없이 S3 multipart 업로드로 바로 보냅니다.
+
+        write_fn은 별도 스레드에서 pipe에 쓰고, 업로드는 pipe를 읽으면서 part 단위로 전송합니다.
+        write_fn이 실패하면 잘린 객체가 남지 않도록 업로드도 실패 처리합니다.
+        """
+        result = {"key": s3_key, "ok": False, "bytes": 0, "seconds": 0.0, "error": None}
+        started = time.perf_counter()
+        read_fd, write_fd = os.pipe()
+        errors = []
+
+        def produce():
+            raw = os.fdopen(write_fd, 'wb')
+            try:
+                with _compressed_writer(raw, compression) as sink:
+                    write_fn(sink)
+            except BaseException as e:
+                errors.append(e)
+            finally:
+                raw.close()
+
+        producer = threading.Thread(target=produce, name=f"upload-stream-{s3_key}", daemon=True)
+        stream = _ProducerStream(os.fdopen(read_fd, 'rb'), errors)
+        producer.start()
+        try:
+            self.s3.upload_fileobj(stream, self.bucket_name, s3_key, Config=self.transfer_config)
+            result["ok"] = True
+        except Exception as e:
+            result["error"] = str(errors[0] if errors else e)
+        finally:
+            stream.close()
+            producer.join()
+        result["bytes"] = stream.bytes_read
+        result["seconds"] = time.perf_counter() - started
+        observe_s3_transfer("upload", result["ok"], result["bytes"], result["seconds"])
+        return result
+
+    def upload_dataframe(self, data, s3_key: str, compression: str | None = None) -> dict:
+        """DataFrame(또는 DataFrame 배치 iterable)을 key 확장자의 포맷으로 직렬화해 바로 업로드합니다.
+
+        csv는 compression(gzip/zstd)을 적용할 수 있으며, 이 경우 key에 압축 확장자를 붙입니다.
+        """
+        fmt = storage_format(s3_key)
+        if compression and fmt == "csv" and not s3_key.endswith(COMPRESSION_SUFFIXES[compression]):
+            s3_key += COMPRESSION_SUFFIXES[compression]
+        elif fmt != "csv":
+            compression = None
+
+        def write_frames(sink):
+            if isinstance(data, pd.DataFrame):
+                write_table(data, sink, fmt=fmt)
+                return
+            # 배치 iterable은 csv로 이어 쓰기 (첫 배치만 헤더 포함)
+            text = io.TextIOWrapper(sink, encoding='utf-8', newline='')
+            columns = None
+            for batch in data:
+                if columns is None:
+                    columns = list(batch.columns)
+                    batch.to_csv(text, index=False)
+                else:
+                    batch.reindex(columns=columns).to_csv(text, index=False, header=False)
+            text.flush()
+            text.detach()
+
+        if not isinstance(data, pd.DataFrame) and fmt != "csv":
+            raise ValueError("DataFrame 배치 스트리밍 업로드는 csv 포맷만 지원합니다.")
+        with profile_step("upload"):
+            return self.upload_stream(write_frames, s3_key, compression=compression)
 
 
     def download_file(self, s3_key: str, local_dir: str) -> tuple[bool, str | None]:
         """S3파일이 있으면 다운로드, 없으면 해당 경로의 파일 목록을 출력"""
         filename = Path(s3_key).name
         local_save_path = Path(local_dir) / filename
-        
-        try:
-            # 파일 존재 여부 확인
-            self.s3.head_object(Bucket=self.bucket_name, Key=s3_key)
+        started = time.perf_counter()
 
-            # 파일이 존재하면 다운로드 진행
-            local_save_path.parent.mkdir(parents=True, exist_ok=True)
-            self.s3.download_file(self.bucket_name, s3_key, str(local_save_path))
+        try:
+            # head_object 없이 바로 다운로드하고, 파일이 없으면 404 예외로 판별
+            with profile_step("download"):
+                self._download(s3_key, local_save_path)
+            nbytes = local_save_path.stat().st_size if local_save_path.exists() else 0
+            observe_s3_transfer("download", True, nbytes, time.perf_counter() - started)
             print(f"{s3_key} -> {local_save_path}에 다운로드 완료.")
             return True, str(local_save_path)
 
         except Exception as e:
+            observe_s3_transfer("download", False, 0, time.perf_counter() - started, missing=self._is_not_found(e))
             # 파일이 없을 경우 예외처리
-            print(f"S3에 {s3_key} 파일이 없습니다")
+            if self._is_not_found(e):
+                print(f"S3에 {s3_key} 파일이 없습니다")
+            else:
+                print(f"다운로드 실패: {s3_key} ({e})")
 
             # 파일 목록 보여주기
             forder_path = '/'.join(s3_key.split('/')[:-1])
             self.check_file_in_folder(forder_path)
             return False, None
 
+    def _download(self, s3_key: str, local_path):
+        """캐시가 있으면 ETag/크기로 검증해 재사용하고, 없거나 바뀌었으면 내려받습니다."""
+        if self.cache is None:
+            Path(local_path).parent.mkdir(parents=True, exist_ok=True)
+            self.s3.download_file(self.bucket_name, s3_key, str(local_path), Config=self.transfer_config)
+            return str(local_path)
+
+        entry = self.cache.lookup(self.bucket_name, s3_key)
+        if entry and self.cache.is_fresh(entry):
+            cached = self.cache.hit(self.bucket_name, s3_key, local_path, entry["etag"])
+            if cached:
+                return cached
+
+        head = self.s3.head_object(Bucket=self.bucket_name, Key=s3_key)
+        self.cache.count_validation()
+        etag, size = head['ETag'], head['ContentLength']
+        if entry and self.cache.matches(entry, etag, size):
+            # 다른 프로세스가 그 사이 항목을 제거/교체했으면 None이 반환되어 아래에서 다시 내려받음
+            cached = self.cache.hit(self.bucket_name, s3_key, local_path, etag, validated=True)
+            if cached:
+                return cached
+
+        # 캐시 항목(ETag/크기)과 파일이 같은 버전이 되도록, head 재조회 없이 내려받는 버전을 고정합니다.
+        cache_path = self.cache.path_for(self.bucket_name, s3_key)
+        tmp_path = cache_path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            if head.get('VersionId'):
+                # 버전 관리 bucket: head에서 본 버전으로 고정해 multipart 다운로드
+                extra_args = {"VersionId": head['VersionId']}
+                self.s3.download_file(
+                    self.bucket_name, s3_key, str(tmp_path), ExtraArgs=extra_args, Config=self.transfer_config
+                )
+            else:
+                # get_object 응답은 본문과 그 본문의 ETag/크기를 함께 돌려주므로 다시 head 할 필요가 없음
+                response = self.s3.get_object(Bucket=self.bucket_name, Key=s3_key)
+                etag, size = response['ETag'], response['ContentLength']
+                body = response['Body']
+                try:
+                    with open(tmp_path, "wb") as f:
+                        shutil.copyfileobj(body, f, MB)
+                finally:
+                    body.close()
+        except Exception:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        return self.cache.store(self.bucket_name, s3_key, etag, size, local_path, downloaded=tmp_path)
+
+    def head(self, s3_key: str) -> dict | None:
+        """객체의 ETag/크기/수정 시각만 조회합니다. (객체가 없으면 None)"""
+        try:
+            head = self.s3.head_object(Bucket=self.bucket_name, Key=s3_key)
+        except Exception as e:
+            if self._is_not_found(e):
+                return None
+            raise
+        return {"etag": head["ETag"], "size": head["ContentLength"], "last_modified": head.get("LastModified")}
+
+    def read_object(self, s3_key: str) -> tuple[bytes, str] | None:
+        """작은 객체를 메모리로 읽어 (내용, ETag)를 반환합니다. (객체가 없으면 None)"""
+        try:
+            response = self.s3.get_object(Bucket=self.bucket_name, Key=s3_key)
+        except Exception as e:
+            if self._is_not_found(e):
+                return None
+            raise
+        try:
+            return response["Body"].read(), response["ETag"]
+        finally:
+            response["Body"].close()
+
+    def write_object(self, s3_key: str, data: bytes, etag: str | None = None) -> bool:
+        """읽은 시점의 ETag가 그대로일 때만 객체를 씁니다. (etag=None이면 객체가 없을 때만)
+
+        다른 writer가 먼저 바꿨으면 False를 반환하므로, 호출하는 쪽에서 다시 읽고 재시도합니다.
+        """
+        condition = {"IfMatch": etag} if etag else {"IfNoneMatch": "*"}
+        try:
+            self.s3.put_object(Bucket=self.bucket_name, Key=s3_key, Body=data, **condition)
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('412', 'PreconditionFailed', '409', 'ConditionalRequestConflict'):
+                return False
+            raise
+        return True
+
+    def cache_stats(self) -> dict:
+        """다운로드 캐시 히트/미스/검증/삭제 횟수와 사용량"""
+        if self.cache is None:
+            return {}
+        return {**self.cache.stats, "bytes": self.cache.total_bytes()}
+
+    @staticmethod
+    def _is_not_found(error: Exception) -> bool:
+        if not isinstance(error, ClientError):
+            return False
+        return error.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound')
+
+    def _transfer(self, direction: str, local_path: str, s3_key: str) -> dict:
+        """파일 1개를 전송하고 결과를 dict로 반환합니다. (예외를 던지지 않음)"""
+        result = {"key": s3_key, "local_path": str(local_path), "ok": False, "bytes": 0, "seconds": 0.0, "error": None}
+        started = time.perf_counter()
+        try:
+            with profile_step(direction):
+                if direction == "upload":
+                    self.s3.upload_file(str(local_path), self.bucket_name, s3_key, Config=self.transfer_config)
+                else:
+                    self._download(s3_key, local_path)
+            result["ok"] = True
+            result["bytes"] = Path(local_path).stat().st_size
+        except Exception as e:
+            result["error"] = "not found" if self._is_not_found(e) else str(e)
+        result["seconds"] = time.perf_counter() - started
+        observe_s3_transfer(
+            direction, result["ok"], result["bytes"], result["seconds"], missing=result["error"] == "not found"
+        )
+        return result
+
+    def _transfer_many(self, direction: str, pairs, max_workers: int | None) -> list[dict]:
+        pairs = list(pairs)
+        if not pairs:
+            return []
+        max_workers = min(max_workers or self.max_workers, len(pairs))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(lambda pair: self._transfer(direction, *pair), pairs))
+
+    def upload_many(self, items, max_workers: int | None = None) -> list[dict]:
+        """[(local_path, s3_key), ...] 를 동시에 업로드하고 파일별 결과를 입력 순서대로 반환합니다."""
+        return self._transfer_many("upload", items, max_workers)
+
+    def download_many(self, items, max_workers: int | None = None) -> list[dict]:
+        """[(s3_key, local_path), ...] 를 동시에 다운로드하고 파일별 결과를 입력 순서대로 반환합니다."""
+        return self._transfer_many("download", [(local_path, key) for key, local_path in items], max_workers)
+
+
+class _ProducerStream:
+    """pipe 읽기용 file-like. 쓰는 쪽이 실패한 상태로 EOF에 도달하면 예외를 발생시킵니다."""
+
+    def __init__(self, file, errors: list):
+        self._file = file
+        self._errors = errors
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        data = self._file.read(size)
+        # 버퍼 read는 EOF에서만 요청보다 적게 반환하며, 쓰는 쪽 오류는 pipe가 닫히기 전에 기록됨
+        at_eof = size is None or size < 0 or len(data) < size
+        if at_eof and self._errors:
+            raise IOError(f"스트림 생성 실패: {self._errors[0]}")
+        self.bytes_read += len(data)
+        return data
+
+    def close(self):
+        self._file.close()
+
+
+@contextmanager
+def _compressed_writer(raw, compression: str | None):
+    """raw 바이너리 스트림 위에 gzip/zstd 압축 writer를 씌웁니다. (raw는 닫지 않음)"""
+    if not compression:
+        yield raw
+    elif compression == "gzip":
+        with gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=6) as sink:
+            yield sink
+    elif compression == "zstd":
+        try:
+            import zstandard
+        except ImportError as e:
+            raise ImportError("zstd 압축에는 zstandard 패키지가 필요합니다. (pip install zstandard)") from e
+        with zstandard.ZstdCompressor(level=3).stream_writer(raw, closefd=False) as sink:
+            yield sink
+    else:
+        raise ValueError(f"지원하지 않는 압축 방식입니다: {compression} (gzip/zstd)")
+
 
 if __name__ == '__main__':
     s3 = S3Manager()
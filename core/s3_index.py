@@ -0,0 +1,70 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+
+class S3KeyIndex:
+    """prefix별 S3 key 목록을 로컬 manifest로 캐싱하는 인덱스
+
+    마지막으로 본 key 이후만 StartAfter로 조회해 증분 갱신하므로,
+    날짜 순으로 쌓이는 raw/, processed/, models/archive/ 에서 최신 key를 찾을 때 버킷 전체를 다시 훑지 않습니다.
+    마지막 key보다 앞선 key(backfill한 과거 날짜, 재업로드)와 삭제된 key는 증분 갱신에서 보이지 않으므로,
+    full_refresh_seconds마다 또는 invalidate() 이후에는 전체 목록을 다시 받습니다.
+    """
+
+    def __init__(self, index_path: str, full_refresh_seconds: float = 0):
+        self.index_path = Path(index_path)
+        self.full_refresh_seconds = full_refresh_seconds
+        self._lock = threading.Lock()
+        self._index = self._load()
+
+    def _load(self) -> dict:
+        if not self.index_path.exists():
+            return {}
+        try:
+            with open(self.index_path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(self._index, f)
+        os.replace(tmp_path, self.index_path)
+
+    def keys(self, prefix: str) -> list[str]:
+        with self._lock:
+            return list(self._index.get(prefix, {}).get("keys", []))
+
+    def start_after(self, prefix: str) -> str | None:
+        """증분 조회를 시작할 key (인덱스가 없거나 전체 재조회 주기가 지났으면 None)"""
+        with self._lock:
+            entry = self._index.get(prefix, {})
+            if not entry.get("keys"):
+                return None
+            if self.full_refresh_seconds > 0 and time.time() - entry.get("full_at", 0) >= self.full_refresh_seconds:
+                return None
+            return entry["keys"][-1]
+
+    def update(self, prefix: str, new_keys: list[str], full: bool = False) -> list[str]:
+        """새로 조회한 key를 반영하고 prefix의 전체 key 목록을 반환합니다. (full=True 이면 목록을 교체)"""
+        with self._lock:
+            entry = self._index.setdefault(prefix, {"keys": []})
+            keys = sorted(new_keys) if full else sorted(set(entry["keys"]).union(new_keys))
+            entry["keys"] = keys
+            entry["refreshed_at"] = time.time()
+            if full:
+                entry["full_at"] = entry["refreshed_at"]
+            self._save()
+            return list(keys)
+
+    def invalidate(self, prefixes):
+        """prefix들의 목록을 지워 다음 조회 때 전체 목록을 다시 받도록 합니다."""
+        with self._lock:
+            for prefix in prefixes:
+                self._index.pop(prefix, None)
+            self._save()
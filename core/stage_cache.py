@@ -0,0 +1,84 @@
+import hashlib
+import json
+from pathlib import Path
+
+import pandas as pd
+
+_CHUNK_SIZE = 1024 * 1024
+
+
+class StageCache:
+    """단계 입력(파일/DataFrame)과 파라미터의 content hash로 이전 산출물을 재사용하는 캐시
+
+    각 단계는 산출물 옆에 `.cache_{stage}.json` 마커를 남기며,
+    다음 실행에서 hash가 같고 산출물이 모두 남아 있으면 작업을 건너뜁니다.
+    """
+
+    def __init__(self, force: bool = False):
+        self.force = force
+        self.stats = {}
+
+    @staticmethod
+    def _update_with_input(digest, item):
+        if isinstance(item, pd.DataFrame):
+            digest.update(",".join(map(str, item.columns)).encode())
+            digest.update(pd.util.hash_pandas_object(item, index=False).values.tobytes())
+            return
+        with open(item, "rb") as f:
+            for block in iter(lambda: f.read(_CHUNK_SIZE), b""):
+                digest.update(block)
+
+    def key(self, inputs: list, params: dict) -> str:
+        """입력 파일 내용(또는 DataFrame)과 파라미터로 sha256 키를 만듭니다."""
+        digest = hashlib.sha256()
+        for item in inputs:
+            self._update_with_input(digest, item)
+        digest.update(json.dumps(params, sort_keys=True, default=str).encode())
+        return digest.hexdigest()
+
+    @staticmethod
+    def _marker_path(stage: str, output_dir) -> Path:
+        return Path(output_dir) / f".cache_{stage}.json"
+
+    def _count(self, stage: str, result: str):
+        self.stats.setdefault(stage, {"hit": 0, "miss": 0})[result] += 1
+
+    def lookup(self, stage: str, key: str, output_dir) -> dict | None:
+        """캐시 히트면 기록된 마커(outputs 포함)를, 아니면 None을 반환합니다."""
+        marker_path = self._marker_path(stage, output_dir)
+        marker = None
+        if not self.force and marker_path.exists():
+            try:
+                with open(marker_path, "r") as f:
+                    marker = json.load(f)
+            except (OSError, ValueError):
+                marker = None
+
+        outputs = (marker or {}).get("outputs", {})
+        if marker and marker.get("key") == key and all(Path(p).exists() for p in outputs.values()):
+            self._count(stage, "hit")
+            print(f"[cache] {stage}: HIT ({key[:12]}) - 이전 산출물을 재사용합니다.")
+            return marker
+
+        self._count(stage, "miss")
+        reason = "forced" if self.force else "changed or missing"
+        print(f"[cache] {stage}: MISS ({key[:12]}, {reason})")
+        return None
+
+    def record(self, stage: str, key: str, output_dir, outputs: dict, extra: dict | None = None):
+        """단계 산출물과 키를 마커로 기록합니다."""
+        marker_path = self._marker_path(stage, output_dir)
+        marker_path.parent.mkdir(parents=True, exist_ok=True)
+        marker = {"key": key, "outputs": {name: str(p) for name, p in outputs.items()}}
+        if extra:
+            marker.update(extra)
+        tmp_path = marker_path.with_suffix(".json.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(marker, f, indent=4, default=str)
+        tmp_path.replace(marker_path)
+
+    def report(self) -> dict:
+        """단계별 히트/미스 횟수를 출력하고 반환합니다."""
+        for stage, counts in self.stats.items():
+            print(f"[cache] {stage}: hits={counts['hit']} misses={counts['miss']}")
+        return self.stats
@@ -0,0 +1,311 @@
+import hashlib
+import io
+import os
+import shutil
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+from botocore.exceptions import ClientError
+from s3transfer.manager import TransferManager
+
+# S3Manager가 사용하는 boto3 S3 client 메서드 목록
+# 각 backend는 이 메서드들을 boto3와 같은 시그니처/응답 형태로 제공합니다.
+STORAGE_CLIENT_METHODS = (
+    "upload_file",
+    "download_file",
+    "upload_fileobj",
+    "head_object",
+    "get_object",
+    "put_object",
+    "delete_object",
+    "get_paginator",
+)
+
+_PAGE_SIZE = 1000
+
+
+@contextmanager
+def file_lock(path):
+    """path 파일로 프로세스 간 배타 잠금을 잡습니다. (POSIX: fcntl.flock, Windows: msvcrt.locking)
+
+    둘 다 없는 플랫폼에서는 잠금 없이 실행합니다.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a+b") as f:
+        if fcntl is not None:
+            # 잠금은 파일을 닫을 때 해제됨
+            fcntl.flock(f, fcntl.LOCK_EX)
+            yield
+        elif msvcrt is not None:
+            f.seek(0)
+            while True:
+                try:
+                    # LK_LOCK은 약 10초 동안 재시도한 뒤 OSError를 내므로 잡힐 때까지 반복
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            yield
+
+
+def _client_error(code: str, operation: str, message: str) -> ClientError:
+    return ClientError({"Error": {"Code": code, "Message": message}}, operation)
+
+
+def _check_extra_args(extra_args: dict | None, allowed: list):
+    """s3transfer와 같이 허용되지 않은 ExtraArgs 키(IfMatch 등)는 ValueError로 거부합니다."""
+    for key in extra_args or {}:
+        if key not in allowed:
+            raise ValueError(f"Invalid extra_args key '{key}', must be one of: {', '.join(allowed)}")
+
+
+def _check_if_match(if_match: str | None, etag: str, operation: str):
+    if if_match and if_match != etag:
+        raise _client_error("412", operation, "Precondition Failed")
+
+
+def _check_write_conditions(etag: str | None, if_match: str | None, if_none_match: str | None):
+    """조건부 PutObject(IfMatch / IfNoneMatch="*") 검사. etag는 현재 객체의 ETag (없으면 None)"""
+    if if_none_match == "*" and etag is not None:
+        raise _client_error("412", "PutObject", "Precondition Failed")
+    if if_match and if_match != etag:
+        raise _client_error("412", "PutObject", "Precondition Failed")
+
+
+class _ListObjectsPaginator:
+    """list_objects_v2 paginator 호환 객체 (Prefix/StartAfter/Delimiter 지원)"""
+
+    def __init__(self, list_fn):
+        self._list_fn = list_fn
+
+    def paginate(self, Bucket, Prefix="", StartAfter=None, Delimiter=None, **kwargs):
+        objects = [obj for obj in self._list_fn(Bucket, Prefix) if StartAfter is None or obj["Key"] > StartAfter]
+        contents, common_prefixes = [], []
+        for obj in objects:
+            rest = obj["Key"][len(Prefix):]
+            if Delimiter and Delimiter in rest:
+                common = Prefix + rest.split(Delimiter, 1)[0] + Delimiter
+                if not common_prefixes or common_prefixes[-1] != common:
+                    common_prefixes.append(common)
+            else:
+                contents.append(obj)
+
+        if not contents and not common_prefixes:
+            yield {"KeyCount": 0}
+            return
+        for i in range(0, max(len(contents), 1), _PAGE_SIZE):
+            page = {"Contents": contents[i:i + _PAGE_SIZE]} if contents else {}
+            if i == 0 and common_prefixes:
+                page["CommonPrefixes"] = [{"Prefix": p} for p in common_prefixes]
+            page["KeyCount"] = len(page.get("Contents", []))
+            yield page
+
+
+class LocalStorageClient:
+    """로컬 디렉토리({root}/{bucket}/{key})를 S3처럼 사용하는 client
+
+    쓰기는 임시 파일을 만든 뒤 os.replace로 교체하므로 원자적입니다.
+    ETag는 파일의 수정 시각과 크기로 만듭니다.
+    조건부 put_object는 같은 root를 쓰는 프로세스끼리 파일 잠금으로 검사와 교체를 직렬화합니다.
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self._tmp_dir = self.root / ".tmp"
+        self._tmp_dir.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, bucket: str, key: str) -> Path:
+        if ".." in Path(key).parts:
+            raise ValueError(f"Invalid key: {key}")
+        return self.root / bucket / key
+
+    def _existing(self, bucket: str, key: str, operation: str) -> Path:
+        path = self._path(bucket, key)
+        if not path.is_file():
+            raise _client_error("404", operation, "Not Found")
+        return path
+
+    @staticmethod
+    def _etag(stat) -> str:
+        return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+    def _write_atomic(self, bucket: str, key: str, write_fn):
+        path = self._path(bucket, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._tmp_dir / uuid.uuid4().hex
+        try:
+            with open(tmp_path, "wb") as f:
+                write_fn(f)
+            os.replace(tmp_path, path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    def upload_file(self, Filename, Bucket, Key, ExtraArgs=None, Callback=None, Config=None):
+        _check_extra_args(ExtraArgs, TransferManager.ALLOWED_UPLOAD_ARGS)
+
+        def copy(f):
+            with open(Filename, "rb") as src:
+                shutil.copyfileobj(src, f)
+
+        self._write_atomic(Bucket, Key, copy)
+
+    def upload_fileobj(self, Fileobj, Bucket, Key, ExtraArgs=None, Callback=None, Config=None):
+        _check_extra_args(ExtraArgs, TransferManager.ALLOWED_UPLOAD_ARGS)
+        self._write_atomic(Bucket, Key, lambda f: shutil.copyfileobj(Fileobj, f))
+
+    def put_object(self, Bucket, Key, Body=b"", IfMatch=None, IfNoneMatch=None, **kwargs):
+        if isinstance(Body, (bytes, bytearray)):
+            Body = io.BytesIO(Body)
+        if IfMatch is None and IfNoneMatch is None:
+            self._write_atomic(Bucket, Key, lambda f: shutil.copyfileobj(Body, f))
+        else:
+            with file_lock(self._tmp_dir / ".lock"):
+                path = self._path(Bucket, Key)
+                _check_write_conditions(self._etag(path.stat()) if path.is_file() else None, IfMatch, IfNoneMatch)
+                self._write_atomic(Bucket, Key, lambda f: shutil.copyfileobj(Body, f))
+        return {"ETag": self._etag(self._path(Bucket, Key).stat())}
+
+    def download_file(self, Bucket, Key, Filename, ExtraArgs=None, Callback=None, Config=None):
+        _check_extra_args(ExtraArgs, TransferManager.ALLOWED_DOWNLOAD_ARGS)
+        path = self._existing(Bucket, Key, "GetObject")
+        shutil.copyfile(path, Filename)
+
+    def head_object(self, Bucket, Key, **kwargs):
+        stat = self._existing(Bucket, Key, "HeadObject").stat()
+        return {
+            "ETag": self._etag(stat),
+            "ContentLength": stat.st_size,
+            "LastModified": datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc),
+        }
+
+    def get_object(self, Bucket, Key, IfMatch=None, **kwargs):
+        path = self._existing(Bucket, Key, "GetObject")
+        stat = path.stat()
+        _check_if_match(IfMatch, self._etag(stat), "GetObject")
+        return {"Body": open(path, "rb"), "ContentLength": stat.st_size, "ETag": self._etag(stat)}
+
+    def delete_object(self, Bucket, Key, **kwargs):
+        self._path(Bucket, Key).unlink(missing_ok=True)
+        return {}
+
+    def _list(self, bucket: str, prefix: str) -> list[dict]:
+        bucket_dir = self.root / bucket
+        if not bucket_dir.exists():
+            return []
+        objects = []
+        for path in bucket_dir.rglob("*"):
+            if not path.is_file():
+                continue
+            key = path.relative_to(bucket_dir).as_posix()
+            if key.startswith(prefix):
+                stat = path.stat()
+                objects.append({"Key": key, "Size": stat.st_size, "ETag": self._etag(stat)})
+        return sorted(objects, key=lambda obj: obj["Key"])
+
+    def get_paginator(self, operation_name: str):
+        if operation_name != "list_objects_v2":
+            raise NotImplementedError(operation_name)
+        return _ListObjectsPaginator(self._list)
+
+
+# 같은 프로세스의 MemoryStorageClient들이 공유하는 저장소
+_SHARED_MEMORY_STORE: dict = {}
+_SHARED_MEMORY_LOCK = threading.Lock()
+
+
+class MemoryStorageClient:
+    """프로세스 메모리(dict)에 객체를 보관하는 client (테스트/벤치마크용)"""
+
+    def __init__(self, store: dict | None = None):
+        self._store = _SHARED_MEMORY_STORE if store is None else store
+        self._lock = _SHARED_MEMORY_LOCK if store is None else threading.Lock()
+
+    def _put(self, bucket: str, key: str, data: bytes) -> str:
+        etag = f'"{hashlib.md5(data).hexdigest()}"'
+        with self._lock:
+            self._store[(bucket, key)] = (data, etag, datetime.now(timezone.utc))
+        return etag
+
+    def _get(self, bucket: str, key: str, operation: str):
+        with self._lock:
+            item = self._store.get((bucket, key))
+        if item is None:
+            raise _client_error("404", operation, "Not Found")
+        return item
+
+    def upload_file(self, Filename, Bucket, Key, ExtraArgs=None, Callback=None, Config=None):
+        _check_extra_args(ExtraArgs, TransferManager.ALLOWED_UPLOAD_ARGS)
+        with open(Filename, "rb") as f:
+            self._put(Bucket, Key, f.read())
+
+    def upload_fileobj(self, Fileobj, Bucket, Key, ExtraArgs=None, Callback=None, Config=None):
+        _check_extra_args(ExtraArgs, TransferManager.ALLOWED_UPLOAD_ARGS)
+        buffer = io.BytesIO()
+        shutil.copyfileobj(Fileobj, buffer)
+        self._put(Bucket, Key, buffer.getvalue())
+
+    def put_object(self, Bucket, Key, Body=b"", IfMatch=None, IfNoneMatch=None, **kwargs):
+        data = bytes(Body) if isinstance(Body, (bytes, bytearray)) else Body.read()
+        if IfMatch is None and IfNoneMatch is None:
+            return {"ETag": self._put(Bucket, Key, data)}
+        etag = f'"{hashlib.md5(data).hexdigest()}"'
+        with self._lock:
+            current = self._store.get((Bucket, Key))
+            _check_write_conditions(current[1] if current else None, IfMatch, IfNoneMatch)
+            self._store[(Bucket, Key)] = (data, etag, datetime.now(timezone.utc))
+        return {"ETag": etag}
+
+    def download_file(self, Bucket, Key, Filename, ExtraArgs=None, Callback=None, Config=None):
+        _check_extra_args(ExtraArgs, TransferManager.ALLOWED_DOWNLOAD_ARGS)
+        data, etag, _ = self._get(Bucket, Key, "GetObject")
+        with open(Filename, "wb") as f:
+            f.write(data)
+
+    def head_object(self, Bucket, Key, **kwargs):
+        data, etag, last_modified = self._get(Bucket, Key, "HeadObject")
+        return {"ETag": etag, "ContentLength": len(data), "LastModified": last_modified}
+
+    def get_object(self, Bucket, Key, IfMatch=None, **kwargs):
+        data, etag, _ = self._get(Bucket, Key, "GetObject")
+        _check_if_match(IfMatch, etag, "GetObject")
+        return {"Body": io.BytesIO(data), "ContentLength": len(data), "ETag": etag}
+
+    def delete_object(self, Bucket, Key, **kwargs):
+        with self._lock:
+            self._store.pop((Bucket, Key), None)
+        return {}
+
+    def _list(self, bucket: str, prefix: str) -> list[dict]:
+        with self._lock:
+            items = [(key, data, etag) for (b, key), (data, etag, _) in self._store.items() if b == bucket]
+        return sorted(
+            ({"Key": key, "Size": len(data), "ETag": etag} for key, data, etag in items if key.startswith(prefix)),
+            key=lambda obj: obj["Key"],
+        )
+
+    def get_paginator(self, operation_name: str):
+        if operation_name != "list_objects_v2":
+            raise NotImplementedError(operation_name)
+        return _ListObjectsPaginator(self._list)
+
+
+STORAGE_BACKENDS = ("s3", "local", "memory")
@@ -1,5 +1,7 @@
+import io
 import os
 from datetime import datetime
+from pathlib import Path
 
 import pandas as pd
 
@@ -23,4 +25,195 @@ def save_to_local(base_dir: str, df: pd.DataFrame) -> tuple[bool, str]:
 
     except Exception as e:
         print(f"로컬 저장 실패: {e}")
-        return False, ""
\ No newline at end of file
+        return False, ""
+
+# 단계별 저장 포맷과 확장자
+STORAGE_FORMATS = {
+    "csv": ".csv",
+    "parquet": ".parquet",
+    "arrow": ".arrow",
+}
+
+
+# 파일 단위 압축과 확장자 (csv 전송/저장에 사용, pandas가 확장자로 자동 해제)
+COMPRESSION_SUFFIXES = {
+    "gzip": ".gz",
+    "zstd": ".zst",
+}
+
+
+def storage_format(path) -> str:
+    """파일 확장자로 저장 포맷을 판별합니다. (.csv.gz 처럼 압축 확장자는 건너뜀, 알 수 없으면 csv)"""
+    suffixes = [suffix.lower() for suffix in Path(str(path)).suffixes]
+    if suffixes and suffixes[-1] in COMPRESSION_SUFFIXES.values():
+        suffixes = suffixes[:-1]
+    suffix = suffixes[-1] if suffixes else ""
+    for fmt, ext in STORAGE_FORMATS.items():
+        if suffix == ext:
+            return fmt
+    return "csv"
+
+
+def read_table(path, columns: list[str] | None = None, dtype: dict | None = None, **csv_kwargs) -> pd.DataFrame:
+    """포맷에 맞게 테이블을 읽습니다. columns 지정 시 해당 컬럼만 읽습니다 (없는 컬럼은 무시)."""
+    fmt = storage_format(path)
+    if fmt == "csv":
+        usecols = (lambda c: c in columns) if columns is not None else None
+        return pd.read_csv(path, usecols=usecols, dtype=dtype, **csv_kwargs)
+
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+
+    if fmt == "parquet":
+        schema_names = pq.read_schema(path).names
+    else:
+        with pa.memory_map(str(path)) as source:
+            schema_names = pa.ipc.open_file(source).schema.names
+    if columns is not None:
+        columns = [c for c in schema_names if c in columns]
+
+    if fmt == "parquet":
+        df = pq.read_table(path, columns=columns).to_pandas()
+    else:
+        df = feather.read_table(path, columns=columns, memory_map=True).to_pandas()
+    return df.astype(dtype) if dtype else df
+
+
+def iter_table(path, columns: list[str] | None = None, chunksize: int = 100_000, dtype: dict | None = None,
+               **csv_kwargs):
+    """테이블을 chunksize 행 단위의 DataFrame으로 나눠 읽습니다. (메모리 사용량 일정)"""
+    fmt = storage_format(path)
+    if fmt == "csv":
+        usecols = (lambda c: c in columns) if columns is not None else None
+        with pd.read_csv(path, usecols=usecols, dtype=dtype, chunksize=chunksize, **csv_kwargs) as reader:
+            yield from reader
+        return
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    def _to_frame(batch):
+        df = batch.to_pandas()
+        return df.astype({c: t for c, t in dtype.items() if c in df.columns}) if dtype else df
+
+    if fmt == "parquet":
+        parquet_file = pq.ParquetFile(path)
+        names = parquet_file.schema_arrow.names
+        selected = [c for c in names if c in columns] if columns is not None else None
+        for batch in parquet_file.iter_batches(batch_size=chunksize, columns=selected):
+            yield _to_frame(batch)
+        return
+
+    with pa.memory_map(str(path)) as source:
+        reader = pa.ipc.open_file(source)
+        names = reader.schema.names
+        selected = [c for c in names if c in columns] if columns is not None else names
+        for i in range(reader.num_record_batches):
+            batch = reader.get_batch(i).select(selected)
+            for offset in range(0, batch.num_rows, chunksize):
+                yield _to_frame(batch.slice(offset, chunksize))
+
+
+def write_table(df: pd.DataFrame, path, compression: str | None = None, fmt: str | None = None, **csv_kwargs) -> str:
+    """포맷에 맞게 테이블을 씁니다. compression은 parquet/arrow에만 적용됩니다.
+
+    path에는 경로 대신 바이너리 파일 객체를 넘길 수 있으며, 이때 fmt로 포맷을 지정합니다.
+    """
+    fmt = fmt or storage_format(path)
+    if fmt == "csv" and hasattr(path, "write"):
+        text = io.TextIOWrapper(path, encoding=csv_kwargs.pop("encoding", "utf-8"), newline="")
+        df.to_csv(text, index=False, **csv_kwargs)
+        text.flush()
+        text.detach()
+    elif fmt == "csv":
+        df.to_csv(path, index=False, **csv_kwargs)
+    elif fmt == "parquet":
+        df.to_parquet(path, index=False, compression=compression or "zstd")
+    else:
+        df.reset_index(drop=True).to_feather(path, compression=compression or "zstd")
+    return str(path)
+
+
+def _to_strings(values: pd.Series) -> pd.Series:
+    """결측은 None으로, 나머지 값은 문자열로 변환합니다."""
+    return values.astype(object).where(values.notna(), None).map(lambda v: v if v is None else str(v))
+
+
+class TableWriter:
+    """DataFrame 배치를 하나의 파일에 이어 쓰는 writer (csv/parquet/arrow)
+
+    첫 배치의 컬럼과 타입을 스키마로 고정하고, 이후 배치는 해당 스키마로 맞춥니다.
+    첫 배치에서 전부 비어 있던 컬럼은 타입을 알 수 없으므로 문자열로 두고, 이후 배치의 값도 문자열로 변환합니다.
+    """
+
+    def __init__(self, path, compression: str | None = None, encoding: str = "utf-8"):
+        self.path = Path(path)
+        self.fmt = storage_format(path)
+        self.compression = compression or "zstd"
+        self.encoding = encoding
+        self.columns = None
+        self.rows = 0
+        self._file = None
+        self._writer = None
+        self._schema = None
+        self._string_columns = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def write(self, df: pd.DataFrame):
+        if self.columns is None:
+            self.columns = list(df.columns)
+        else:
+            df = df.reindex(columns=self.columns)
+
+        if self.fmt == "csv":
+            if self._file is None:
+                self._file = open(self.path, "w", encoding=self.encoding, newline="")
+                df.to_csv(self._file, index=False)
+            else:
+                df.to_csv(self._file, index=False, header=False)
+        else:
+            import pyarrow as pa
+
+            if self._schema is None:
+                schema = pa.Schema.from_pandas(df, preserve_index=False)
+                # 첫 배치에서 전부 비어 있던 컬럼은 문자열로 간주 (NaN만 있어 float64로 읽힌 컬럼 포함)
+                self._string_columns = [column for column in df.columns if df[column].isna().all()]
+                self._schema = pa.schema(
+                    [f.with_type(pa.string()) if f.name in self._string_columns else f for f in schema]
+                )
+            if self._string_columns:
+                df = df.assign(**{column: _to_strings(df[column]) for column in self._string_columns})
+            table = pa.Table.from_pandas(df, schema=self._schema, preserve_index=False)
+            if self._writer is None:
+                self._writer = self._open_arrow_writer()
+            self._writer.write_table(table)
+        self.rows += len(df)
+
+    def _open_arrow_writer(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if self.fmt == "parquet":
+            return pq.ParquetWriter(self.path, self._schema, compression=self.compression)
+        options = pa.ipc.IpcWriteOptions(compression=self.compression)
+        return pa.ipc.new_file(str(self.path), self._schema, options=options)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self.columns is None:
+            # 한 번도 쓰지 않았다면 빈 파일이라도 남긴다
+            if self.fmt == "csv":
+                self.path.touch()
+            else:
+                write_table(pd.DataFrame(), self.path, compression=self.compression)
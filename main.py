@@ -1,131 +1,747 @@
+import json
 import os
 import fire
 import wandb
+import time
 import traceback
-from datetime import datetime
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
 from dotenv import load_dotenv
 
-from core.config import TMDB_API_KEY
+from core.config import (
+    METRICS_PORT,
+    MODEL_FORMAT,
+    PROCESSED_FORMAT,
+    RAW_FORMAT,
+    S3_UPLOAD_COMPRESSION,
+    TMDB_API_KEY,
+    TMDB_MAX_WORKERS,
+    TMDB_REQUESTS_PER_SECOND,
+    TRAIN_CV_FOLDS,
+    TRAIN_CV_METHOD,
+)
+from core.metrics import (
+    PIPELINE_ERRORS,
+    PIPELINE_EXECUTION_DURATION,
+    PIPELINE_RUNS,
+    flush_textfile,
+    start_http_server,
+    track_stage,
+)
+from core.profiler import PROFILER, profile_step
 from core.s3_client import S3Manager
+from core.stage_cache import StageCache
+from core.utils import COMPRESSION_SUFFIXES, STORAGE_FORMATS
+from src.archive import ARCHIVE_INDEX_KEY, ArchiveIndex, index_row
+from src.artifact import model_files
 from src.collector import TMDBCollector
-from src.preprocessor import Preprocessor
+from src.predict import BatchPredictor
+from src.preprocessor import FEATURES, PROCESSED_DTYPES, TARGET, Preprocessor
+from src.registry import CHAMPION_ARTIFACT_KEY, CHAMPION_METRICS_KEY, CHAMPION_MODEL_KEY, ModelRegistry
+from src.server import PredictionServer
 from src.train import ModelTrainer
 
 class Pipeline:
-    def __init__(self):
+    def __init__(
+        self,
+        raw_format=None,
+        processed_format=None,
+        force=False,
+        date_str=None,
+        work_dir="data",
+        upload_compression=None,
+        storage=None,
+        profile=False,
+        cprofile=False,
+    ):
         load_dotenv()
-        self.date_str = datetime.now().strftime("%Y%m%d")
-        self.s3 = S3Manager()
-        self.collector = TMDBCollector(TMDB_API_KEY)
-        self.preprocessor = Preprocessor()
-        self.trainer = ModelTrainer(target_column='vote_average')
+        # date_str 미지정 시 오늘 날짜, work_dir은 로컬 작업 디렉토리
+        self.date_str = str(date_str) if date_str else datetime.now().strftime("%Y%m%d")
+        self.work_dir = work_dir
+        # 단계별 저장 포맷 (csv/parquet/arrow)
+        self.raw_format = raw_format or RAW_FORMAT
+        self.processed_format = processed_format or PROCESSED_FORMAT
+        # CSV 업로드 시 압축 방식 (gzip/zstd, None이면 압축 안 함)
+        self.upload_compression = upload_compression or S3_UPLOAD_COMPRESSION or None
+        # storage: 저장소 backend (s3/local/memory, None이면 STORAGE_BACKEND 설정값)
+        self.storage = storage
+        # profile=True 이면 단계/하위 단계별 시간, CPU, 메모리를 {work_dir}/profiles/{run_id}.json 에 기록
+        # cprofile=True 이면 단계별 cProfile 호출 트리(.prof)도 함께 저장
+        if profile or cprofile:
+            PROFILER.start(f"{work_dir}/profiles", label=self.date_str, cprofile=cprofile)
+        self.s3 = S3Manager(backend=storage)
+        self.archive = ArchiveIndex(self.s3, f"{work_dir}/archive")
+        self.collector = TMDBCollector(
+            TMDB_API_KEY,
+            max_workers=TMDB_MAX_WORKERS,
+            requests_per_second=TMDB_REQUESTS_PER_SECOND,
+            data_dir=work_dir,
+        )
+        self.preprocessor = Preprocessor(data_dir=work_dir)
+        self.trainer = ModelTrainer(
+            target_column=TARGET,
+            feature_columns=FEATURES,
+            cv_folds=TRAIN_CV_FOLDS,
+            cv_method=TRAIN_CV_METHOD,
+            model_format=MODEL_FORMAT,
+        )
         
+        # 입력이 바뀌지 않은 단계는 건너뛰는 캐시 (--force 로 무시)
+        self.cache = StageCache(force=force)
+
+        # fused 모드에서 사용할 백그라운드 저장 작업
+        self._background = None
+        self._pending = []
+
         # 로컬 작업 디렉토리 생성 보장
-        os.makedirs("data/raw", exist_ok=True)
-        os.makedirs("data/processed", exist_ok=True)
-        os.makedirs("data/output", exist_ok=True)
+        os.makedirs(f"{work_dir}/raw", exist_ok=True)
+        os.makedirs(f"{work_dir}/processed", exist_ok=True)
+        os.makedirs(f"{work_dir}/output", exist_ok=True)
+
+    @track_stage("collect")
+    @profile_step("collect")
+    def collect(self, page_limit=20, max_workers=None, stream=False, resume=True):
+        """Step 1: 데이터 수집 및 S3 업로드
 
-    def collect(self, page_limit=20):
-        """Step 1: 데이터 수집 및 S3 업로드"""
+        max_workers로 동시 요청 수를 지정하고, stream=True 이면 페이지를 받는 즉시
+        raw CSV에 이어 써서 page_limit과 무관하게 메모리 사용량을 일정하게 유지합니다.
+        resume=True 이면 페이지별 체크포인트를 남기고, 같은 날짜로 재실행할 때 누락된 페이지만 수집합니다.
+        체크포인트 수집도 페이지를 받는 즉시 파일로 쓰므로 메모리 사용량이 일정하며, stream=True와 함께 써도 같게 동작합니다.
+        resume=False 이면 같은 날짜의 기존 체크포인트를 삭제한 뒤 처음부터 수집합니다.
+        """
         print(f"--- Step 1: Fetching data ({self.date_str}) ---")
+        raw_dir = f"{self.work_dir}/raw/{self.date_str}"
+        cache_key = self.cache.key([], {"date": self.date_str, "page_limit": page_limit, "format": self.raw_format})
+        cached = self.cache.lookup("collect", cache_key, raw_dir)
+        if cached:
+            return cached["outputs"]["raw"]
+
         try:
-            df_raw = self.collector.fetch_popular_movies(page_limit=page_limit)
-            local_raw = self.collector.save_raw_data(df_raw, self.date_str)
-            self.s3.upload_file(local_raw, f"raw/{self.date_str}")
+            if resume:
+                local_raw, _ = self.collector.collect_resumable(
+                    self.date_str, page_limit=page_limit, max_workers=max_workers, fmt=self.raw_format
+                )
+            else:
+                # 이전 체크포인트의 페이지가 나중의 resume 실행에 섞이지 않도록 삭제
+                self.collector.clear_checkpoint(self.date_str)
+                if stream:
+                    batches = self.collector.iter_popular_movies(page_limit=page_limit, max_workers=max_workers)
+                    local_raw, _ = self.collector.save_raw_stream(batches, self.date_str, fmt=self.raw_format)
+                else:
+                    df_raw = self.collector.fetch_popular_movies(page_limit=page_limit, max_workers=max_workers)
+                    local_raw = self.collector.save_raw_data(df_raw, self.date_str, fmt=self.raw_format)
+            if not self.s3.upload_file(local_raw, f"raw/{self.date_str}", compression=self.upload_compression):
+                print(f"Error: Raw data upload to S3 failed: raw/{self.date_str}")
+                return local_raw
             print(f"Success: Raw data uploaded to S3: raw/{self.date_str}")
+            # 누락된 페이지가 있으면 캐시에 남기지 않아야 재실행 시 해당 페이지를 다시 수집합니다.
+            if self.collector.failed_pages:
+                print(f"Warning: {len(self.collector.failed_pages)} pages missing, collect result is not cached")
+            else:
+                self.cache.record("collect", cache_key, raw_dir, {"raw": local_raw})
             return local_raw
         except Exception as e:
             print(f"Error: Collection failed: {e}")
             traceback.print_exc()
 
-    def preprocess(self, s3_raw_path=None):
-        """Step 2: S3에서 Raw 데이터 다운로드 후 전처리"""
+    @track_stage("preprocess")
+    @profile_step("preprocess")
+    def preprocess(self, s3_raw_path=None, chunksize=None):
+        """Step 2: S3에서 Raw 데이터 다운로드 후 전처리
+
+        s3_raw_path='latest' 이면 가장 최근 raw 스냅샷을, chunksize 지정 시 chunk 단위 스트리밍 처리를 사용합니다.
+        """
         print(f"--- Step 2: Preprocessing ({self.date_str}) ---")
         
         # 1. S3 경로가 지정되지 않았다면 기본값 설정
+        raw_filename = f"{self.date_str}{STORAGE_FORMATS[self.raw_format]}"
+        raw_key_suffix = STORAGE_FORMATS[self.raw_format] + self._compression_suffix(self.raw_format)
         if not s3_raw_path:
-            s3_raw_path = f"raw/{self.date_str}/{self.date_str}.csv"
+            s3_raw_path = f"raw/{self.date_str}/{self.date_str}{raw_key_suffix}"
+        elif s3_raw_path == "latest":
+            # key 인덱스로 가장 최근 raw 스냅샷을 찾음
+            s3_raw_path = self.s3.latest_key("raw/", suffix=raw_key_suffix)
+            if s3_raw_path is None:
+                print("Error: No raw snapshot found in S3 under raw/")
+                return None
         
-        local_raw_path = f"data/raw/{self.date_str}/{self.date_str}.csv"
+        local_raw_dir = f"{self.work_dir}/raw/{self.date_str}"
+        local_raw_path = f"{local_raw_dir}/{raw_filename}"
 
         try:
             # 2. S3에서 파일 다운로드 
             print(f"Downloading raw data from S3: {s3_raw_path}")
-            self.s3.download_file(s3_raw_path, local_raw_path)
+            downloaded, downloaded_path = self.s3.download_file(s3_raw_path, local_raw_dir)
+            if downloaded:
+                local_raw_path = downloaded_path
+
+            processed_dir = f"{self.work_dir}/processed/{self.date_str}"
+            cache_key = self.cache.key(
+                [local_raw_path],
+                {"features": FEATURES, "target": TARGET, "dtypes": PROCESSED_DTYPES, "format": self.processed_format},
+            )
+            cached = self.cache.lookup("preprocess", cache_key, processed_dir)
+            if cached:
+                return cached["outputs"]["processed"]
             
             # 3. 전처리 수행
-            df_processed = self.preprocessor.transform(local_raw_path)
-            local_processed = self.preprocessor.save_processed_data(df_processed, self.date_str)
+            if chunksize:
+                local_processed = self.preprocessor.transform_chunked(
+                    local_raw_path,
+                    self.preprocessor.processed_path(self.date_str, self.processed_format),
+                    chunksize=chunksize,
+                )
+            else:
+                df_processed = self.preprocessor.transform(local_raw_path)
+                local_processed = self.preprocessor.save_processed_data(
+                    df_processed, self.date_str, fmt=self.processed_format
+                )
             
             # 4. 결과 업로드
-            self.s3.upload_file(local_processed, f"processed/{self.date_str}")
+            if not self.s3.upload_file(
+                local_processed, f"processed/{self.date_str}", compression=self.upload_compression
+            ):
+                print(f"Error: Processed data upload to S3 failed: processed/{self.date_str}")
+                return local_processed
             print(f"Success: Processed data uploaded to S3: processed/{self.date_str}")
+            self.cache.record("preprocess", cache_key, processed_dir, {"processed": local_processed})
             return local_processed
         except Exception as e:
             print(f"Error: Preprocessing failed: {e}")
             traceback.print_exc()
 
-    def train(self, s3_processed_path=None, model_name="v1"):
+    def train(
+        self,
+        s3_processed_path=None,
+        model_name="v1",
+        promote=True,
+        incremental=False,
+        window=None,
+        sharded=False,
+        sweep=False,
+        relist=False,
+    ):
+        """sharded=True 이면 S3의 processed 스냅샷 중 최근 window개(None이면 전체)를 받아
+        파일별 부분 통계를 프로세스 풀에서 계산하고 병합해 학습합니다. (전체 데이터를 메모리에 올리지 않음)
+        sweep=True 이면 여러 후보 모델을 병렬로 학습해 holdout 성능이 가장 좋은 모델을 챔피언 비교에 사용합니다.
+        relist=True 이면 sharded/incremental 입력 목록을 key 인덱스 증분 조회 대신 S3 전체 목록으로 다시 만듭니다.
+        """
+        if sum(map(bool, (incremental, sharded, sweep))) > 1:
+            raise ValueError("incremental, sharded, sweep은 함께 사용할 수 없습니다.")
+        data = str(self.preprocessor.processed_path(self.date_str, self.processed_format))
+        if sharded:
+            data = self._sync_processed_history(window, full=relist)
+        elif s3_processed_path or not os.path.isfile(data):
+            # backfill처럼 새 작업 디렉토리에서 실행하면 processed 파일이 로컬에 없으므로 S3에서 받아옴
+            if not s3_processed_path:
+                processed_suffix = self._compression_suffix(self.processed_format)
+                s3_processed_path = f"processed/{self.date_str}/{os.path.basename(data)}{processed_suffix}"
+            print(f"Downloading processed data from S3: {s3_processed_path}")
+            downloaded, downloaded_path = self.s3.download_file(s3_processed_path, os.path.dirname(data))
+            if downloaded:
+                data = downloaded_path
+            elif not os.path.isfile(data):
+                print(f"Error: Processed data not found locally or in S3: {s3_processed_path}")
+                return None
+        return self._train(
+            data, model_name=model_name, promote=promote, incremental=incremental, window=window, sweep=sweep,
+            relist=relist,
+        )
+
+    @track_stage("train")
+    @profile_step("train")
+    def _train(self, data, model_name="v1", promote=True, incremental=False, window=None, sweep=False, relist=False):
+        """Step 3 & 4: data(processed 파일 경로, 파일 경로 list 또는 DataFrame)로 학습 후 챔피언 비교
+
+        promote=False 이면 아카이브만 남기고 챔피언 비교/교체는 건너뜁니다.
+        incremental=True 이면 날짜별 충분통계(S3 stats/{date}/stats.npz)를 병합해
+        최근 window개 스냅샷(None이면 전체)으로 학습하며, 과거 raw/processed 데이터는 읽지 않습니다.
+        """
         print(f"--- Step 3 & 4: Training & Champion Check ({self.date_str}) ---")
         
         # 1. 경로 설정 (반드시 파일명까지 포함)
-        champ_dir = "data/champion"
-        out_dir = "data/output"
+        champ_dir = f"{self.work_dir}/champion"
+        out_dir = f"{self.work_dir}/output"
+        stats_dir = f"{self.work_dir}/stats"
+
+        # 증분 학습이면 다른 날짜의 충분통계를 먼저 받아오고, 그 목록도 캐시 키에 포함
+        snapshot_keys = self._sync_stats(stats_dir, full=relist) if incremental else []
+
+        cache_key = self.cache.key(
+            data if isinstance(data, list) else [data],
+            {
+                "date": self.date_str,
+                "model_name": model_name,
+                "target": self.trainer.target_column,
+                "features": self.trainer.feature_columns,
+                "model": self.trainer.model.get_params(),
+                "promote": promote,
+                "incremental": incremental,
+                "window": window,
+                "snapshots": snapshot_keys,
+                "sweep": sweep,
+                "cv": [self.trainer.cv_folds, self.trainer.cv_method],
+                "model_format": self.trainer.model_format,
+            },
+        )
+        cached = self.cache.lookup("train", cache_key, out_dir)
+        if cached:
+            with open(cached["outputs"]["metrics"], 'r') as f:
+                return json.load(f)
+
         local_champ_json = f"{champ_dir}/champion_model.json"
         local_champ_pkl = f"{champ_dir}/champion_model.pkl"
 
-        run = wandb.init(
-            project="tmdb-mlops",
-            name=f"run-{self.date_str}-{model_name}",
-            config={"date": self.date_str}
-        )
+        with profile_step("wandb_init"):
+            run = wandb.init(
+                project="tmdb-mlops",
+                name=f"run-{self.date_str}-{model_name}",
+                config={"date": self.date_str}
+            )
         
-        # 2. S3에서 기존 챔피언 다운로드 시도
-        try:
-            print("Checking for existing champion in S3...")
-            # S3에서 파일을 다운로드해보고, 없으면 except로 이동
-            self.s3.download_file("models/champion/champion_model.json", local_champ_json)
-            self.s3.download_file("models/champion/champion_model.pkl", local_champ_pkl)
-        except Exception as e:
-            print(f"No existing champion found in S3 (This is normal for the first run).")
+        # 2. S3에서 기존 챔피언 지표(json)만 다운로드 (비교에는 mse만 필요하고, 가중치(pkl)는 교체 시 새로 씀)
+        # 모델 파일은 predict/serve 등 실제로 사용하는 쪽에서만 받음
+        if promote:
+            print("Checking for existing champion metrics in S3...")
+            results = self.s3.download_many([("models/champion/champion_model.json", local_champ_json)])
+            if not all(result["ok"] for result in results):
+                # 이전 실행에서 남은 로컬 json으로 비교하지 않도록 삭제
+                if os.path.isfile(local_champ_json):
+                    os.remove(local_champ_json)
+                print(f"No existing champion found in S3 (This is normal for the first run).")
 
         # 3. 모델 학습
-        local_processed_path = f"data/processed/{self.date_str}/processed_data.csv"
-        metrics = self.trainer.train(local_processed_path)
-        wandb.log(metrics)
+        stats_uploads = []
+        if incremental:
+            metrics = self.trainer.train_incremental(data, self.date_str, stats_dir, window=window)
+            stats_uploads.append((f"{stats_dir}/{self.date_str}.npz", f"stats/{self.date_str}/stats.npz"))
+        elif isinstance(data, list):
+            metrics = self.trainer.train_sharded(data)
+        elif sweep:
+            metrics = self.trainer.train_sweep(data)
+        else:
+            metrics = self.trainer.train(data)
+        # 목록형 지표(fold별 값, 후보 목록 등)는 아래에서 따로 기록
+        wandb.log({name: value for name, value in metrics.items() if not isinstance(value, list) or name == "features"})
+        for fold, seconds in enumerate(metrics.get("fold_times", [])):
+            wandb.log({"cv/fold": fold, "cv/fold_mse": metrics["fold_mse"][fold], "cv/fold_seconds": seconds})
+        for candidate in metrics.get("candidates", []):
+            wandb.log({f"sweep/{candidate['name']}/{name}": candidate[name] for name in ("mse", "r2", "fit_seconds")})
 
         # 4. 모델 저장
-        print(f"Archiving current model to S3: models/archive/{self.date_str}/")
-        self.trainer.save_model(out_dir, metrics) # data/output/{date}/ 에 저장됨
-        
-        self.s3.upload_file(f"{out_dir}/model.pkl", f"models/archive/{self.date_str}/model.pkl")
-        self.s3.upload_file(f"{out_dir}/metrics.json", f"models/archive/{self.date_str}/metrics.json")
+        self.trainer.save_model(out_dir, metrics) # data/output/ 에 저장됨
+        # mmap 포맷이면 .pkl(joblib)과 함께 .mlmodel 아티팩트도 올림
+        uploads = [
+            (str(path), f"models/archive/{self.date_str}/{path.name}")
+            for path in model_files(f"{out_dir}/model.pkl", self.trainer.model_format)
+        ] + [(f"{out_dir}/metrics.json", f"models/archive/{self.date_str}/metrics.json")] + stats_uploads
 
-        # 5. 챔피언 비교 수행
-        print("Comparing current model with champion...")
-        update_needed = self.trainer.update_champion_if_better(champ_dir, metrics)
-        print(f"Update needed? : {update_needed}")
+        # 5. 챔피언 비교 수행 (챔피언 json은 pkl 업로드가 끝난 뒤 마지막에 올림)
+        champion_json_upload = []
+        if not promote:
+            print("INFO: promote=False. Champion comparison skipped.")
+        else:
+            print("Comparing current model with champion...")
+            update_needed = self.trainer.update_champion_if_better(champ_dir, metrics)
+            print(f"Update needed? : {update_needed}")
 
-        if (update_needed):
-            print("SUCCESS: New champion detected. Starting S3 upload...")
-            
-            if os.path.exists(local_champ_json) and os.path.exists(local_champ_pkl):
-                self.s3.upload_file(local_champ_json, "models/champion/champion_model.json")
-                self.s3.upload_file(local_champ_pkl, "models/champion/champion_model.pkl")
-                print("S3 Upload Complete: models/champion/champion_model.json")
+            if (update_needed):
+                print("SUCCESS: New champion detected. Adding champion files to S3 upload...")
+                uploads += [
+                    (str(path), f"models/champion/{path.name}")
+                    for path in model_files(local_champ_pkl, self.trainer.model_format)
+                ]
+                champion_json_upload.append((local_champ_json, "models/champion/champion_model.json"))
             else:
-                print(f"ERROR: Files to upload not found! Path: {local_champ_json}")
-        else:
-            print("INFO: Champion maintained. No S3 upload performed.")
+                print("INFO: Champion maintained. No champion upload performed.")
+
+        # 6. 아카이브/챔피언 파일을 한 번에 병렬 업로드
+        # 챔피언 json은 모델 교체 신호(ModelRegistry가 ETag를 폴링)이므로 pkl이 올라간 뒤에만 업로드
+        total = len(uploads) + len(champion_json_upload)
+        print(f"Uploading {total} artifacts to S3 (archive: models/archive/{self.date_str}/)")
+        results = self.s3.upload_many(uploads)
+        if champion_json_upload:
+            if all(result["ok"] for result in results):
+                results += self.s3.upload_many(champion_json_upload)
+            else:
+                print("ERROR: Champion model upload failed. Champion metrics are not updated in S3.")
+        for result in results:
+            if result["ok"]:
+                print(f"S3 Upload Complete: {result['key']} ({result['bytes']} bytes, {result['seconds']:.2f}s)")
+            else:
+                print(f"ERROR: S3 upload failed: {result['key']} ({result['error']})")
+
+        # 7. 아카이브 모델이 올라갔으면 아카이브 인덱스에 이번 학습 결과를 한 행 추가
+        if results[0]["ok"]:
+            promoted = any(result["ok"] and result["key"] == CHAMPION_METRICS_KEY for result in results)
+            row = index_row(
+                self.date_str, model_name, metrics, model=type(self.trainer.model).__name__, promoted=promoted
+            )
+            # 인덱스 갱신 실패는 학습 결과에 영향이 없으므로 보고만 함 (leaderboard --rebuild로 다시 채울 수 있음)
+            try:
+                if self.archive.append([row]):
+                    print(f"Archive index updated: {ARCHIVE_INDEX_KEY}")
+            except Exception as e:
+                print(f"ERROR: Archive index update failed: {ARCHIVE_INDEX_KEY} ({e})")
 
         wandb.finish()
+        # 업로드가 하나라도 실패했으면 캐시에 남기지 않아야 재실행 시 다시 학습/업로드합니다.
+        if all(result["ok"] for result in results):
+            self.cache.record(
+                "train", cache_key, out_dir, {"model": f"{out_dir}/model.pkl", "metrics": f"{out_dir}/metrics.json"}
+            )
+        else:
+            print("Warning: Some uploads failed, train result is not cached")
+        return metrics
+
+    @track_stage("predict")
+    @profile_step("predict")
+    def predict(self, input_path=None, output_path=None, chunksize=100_000, model_path=None, s3_output_key=None):
+        """챔피언 모델을 한 번 로드해 입력을 chunk 단위로 채점하고 결과를 파일에 이어 씁니다.
+
+        input_path는 로컬 경로 또는 S3 key (생략 시 오늘 raw 스냅샷), model_path를 생략하면 S3 챔피언 모델을 사용합니다.
+        s3_output_key를 지정하면 결과 파일을 해당 key로 업로드합니다.
+        """
+        print(f"--- Predict: Batch scoring with champion ({self.date_str}) ---")
+        if model_path is None:
+            # mmap 포맷이면 아티팩트를 먼저 받고, 없으면(이전 챔피언) .pkl을 사용
+            keys = [CHAMPION_ARTIFACT_KEY] if self.trainer.model_format == "mmap" else []
+            for key in keys + [CHAMPION_MODEL_KEY]:
+                ok, model_path = self.s3.download_file(key, f"{self.work_dir}/champion")
+                if ok:
+                    break
+            if not ok:
+                print("Error: Champion model not found in S3.")
+                return None
+
+        if input_path is None:
+            raw_key_suffix = STORAGE_FORMATS[self.raw_format] + self._compression_suffix(self.raw_format)
+            input_path = f"raw/{self.date_str}/{self.date_str}{raw_key_suffix}"
+        if not os.path.exists(input_path):
+            print(f"Downloading scoring input from S3: {input_path}")
+            ok, input_path = self.s3.download_file(input_path, f"{self.work_dir}/predict/{self.date_str}")
+            if not ok:
+                return None
+
+        output_path = output_path or f"{self.work_dir}/predictions/{self.date_str}/predictions.csv"
+        try:
+            predictor = BatchPredictor.from_path(model_path)
+            result = predictor.score_file(input_path, output_path, chunksize=chunksize)
+        except Exception as e:
+            print(f"Error: Batch scoring failed: {e}")
+            traceback.print_exc()
+            return None
+        print(
+            f"Scored {result['rows']} rows in {result['seconds']:.2f}s "
+            f"({result['rows_per_sec']:,.0f} rows/sec) -> {result['output']}"
+        )
 
+        if s3_output_key and result["rows"]:
+            upload = self.s3.upload_many([(output_path, s3_output_key)])[0]
+            if not upload["ok"]:
+                print(f"ERROR: S3 upload failed: {s3_output_key} ({upload['error']})")
+                return None
+            print(f"Success: Predictions uploaded to S3: {s3_output_key}")
+        return result
+
+    def serve(self, host="0.0.0.0", port=8000, max_batch_size=256, max_wait_ms=2.0, model_path=None,
+              reload_interval=30.0):
+        """챔피언 모델을 메모리에 올려 두고 HTTP 예측 서버를 실행합니다. (/health, /ready, /predict)
+
+        동시에 들어온 요청은 max_wait_ms 동안 최대 max_batch_size 행까지 모아 한 번에 예측합니다.
+        model_path를 생략하면 reload_interval(초)마다 S3 챔피언을 확인해, 바뀌었으면 재시작 없이 교체합니다.
+        챔피언을 찾지 못해도 서버는 뜨지만 /ready는 모델이 로드될 때까지 503을 반환합니다.
+        """
+        print(f"--- Serve: Online prediction server (port {port}) ---")
+        options = {"host": host, "port": int(port), "max_batch_size": int(max_batch_size),
+                   "max_wait_ms": float(max_wait_ms)}
+        if model_path:
+            server = PredictionServer(BatchPredictor.from_path(model_path), **options)
+        else:
+            keys = {"model_key": CHAMPION_ARTIFACT_KEY, "fallback_model_key": CHAMPION_MODEL_KEY}
+            registry = ModelRegistry(
+                self.s3, f"{self.work_dir}/champion/versions", poll_interval=float(reload_interval),
+                **(keys if self.trainer.model_format == "mmap" else {})
+            )
+            if not registry.check():
+                print("Warning: Champion model not loaded yet. /ready returns 503 until it is available.")
+            registry.start()
+            server = PredictionServer(registry=registry, **options)
+        server.serve_forever()
+
+    def leaderboard(self, days=30, metric="mse", limit=10, trend=False, rebuild=False):
+        """아카이브 인덱스에서 date_str까지 최근 days일의 학습 결과를 metric 순으로 출력합니다.
+
+        인덱스 파일 하나만 읽으므로 날짜별 archive 객체를 조회하지 않습니다.
+        trend=True 이면 날짜 순으로 출력하고, rebuild=True 이면 인덱스에 없는 기존 archive 날짜를 먼저 색인합니다.
+        """
+        print(f"--- Leaderboard: last {days} days by {metric} ({self.date_str}) ---")
+        if rebuild:
+            print(f"Indexed {self.archive.rebuild()} archived runs into {ARCHIVE_INDEX_KEY}")
+
+        start = time.perf_counter()
+        rows = self.archive.leaderboard(days=days, metric=metric, limit=limit, end_date=self.date_str, trend=trend)
+        elapsed = time.perf_counter() - start
+        if not rows:
+            print("No archived runs found in the archive index.")
+            return rows
+
+        def fmt(value):
+            return "-" if value is None else f"{value:.6f}"
+
+        print(f"{'#':>3} {'date':>8} {'model_name':>10} {'model':>18} {'mse':>10} {'cv_mse':>10} {'r2':>10} champion")
+        for rank, row in enumerate(rows, start=1):
+            print(
+                f"{rank:>3} {row['date']:>8} {row['model_name']:>10} {str(row['model']):>18} {fmt(row['mse']):>10} "
+                f"{fmt(row['cv_mse']):>10} {fmt(row['r2']):>10} {'*' if row['promoted'] else ''}"
+            )
+        print(f"{len(rows)} rows in {elapsed * 1000:.1f} ms")
+        return rows
+
+    def _sync_processed_history(self, window=None, full=False):
+        """S3 processed/ 스냅샷 중 date_str 이하 최근 window개를 로컬로 받아 경로 list를 반환합니다."""
+        processed_name = self.preprocessor.processed_path(self.date_str, self.processed_format).name
+        suffix = f"/{processed_name}{self._compression_suffix(self.processed_format)}"
+        keys = [
+            key for key in self.s3.indexed_keys("processed/", full=full)
+            if key.endswith(suffix) and key.split("/")[1] <= self.date_str
+        ]
+        if window:
+            keys = keys[-int(window):]
+        if not keys:
+            raise FileNotFoundError("S3에 processed 스냅샷이 없습니다.")
+
+        local_paths = [f"{self.work_dir}/{key}" for key in keys]
+        downloads = [(key, path) for key, path in zip(keys, local_paths) if not os.path.exists(path)]
+        if downloads:
+            print(f"Downloading {len(downloads)} processed snapshots from S3...")
+            failed = [result["key"] for result in self.s3.download_many(downloads) if not result["ok"]]
+            if failed:
+                raise RuntimeError(f"processed 스냅샷 다운로드 실패: {failed}")
+        print(f"Sharded training input: {len(keys)} snapshots ({keys[0]} ~ {keys[-1]})")
+        return local_paths
+
+    def _sync_stats(self, stats_dir, full=False):
+        """S3 stats/ 아래 날짜별 충분통계 중 로컬에 없는 것만 받아오고, 오늘을 제외한 key 목록을 반환합니다."""
+        os.makedirs(stats_dir, exist_ok=True)
+        keys = [
+            key for key in self.s3.indexed_keys("stats/", full=full)
+            if key.endswith("/stats.npz") and key.split("/")[1] != self.date_str
+        ]
+        downloads = [
+            (key, f"{stats_dir}/{key.split('/')[1]}.npz")
+            for key in keys if not os.path.exists(f"{stats_dir}/{key.split('/')[1]}.npz")
+        ]
+        if downloads:
+            print(f"Downloading {len(downloads)} snapshot stats from S3...")
+            for result in self.s3.download_many(downloads):
+                if not result["ok"]:
+                    print(f"ERROR: stats download failed: {result['key']} ({result['error']})")
+        return keys
+
+    def _report(self):
+        """단계 캐시와 S3 다운로드 캐시 통계를 출력합니다."""
+        self.cache.report()
+        s3_stats = self.s3.cache_stats()
+        if s3_stats:
+            print(f"[s3 cache] {s3_stats}")
+        metrics_path = flush_textfile()
+        if metrics_path:
+            print(f"[metrics] {metrics_path}")
+        if PROFILER.enabled and PROFILER.sections:
+            print(f"[profile] {PROFILER.write_report()}")
+
+    def _persist_async(self, fn, *args, **kwargs) -> Future:
+        """로컬 저장/S3 업로드를 백그라운드 스레드에서 실행합니다."""
+        if self._background is None:
+            self._background = ThreadPoolExecutor(max_workers=2, thread_name_prefix="persist")
+        future = self._background.submit(fn, *args, **kwargs)
+        self._pending.append(future)
+        return future
+
+    def _wait_persisted(self) -> bool:
+        """백그라운드 저장 작업이 모두 끝날 때까지 기다리고 성공 여부를 반환합니다."""
+        ok = True
+        for future in self._pending:
+            try:
+                future.result()
+            except Exception as e:
+                print(f"Error: Background persistence failed: {e}")
+                ok = False
+        self._pending.clear()
+        return ok
+
+    def _compression_suffix(self, fmt: str) -> str:
+        """업로드 압축이 적용되는 경우(csv) key에 붙는 확장자"""
+        if self.upload_compression and fmt == "csv":
+            return COMPRESSION_SUFFIXES[self.upload_compression]
+        return ""
+
+    def _upload_frame(self, df, s3_key):
+        """DataFrame을 로컬 파일 없이 S3로 바로 직렬화해 업로드합니다."""
+        result = self.s3.upload_dataframe(df, s3_key, compression=self.upload_compression)
+        if not result["ok"]:
+            raise RuntimeError(f"S3 upload failed: {s3_key} ({result['error']})")
+        print(f"Uploaded {result['key']} ({result['bytes']} bytes, {result['seconds']:.2f}s)")
+        return result["key"]
+
+    @profile_step("run_all")
+    def run_all(self, page_limit=20, stream=False, resume=True, fused=False):
+        """전체 파이프라인 시뮬레이션 (순차 실행)
+
+        fused=True 이면 단계 사이에 DataFrame을 메모리로 바로 넘기고,
+        raw/processed 데이터는 로컬 임시 파일 없이 백그라운드에서 S3로 바로 업로드합니다.
+        """
+        PIPELINE_RUNS.inc(stage="run_all")
+        PIPELINE_ERRORS.inc(0, stage="run_all")
+        start = time.perf_counter()
+        if not fused:
+            # 앞 단계가 실패해도 기존처럼 다음 단계를 실행하고, 하나라도 실패하면 전체 실행을 실패로 집계
+            results = [
+                self.collect(page_limit=page_limit, stream=stream, resume=resume),
+                self.preprocess(),
+                self.train(),
+            ]
+            if any(result is None for result in results):
+                PIPELINE_ERRORS.inc(stage="run_all")
+            PIPELINE_EXECUTION_DURATION.set(time.perf_counter() - start)
+            self._report()
+            return
+
+        print(f"--- Fused run: collect -> preprocess -> train ({self.date_str}) ---")
+        failed = False
+        try:
+            with profile_step("collect"):
+                df_raw = self.collector.fetch_popular_movies(page_limit=page_limit)
+            self._persist_async(
+                self._upload_frame, df_raw, f"raw/{self.date_str}/{self.date_str}{STORAGE_FORMATS[self.raw_format]}"
+            )
+
+            with profile_step("preprocess"):
+                df_processed = self.preprocessor.transform_frame(df_raw)
+            del df_raw
+            processed_name = self.preprocessor.processed_path(self.date_str, self.processed_format).name
+            self._persist_async(self._upload_frame, df_processed, f"processed/{self.date_str}/{processed_name}")
+
+            self._train(df_processed)
+        except Exception as e:
+            print(f"Error: Fused run failed: {e}")
+            traceback.print_exc()
+            failed = True
+        finally:
+            if self._wait_persisted():
+                print("Success: Raw/processed data persisted to S3 in background.")
+            else:
+                failed = True
+            if failed:
+                PIPELINE_ERRORS.inc(stage="run_all")
+            PIPELINE_EXECUTION_DURATION.set(time.perf_counter() - start)
+            self._report()
+
+    def backfill(self, start, end, stages="preprocess,train", max_workers=4, promote=False):
+        """start~end(YYYYMMDD, 양 끝 포함) 날짜별로 단계를 프로세스 풀에서 병렬 실행합니다.
+
+        각 날짜는 {work_dir}/backfill/{date} 작업 디렉토리를 따로 사용하므로 서로의 산출물을 덮어쓰지 않습니다.
+        여러 날짜가 동시에 챔피언을 교체하지 않도록 기본값은 promote=False 입니다.
+        max_workers=1 이면 프로세스 풀 없이 현재 프로세스에서 날짜 순서대로 실행합니다.
+        """
+        if isinstance(stages, str):
+            stages = [stage.strip() for stage in stages.split(",") if stage.strip()]
+        unknown = [stage for stage in stages if stage not in BACKFILL_STAGES]
+        if unknown:
+            raise ValueError(f"Unsupported backfill stages: {unknown} (choose from {BACKFILL_STAGES})")
+
+        start_date = datetime.strptime(str(start), "%Y%m%d")
+        end_date = datetime.strptime(str(end), "%Y%m%d")
+        dates = [
+            (start_date + timedelta(days=offset)).strftime("%Y%m%d")
+            for offset in range((end_date - start_date).days + 1)
+        ]
+        print(f"--- Backfill: {len(dates)} dates, stages={stages}, max_workers={max_workers} ---")
+
+        options = {
+            "raw_format": self.raw_format,
+            "processed_format": self.processed_format,
+            "force": self.cache.force,
+            "promote": promote,
+            # memory backend는 프로세스 간에 공유되지 않으므로 max_workers=1(현재 프로세스에서 실행)로 사용합니다.
+            "storage": self.storage,
+        }
+        results = {}
+        if max_workers == 1:
+            # memory backend도 날짜 간에 같은 저장소를 공유
+            for date_str in dates:
+                work_dir = f"{self.work_dir}/backfill/{date_str}"
+                results[date_str] = _run_backfill_date(date_str, stages, work_dir, options)
+                print(f"[backfill] {date_str}: {results[date_str]['status']}")
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = {
+                    executor.submit(
+                        _run_backfill_date, date_str, stages, f"{self.work_dir}/backfill/{date_str}", options
+                    ): date_str
+                    for date_str in dates
+                }
+                for future in as_completed(futures):
+                    date_str = futures[future]
+                    try:
+                        results[date_str] = future.result()
+                    except Exception as e:
+                        results[date_str] = {"date": date_str, "status": "failed", "error": str(e), "seconds": 0.0}
+                    print(f"[backfill] {date_str}: {results[date_str]['status']}")
+
+        # 과거 날짜로 올라간 key는 인덱스 증분 조회(StartAfter)에 잡히지 않으므로 다음 조회 때 전체 목록을 다시 받음
+        self.s3.invalidate_keys(["raw/", "processed/", "stats/", "models/archive/"])
+
+        summary = [results[date_str] for date_str in dates]
+        print("--- Backfill summary ---")
+        for item in summary:
+            mse = item.get("metrics", {}).get("mse")
+            mse_text = f" mse={mse:.6f}" if mse is not None else ""
+            print(f"{item['date']}: {item['status']} ({item['seconds']:.1f}s){mse_text}")
+        failed = sum(item["status"] != "success" for item in summary)
+        print(f"Total: {len(summary)} dates, {len(summary) - failed} succeeded, {failed} failed")
+        return summary
+
+
+# backfill에서 날짜별로 실행 가능한 단계
+BACKFILL_STAGES = ("preprocess", "train")
+
+
+def _run_backfill_date(date_str: str, stages: list, work_dir: str, options: dict) -> dict:
+    """backfill 워커: 한 날짜에 대해 독립된 작업 디렉토리에서 단계를 순서대로 실행합니다."""
+    started = time.perf_counter()
+    pipeline = Pipeline(
+        raw_format=options["raw_format"],
+        processed_format=options["processed_format"],
+        force=options["force"],
+        date_str=date_str,
+        work_dir=work_dir,
+        storage=options["storage"],
+    )
+    result = {"date": date_str, "status": "success", "stages": {}}
+    for stage in stages:
+        try:
+            if stage == "train":
+                output = pipeline.train(promote=options["promote"])
+            else:
+                output = getattr(pipeline, stage)()
+        except Exception as e:
+            print(f"Error: {stage} failed for {date_str}: {e}")
+            output = None
+        result["stages"][stage] = "success" if output else "failed"
+        if stage == "train" and output:
+            result["metrics"] = output
+        if not output:
+            # 앞 단계가 실패하면 이후 단계는 실행하지 않음
+            result["status"] = f"failed at {stage}"
+            break
+    result["seconds"] = time.perf_counter() - started
+    return result
 
-    def run_all(self, page_limit=20):
-        """전체 파이프라인 시뮬레이션 (순차 실행)"""
-        self.collect(page_limit=page_limit)
-        self.preprocess()
-        self.train()
 
 if __name__ == "__main__":
+    if METRICS_PORT:
+        # 스케줄러 등 오래 실행되는 프로세스에서 Prometheus가 /metrics를 수집할 수 있도록 노출
+        start_http_server(int(METRICS_PORT))
     fire.Fire(Pipeline)
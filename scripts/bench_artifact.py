@@ -0,0 +1,69 @@
+"""모델 파일 포맷별(joblib compress=3 / joblib 무압축 / mmap 아티팩트) 저장·로드 시간과 크기를 비교합니다.
+
+사용법: python scripts/bench_artifact.py --rows 100000 --repeat 5
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sklearn.ensemble import GradientBoostingRegressor, RandomForestRegressor  # noqa: E402
+from sklearn.linear_model import LinearRegression  # noqa: E402
+from src.artifact import load_model, save_artifact  # noqa: E402
+
+FORMATS = {
+    "joblib-z3": (lambda model, path: joblib.dump(model, path, compress=3), joblib.load),
+    "joblib": (lambda model, path: joblib.dump(model, path), joblib.load),
+    "mmap": (save_artifact, load_model),
+}
+
+
+def best_of(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000, help="학습 데이터 행 수")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    X = rng.random((args.rows, 2))
+    y = X @ np.array([1.5, -2.0]) + rng.normal(0, 0.1, args.rows)
+    models = {
+        "linear": LinearRegression(),
+        "random_forest": RandomForestRegressor(n_estimators=100, max_depth=12, random_state=0, n_jobs=-1),
+        "gradient_boosting": GradientBoostingRegressor(n_estimators=200, random_state=0),
+    }
+
+    print(f"{'model':>18} {'format':>10} {'size(KB)':>10} {'save(ms)':>9} {'load(ms)':>9} {'load+predict(ms)':>17}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, model in models.items():
+            model.fit(X, y)
+            sample = X[:1]
+            for fmt, (save, load) in FORMATS.items():
+                path = Path(tmp) / f"{name}-{fmt}.pkl"
+                save_s = best_of(lambda: save(model, path), args.repeat)
+                load_s = best_of(lambda: load(path), args.repeat)
+                first_s = best_of(lambda: load(path).predict(sample), args.repeat)
+                size_kb = path.stat().st_size / 1024
+                print(
+                    f"{name:>18} {fmt:>10} {size_kb:>10.1f} {save_s * 1000:>9.2f} {load_s * 1000:>9.2f} "
+                    f"{first_s * 1000:>17.2f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""로컬 가짜 TMDB 서버를 띄워 순차 수집과 동시 수집 속도를 비교합니다.
+
+사용법: python scripts/bench_collector.py --pages 100 --latency 0.05 --workers 16
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.collector import TMDBCollector  # noqa: E402
+
+
+def make_handler(latency: float):
+    class FakeTMDBHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            page = int(parse_qs(urlparse(self.path).query).get("page", ["1"])[0])
+            time.sleep(latency)
+            results = [
+                {"id": page * 100 + i, "title": f"Movie {page}-{i}", "popularity": 10.0 + i,
+                 "vote_count": 100 + i, "vote_average": 5.0 + i / 10}
+                for i in range(20)
+            ]
+            body = json.dumps({"page": page, "results": results}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return FakeTMDBHandler
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.05, help="페이지당 서버 지연(초)")
+    parser.add_argument("--workers", type=int, default=16)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(args.latency))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    timings = {}
+    frames = {}
+    for label, workers in [("sequential", 1), ("concurrent", args.workers)]:
+        collector = TMDBCollector("bench", max_workers=workers)
+        collector.base_url = base_url
+        start = time.perf_counter()
+        frames[label] = collector.fetch_popular_movies(page_limit=args.pages)
+        timings[label] = time.perf_counter() - start
+
+    server.shutdown()
+    assert frames["sequential"].equals(frames["concurrent"]), "동시 수집 결과가 순차 수집과 다릅니다."
+
+    print(f"pages={args.pages} latency={args.latency}s workers={args.workers}")
+    for label, elapsed in timings.items():
+        print(f"{label:>10}: {elapsed:.3f}s ({args.pages / elapsed:.1f} pages/s)")
+    print(f"speedup: {timings['sequential'] / timings['concurrent']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
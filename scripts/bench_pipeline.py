@@ -0,0 +1,63 @@
+"""네트워크 없이 local / memory 저장소 backend로 Pipeline.run_all 전체 경로의 실행 시간을 측정합니다.
+
+TMDB 응답은 가짜 페이지로 대체하고 wandb는 disabled 모드로 실행하므로,
+네트워크 편차 없이 수집 → 전처리 → 학습 → 업로드 경로의 순수 처리 시간만 비교할 수 있습니다.
+
+사용법: python scripts/bench_pipeline.py --pages 50 --rows-per-page 2000 --backends memory,local
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+
+os.environ.setdefault("WANDB_MODE", "disabled")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from core import config as cfg  # noqa: E402
+from main import Pipeline  # noqa: E402
+from scripts.bench_storage import make_raw_frame  # noqa: E402
+
+
+def fake_fetch_page(rows_per_page: int):
+    """TMDB 페이지 대신 같은 컬럼 구성의 가짜 results를 반환합니다."""
+    def fetch(page, get=None):
+        return make_raw_frame(rows_per_page, seed=page).to_dict("records")
+    return fetch
+
+
+def run_once(backend: str, fused: bool, args, root: Path) -> float:
+    pipeline = Pipeline(force=True, work_dir=str(root / "work"), storage=backend)
+    pipeline.collector._fetch_page = fake_fetch_page(args.rows_per_page)
+    start = time.perf_counter()
+    with redirect_stdout(StringIO()):
+        pipeline.run_all(page_limit=args.pages, resume=False, fused=fused)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--rows-per-page", type=int, default=2000)
+    parser.add_argument("--backends", default="memory,local", help="쉼표로 구분한 backend 목록")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"rows={args.pages * args.rows_per_page} (pages={args.pages} x {args.rows_per_page})")
+    print(f"{'backend':>8} {'mode':>7} {'best(s)':>8} {'mean(s)':>8}")
+    for backend in args.backends.split(","):
+        for fused in (False, True):
+            times = []
+            for _ in range(args.repeat):
+                with tempfile.TemporaryDirectory() as tmp:
+                    cfg.LOCAL_STORAGE_ROOT = str(Path(tmp) / "storage")
+                    times.append(run_once(backend, fused, args, Path(tmp)))
+            mode = "fused" if fused else "staged"
+            print(f"{backend:>8} {mode:>7} {min(times):>8.3f} {sum(times) / len(times):>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""raw 스냅샷 형태의 데이터로 CSV / Parquet / Arrow 저장 포맷의 쓰기·읽기 시간과 크기를 비교합니다.
+
+사용법: python scripts/bench_storage.py --rows 10000,1000000,10000000
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from core.utils import STORAGE_FORMATS, read_table, write_table  # noqa: E402
+from src.preprocessor import FEATURES, TARGET  # noqa: E402
+
+
+def make_raw_frame(rows: int, seed: int = 42) -> pd.DataFrame:
+    """TMDB raw 스냅샷과 비슷한 컬럼 구성의 가짜 데이터"""
+    rng = np.random.default_rng(seed)
+    ids = np.arange(rows)
+    return pd.DataFrame({
+        "adult": rng.random(rows) < 0.01,
+        "backdrop_path": [f"/backdrop_{i}.jpg" for i in ids],
+        "genre_ids": [f"[{i % 20}, {i % 7}]" for i in ids],
+        "id": ids,
+        "original_language": rng.choice(["en", "ko", "ja", "fr"], rows),
+        "original_title": [f"Original Title {i}" for i in ids],
+        "overview": [f"Overview text for movie {i}, with a plot summary." for i in ids],
+        "popularity": rng.gamma(2.0, 50.0, rows),
+        "poster_path": [f"/poster_{i}.jpg" for i in ids],
+        "release_date": "2024-01-01",
+        "title": [f"Title {i}" for i in ids],
+        "video": False,
+        "vote_average": rng.uniform(0, 10, rows).round(3),
+        "vote_count": rng.integers(0, 30000, rows),
+    })
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", default="10000,1000000,10000000", help="쉼표로 구분한 행 수 목록")
+    args = parser.parse_args()
+
+    projection = FEATURES + [TARGET]
+    print(f"{'rows':>10} {'format':>8} {'size(MB)':>9} {'write(s)':>9} {'read(s)':>8} {'project(s)':>10}")
+    for rows in [int(r) for r in args.rows.split(",")]:
+        df = make_raw_frame(rows)
+        with tempfile.TemporaryDirectory() as tmp:
+            for fmt, ext in STORAGE_FORMATS.items():
+                path = Path(tmp) / f"raw{ext}"
+                write_s, _ = timed(lambda: write_table(df, path))
+                read_s, _ = timed(lambda: read_table(path))
+                project_s, _ = timed(lambda: read_table(path, columns=projection))
+                size_mb = path.stat().st_size / 1e6
+                print(f"{rows:>10} {fmt:>8} {size_mb:>9.2f} {write_s:>9.3f} {read_s:>8.3f} {project_s:>10.3f}")
+        del df
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""두 --profile report(JSON)의 구간별 시간/CPU/메모리를 비교합니다.
+
+사용법: python scripts/compare_profiles.py data/profiles/<기준>.json data/profiles/<비교>.json --threshold 1.2
+"""
+import argparse
+import json
+
+
+def load_sections(path: str) -> dict:
+    with open(path) as f:
+        return {section["path"]: section for section in json.load(f)["sections"]}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("base")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=1.2, help="이 비율 이상 느려진 구간을 표시")
+    args = parser.parse_args()
+
+    base, new = load_sections(args.base), load_sections(args.new)
+    print(f"{'section':<36} {'wall base':>9} {'wall new':>9} {'ratio':>6} {'cpu new':>8} {'alloc MB':>9}")
+    regressions = 0
+    for path in list(base) + [p for p in new if p not in base]:
+        old_wall = base.get(path, {}).get("wall_seconds")
+        section = new.get(path)
+        if section is None:
+            print(f"{path:<36} {old_wall:>9.3f} {'-':>9}")
+            continue
+        ratio = section["wall_seconds"] / old_wall if old_wall else float("inf")
+        flag = " <-" if ratio >= args.threshold and old_wall is not None else ""
+        regressions += bool(flag)
+        old_text = f"{old_wall:>9.3f}" if old_wall is not None else f"{'-':>9}"
+        print(
+            f"{path:<36} {old_text} {section['wall_seconds']:>9.3f} {ratio:>6.2f} "
+            f"{section['cpu_seconds']:>8.3f} {section.get('alloc_peak_mb', 0.0):>9.1f}{flag}"
+        )
+    print(f"{regressions} sections slower than x{args.threshold}")
+
+
+if __name__ == "__main__":
+    main()
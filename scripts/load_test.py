@@ -0,0 +1,111 @@
+"""예측 서버(/predict)에 동시 요청을 보내 p50/p99 지연 시간과 처리량을 측정합니다.
+
+--url을 생략하면 가짜 데이터로 학습한 LinearRegression으로 로컬 서버를 띄워 측정합니다.
+
+사용법:
+    python scripts/load_test.py --concurrency 32 --requests 5000
+    python scripts/load_test.py --url http://localhost:8000 --concurrency 16
+"""
+import argparse
+import http.client
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlparse
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+def start_local_server(max_batch_size: int, max_wait_ms: float):
+    import pandas as pd
+    from sklearn.linear_model import LinearRegression
+
+    from src.predict import BatchPredictor
+    from src.server import PredictionServer
+
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame({"popularity": rng.gamma(2.0, 50.0, 1000), "vote_count": rng.integers(0, 30000, 1000)})
+    model = LinearRegression().fit(X, 5 + 0.004 * X["popularity"] + 0.0001 * X["vote_count"])
+    server = PredictionServer(
+        BatchPredictor(model), host="127.0.0.1", port=0, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms
+    )
+    server.start()
+    return server, f"http://127.0.0.1:{server.port}"
+
+
+def worker(url, n_requests: int, rows_per_request: int, latencies: list, errors: list, seed: int):
+    parsed = urlparse(url)
+    conn = http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=30)
+    rng = np.random.default_rng(seed)
+    for _ in range(n_requests):
+        instances = [
+            {"popularity": float(rng.gamma(2.0, 50.0)), "vote_count": int(rng.integers(0, 30000))}
+            for _ in range(rows_per_request)
+        ]
+        # bytes로 보내야 http.client가 헤더와 본문을 한 번에 전송합니다.
+        body = json.dumps({"instances": instances}).encode()
+        start = time.perf_counter()
+        try:
+            conn.request("POST", "/predict", body=body, headers={"Content-Type": "application/json"})
+            response = conn.getresponse()
+            response.read()
+            if response.status != 200:
+                errors.append(response.status)
+                continue
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(str(e))
+            conn.close()
+            conn = http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=30)
+            continue
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default=None, help="서버 주소 (생략 시 로컬 서버 실행)")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=2000, help="전체 요청 수")
+    parser.add_argument("--rows-per-request", type=int, default=1)
+    parser.add_argument("--max-batch-size", type=int, default=256, help="로컬 서버 micro-batch 최대 행 수")
+    parser.add_argument("--max-wait-ms", type=float, default=2.0, help="로컬 서버 micro-batch 대기 시간")
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if url is None:
+        server, url = start_local_server(args.max_batch_size, args.max_wait_ms)
+
+    latencies, errors = [], []
+    per_worker = args.requests // args.concurrency
+    threads = [
+        threading.Thread(target=worker, args=(url, per_worker, args.rows_per_request, latencies, errors, i))
+        for i in range(args.concurrency)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    ms = np.array(latencies) * 1000
+    print(f"url={url} concurrency={args.concurrency} rows/request={args.rows_per_request}")
+    print(f"requests={len(latencies)} errors={len(errors)} elapsed={elapsed:.2f}s")
+    rows_per_sec = len(latencies) * args.rows_per_request / elapsed
+    print(f"throughput={len(latencies) / elapsed:,.0f} req/s ({rows_per_sec:,.0f} rows/s)")
+    if len(ms):
+        print(f"latency p50={np.percentile(ms, 50):.2f}ms p99={np.percentile(ms, 99):.2f}ms max={ms.max():.2f}ms")
+    if server is not None:
+        stats = server.batcher.stats
+        if stats["batches"]:
+            print(f"micro-batches={stats['batches']} avg requests/batch={stats['requests'] / stats['batches']:.1f}")
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from contextlib import closing
+from datetime import datetime, timedelta
+from pathlib import Path
+
+ARCHIVE_PREFIX = "models/archive/"
+ARCHIVE_INDEX_KEY = "models/archive/index.sqlite"
+
+# leaderboard 정렬 기준 지표와 정렬 방향 (오차는 작을수록, r2는 클수록 좋음)
+LEADERBOARD_METRICS = {"mse": "ASC", "cv_mse": "ASC", "r2": "DESC", "cv_r2": "DESC"}
+
+_COLUMNS = (
+    "date", "model_name", "recorded_at", "model", "mse", "r2", "cv_mse", "cv_r2",
+    "sample_count", "promoted", "model_key", "metrics",
+)
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    date TEXT NOT NULL,
+    model_name TEXT NOT NULL,
+    recorded_at REAL NOT NULL,
+    model TEXT,
+    mse REAL,
+    r2 REAL,
+    cv_mse REAL,
+    cv_r2 REAL,
+    sample_count INTEGER,
+    promoted INTEGER NOT NULL DEFAULT 0,
+    model_key TEXT,
+    metrics TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_date ON runs (date, recorded_at);
+"""
+
+
+def index_row(date_str: str, model_name: str, metrics: dict, model: str | None = None, promoted: bool = False,
+              recorded_at: float | None = None) -> dict:
+    """학습 1회의 지표를 인덱스 행으로 만듭니다. (fold별 값, 후보 목록 등 목록형 지표는 제외)"""
+    scalars = {name: value for name, value in metrics.items() if not isinstance(value, (list, dict))}
+    return {
+        "date": date_str,
+        "model_name": model_name,
+        "recorded_at": recorded_at if recorded_at is not None else time.time(),
+        "model": metrics.get("model", model),
+        "mse": metrics.get("mse"),
+        "r2": metrics.get("r2"),
+        "cv_mse": metrics.get("cv_mse"),
+        "cv_r2": metrics.get("cv_r2"),
+        "sample_count": metrics.get("sample_count"),
+        "promoted": int(promoted),
+        "model_key": f"{ARCHIVE_PREFIX}{date_str}/model.pkl",
+        "metrics": json.dumps(scalars, default=str),
+    }
+
+
+class ArchiveIndex:
+    """models/archive/ 학습 이력을 버킷의 SQLite 파일 하나(index.sqlite)에 행 단위로 누적합니다.
+
+    쓰기는 "읽은 시점의 ETag가 그대로일 때만 교체"하는 조건부 put으로 원자적으로 수행하고,
+    다른 writer(backfill 워커 등)가 먼저 바꿨으면 다시 읽어 재시도하므로 행이 유실되지 않습니다.
+    조회는 인덱스 파일 하나만 내려받으므로 날짜별 metrics.json을 나열/다운로드하지 않습니다.
+    """
+
+    def __init__(self, s3, local_dir: str, key: str = ARCHIVE_INDEX_KEY, max_retries: int = 10):
+        self.s3 = s3
+        self.local_dir = Path(local_dir)
+        self.key = key
+        self.max_retries = max_retries
+
+    def _update(self, modify) -> bool:
+        """인덱스를 내려받아 modify(conn)를 적용한 뒤 조건부로 업로드합니다. (충돌 시 재시도)"""
+        self.local_dir.mkdir(parents=True, exist_ok=True)
+        for attempt in range(self.max_retries):
+            current = self.s3.read_object(self.key)
+            data, etag = current if current else (b"", None)
+
+            fd, tmp_name = tempfile.mkstemp(suffix=".sqlite", dir=self.local_dir)
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                with closing(sqlite3.connect(tmp_name)) as conn:
+                    conn.executescript(_SCHEMA)
+                    modify(conn)
+                    conn.commit()
+                new_data = Path(tmp_name).read_bytes()
+            finally:
+                Path(tmp_name).unlink(missing_ok=True)
+
+            if self.s3.write_object(self.key, new_data, etag):
+                return True
+            print(f"Archive index changed concurrently. Retrying ({attempt + 1}/{self.max_retries})...")
+            time.sleep(random.uniform(0.01, 0.05) * (attempt + 1))
+        print(f"ERROR: Failed to update archive index after {self.max_retries} attempts.")
+        return False
+
+    def append(self, rows: list[dict]) -> bool:
+        """행을 인덱스 끝에 추가합니다."""
+        placeholders = ", ".join("?" for _ in _COLUMNS)
+        values = [tuple(row.get(column) for column in _COLUMNS) for row in rows]
+        return self._update(
+            lambda conn: conn.executemany(f"INSERT INTO runs ({', '.join(_COLUMNS)}) VALUES ({placeholders})", values)
+        )
+
+    def rebuild(self) -> int:
+        """인덱스에 없는 날짜의 archive metrics.json을 읽어 행을 채웁니다. (기존 이력 최초 색인용)"""
+        keys = [
+            key for key in self.s3.iter_keys(ARCHIVE_PREFIX)
+            if key.endswith("/metrics.json") and key.count("/") == 3
+        ]
+        indexed = {row["date"] for row in self.query("SELECT DISTINCT date FROM runs")}
+        rows = []
+        for key in keys:
+            date_str = key.split("/")[2]
+            if date_str in indexed:
+                continue
+            current = self.s3.read_object(key)
+            if current is None:
+                continue
+            recorded_at = datetime.strptime(date_str, "%Y%m%d").timestamp()
+            rows.append(index_row(date_str, "unknown", json.loads(current[0]), recorded_at=recorded_at))
+        if rows and not self.append(rows):
+            return 0
+        return len(rows)
+
+    def query(self, sql: str, params=()) -> list[dict]:
+        """인덱스 파일을 한 번 내려받아 읽기 전용 SQL을 실행합니다. (인덱스가 없으면 빈 목록)"""
+        current = self.s3.read_object(self.key)
+        if current is None:
+            return []
+        self.local_dir.mkdir(parents=True, exist_ok=True)
+        path = self.local_dir / "index.sqlite"
+        path.write_bytes(current[0])
+        with closing(sqlite3.connect(f"file:{path}?mode=ro", uri=True)) as conn:
+            conn.row_factory = sqlite3.Row
+            return [dict(row) for row in conn.execute(sql, params)]
+
+    def leaderboard(self, days: int = 30, metric: str = "mse", limit: int = 10, end_date: str | None = None,
+                    trend: bool = False) -> list[dict]:
+        """end_date(YYYYMMDD, 기본값 오늘)까지 최근 days일 동안 날짜별 마지막 학습 결과를 metric 순으로 반환합니다.
+
+        archive 모델 파일은 날짜별로 덮어쓰므로 날짜마다 가장 최근 행만 사용합니다.
+        trend=True 이면 metric 대신 날짜 순으로 정렬합니다.
+        """
+        if metric not in LEADERBOARD_METRICS:
+            raise ValueError(f"Unsupported leaderboard metric: {metric} (choose from {list(LEADERBOARD_METRICS)})")
+        end = datetime.strptime(str(end_date), "%Y%m%d") if end_date else datetime.now()
+        start = (end - timedelta(days=int(days) - 1)).strftime("%Y%m%d")
+        order = "date ASC" if trend else f"{metric} {LEADERBOARD_METRICS[metric]}, date DESC"
+        return self.query(
+            f"""
+            SELECT {', '.join(_COLUMNS)} FROM runs AS r
+            WHERE date BETWEEN ? AND ? AND {metric} IS NOT NULL
+              AND recorded_at = (SELECT MAX(recorded_at) FROM runs WHERE date = r.date)
+            ORDER BY {order}
+            LIMIT ?
+            """,
+            (start, end.strftime("%Y%m%d"), int(limit)),
+        )
@@ -0,0 +1,134 @@
+import json
+import mmap
+import os
+import pickle
+import struct
+import time
+from pathlib import Path
+
+import joblib
+
+# 파일 구조: MAGIC(8) | header 길이(uint64 LE) | header JSON | (64바이트 정렬) 데이터 영역
+# 데이터 영역에는 pickle 본문과 pickle protocol 5의 out-of-band 버퍼(numpy 배열 등)가 압축 없이 정렬되어 저장됩니다.
+MAGIC = b"MLMODEL1"
+FORMAT_VERSION = 1
+MODEL_FORMATS = ("joblib", "mmap")
+# 아티팩트는 .pkl(joblib)과 구분되는 확장자로 저장해 기존 joblib.load 사용처가 깨지지 않도록 합니다.
+ARTIFACT_SUFFIX = ".mlmodel"
+_ALIGN = 64
+
+
+def _align(offset: int) -> int:
+    return (offset + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def save_artifact(model, path, metadata: dict | None = None) -> dict:
+    """모델을 메모리 매핑 가능한 아티팩트로 저장하고 header를 반환합니다. (임시 파일 후 교체로 원자적 저장)"""
+    buffers = []
+
+    def collect(buffer):
+        # 연속 메모리가 아닌 버퍼는 pickle 본문에 그대로 포함
+        try:
+            buffers.append(buffer.raw())
+        except BufferError:
+            return True
+        return False
+
+    payload = pickle.dumps(model, protocol=5, buffer_callback=collect)
+
+    segments, offset = [], 0
+    for data in [memoryview(payload)] + buffers:
+        offset = _align(offset)
+        segments.append({"offset": offset, "length": data.nbytes})
+        offset += data.nbytes
+
+    header = {
+        "format_version": FORMAT_VERSION,
+        "model_class": f"{type(model).__module__}.{type(model).__qualname__}",
+        "created_at": time.time(),
+        "pickle": segments[0],
+        "buffers": segments[1:],
+        "metadata": metadata or {},
+    }
+    header_bytes = json.dumps(header, default=str).encode()
+    data_start = _align(len(MAGIC) + 8 + len(header_bytes))
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(header_bytes)))
+        f.write(header_bytes)
+        for data, segment in zip([memoryview(payload)] + buffers, segments):
+            f.seek(data_start + segment["offset"])
+            f.write(data)
+    os.replace(tmp_path, path)
+    return header
+
+
+def _read_header(f) -> dict | None:
+    if f.read(len(MAGIC)) != MAGIC:
+        return None
+    (header_length,) = struct.unpack("<Q", f.read(8))
+    header = json.loads(f.read(header_length))
+    header["data_offset"] = _align(len(MAGIC) + 8 + header_length)
+    return header
+
+
+def is_artifact(path) -> bool:
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def read_metadata(path) -> dict | None:
+    """모델을 로드하지 않고 header만 읽습니다. (joblib 파일이면 None)"""
+    with open(path, "rb") as f:
+        return _read_header(f)
+
+
+def load_model(path, mmap_mode: bool = True):
+    """아티팩트 또는 joblib 파일에서 모델을 로드합니다.
+
+    아티팩트는 파일을 mmap한 뒤 배열 버퍼를 복사 없이 그대로 사용하므로 (읽기 전용 배열),
+    압축 해제나 배열 복사 비용이 없고 같은 파일을 여는 프로세스끼리 page cache를 공유합니다.
+    """
+    with open(path, "rb") as f:
+        header = _read_header(f)
+        if header is None:
+            return joblib.load(path)
+        if mmap_mode:
+            view = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+        else:
+            f.seek(0)
+            view = memoryview(f.read())
+
+    def segment(info):
+        start = header["data_offset"] + info["offset"]
+        return view[start:start + info["length"]]
+
+    return pickle.loads(segment(header["pickle"]), buffers=[segment(info) for info in header["buffers"]])
+
+
+def artifact_path(path) -> Path:
+    """joblib 모델 경로(.pkl)에 대응하는 아티팩트 경로 (model.pkl -> model.mlmodel)"""
+    return Path(path).with_suffix(ARTIFACT_SUFFIX)
+
+
+def model_files(path, model_format: str = "joblib") -> list[Path]:
+    """save_model_file이 path에 대해 쓰는 파일 목록 (joblib .pkl은 항상 포함, mmap이면 아티팩트 추가)"""
+    if model_format not in MODEL_FORMATS:
+        raise ValueError(f"지원하지 않는 모델 포맷: {model_format} (지원: {', '.join(MODEL_FORMATS)})")
+    return [Path(path)] + ([artifact_path(path)] if model_format == "mmap" else [])
+
+
+def save_model_file(model, path, model_format: str = "joblib", metadata: dict | None = None) -> list[Path]:
+    """path(.pkl)에 joblib compress=3으로 저장하고, mmap이면 같은 이름의 .mlmodel 아티팩트도 함께 저장합니다.
+
+    .pkl은 포맷과 관계없이 항상 joblib으로 로드할 수 있으며, 저장한 파일 목록을 반환합니다.
+    """
+    paths = model_files(path, model_format)
+    joblib.dump(model, path, compress=3)
+    if model_format == "mmap":
+        save_artifact(model, paths[1], metadata=metadata)
+    return paths
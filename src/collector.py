@@ -1,39 +1,316 @@
+import json
+import os
+import shutil
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from pathlib import Path
 
 import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
+
+from core.metrics import API_REQUEST_DURATION, API_REQUESTS, ROWS_PROCESSED
+from core.profiler import profile_step
+from core.utils import STORAGE_FORMATS, TableWriter, read_table, write_table
+
+# 재시도 대상 상태 코드 (429: Rate limit, 5xx: 서버 일시 오류)
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """초당 rate개의 토큰을 채우는 토큰 버킷 (스레드 안전)"""
+
+    def __init__(self, rate: float, capacity: int | None = None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or max(1, int(rate)))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """토큰 1개를 얻을 때까지 대기합니다."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
 
 
 class TMDBCollector:
-    def __init__(self, api_key: str):
+    def __init__(
+        self,
+        api_key: str,
+        max_workers: int = 1,
+        requests_per_second: float | None = None,
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        data_dir: str = "data",
+    ):
         self.api_key = api_key
+        self.data_dir = Path(data_dir)
         self.base_url = "https://api.themoviedb.org/3"
-    def fetch_popular_movies(self, page_limit: int = 20) -> pd.DataFrame:
-        """20페이지(약 400개)의 인기 영화 데이터를 수집합니다."""
-        movie_list = []
-         
-        print(f"TMDB에서 {page_limit}페이지까지 수집을 시작합니다...")
-        for page in range(1, page_limit + 1):
-            url = f"{self.base_url}/movie/popular?api_key={self.api_key}&language=ko-KR&page={page}"
-            response = requests.get(url)
-             
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.rate_limiter = TokenBucket(requests_per_second) if requests_per_second else None
+        self._session = None
+        # 마지막 수집에서 끝내 받지 못한 페이지 (수집 결과를 완료로 볼지 판단할 때 사용)
+        self.failed_pages = []
+
+    def _get_session(self) -> requests.Session:
+        """Keep-alive 커넥션 풀을 공유하는 세션을 생성합니다."""
+        if self._session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(self.max_workers, 1))
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            self._session = session
+        return self._session
+
+    def _retry_delay(self, response, attempt: int) -> float:
+        """Retry-After 헤더가 있으면 따르고, 없으면 지수 백오프를 사용합니다."""
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after:
+            try:
+                return max(float(retry_after), 0.0)
+            except (TypeError, ValueError):
+                pass
+        return self.backoff_factor * (2 ** attempt)
+
+    def _fetch_page(self, page: int, get=None) -> list | None:
+        """한 페이지를 요청하고 results를 반환합니다. 실패 시 None."""
+        get = get or requests.get
+        url = f"{self.base_url}/movie/popular?api_key={self.api_key}&language=ko-KR&page={page}"
+
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            start = time.perf_counter()
+            try:
+                with profile_step("fetch"):
+                    response = get(url, timeout=10)
+            except requests.RequestException as e:
+                API_REQUEST_DURATION.observe(time.perf_counter() - start, api="tmdb")
+                API_REQUESTS.inc(api="tmdb", status="error")
+                if attempt == self.max_retries:
+                    print(f"페이지 {page} 호출 실패 ({e})")
+                    return None
+                time.sleep(self._retry_delay(None, attempt))
+                continue
+
+            API_REQUEST_DURATION.observe(time.perf_counter() - start, api="tmdb")
+            API_REQUESTS.inc(api="tmdb", status=response.status_code)
             if response.status_code == 200:
                 results = response.json().get('results', [])
-                movie_list.extend(results)
+                ROWS_PROCESSED.inc(len(results), stage="collect")
+                return results
+            if response.status_code in RETRY_STATUS_CODES and attempt < self.max_retries:
+                time.sleep(self._retry_delay(response, attempt))
+                continue
+
+            print(f"페이지 {page} 호출 실패 (Status Code: {response.status_code})")
+            return None
+
+    @staticmethod
+    def _to_frame(results: list | None) -> pd.DataFrame | None:
+        return pd.DataFrame(results) if results is not None else None
+
+    def iter_popular_movies(self, page_limit: int = 20, max_workers: int | None = None, pages=None):
+        """페이지 단위로 (page, DataFrame) 배치를 페이지 순서대로 yield 합니다.
+
+        동시 모드에서도 진행 중인 요청 수를 max_workers * 2 로 제한하므로
+        page_limit과 무관하게 메모리에 남는 페이지 수가 일정합니다.
+        pages를 지정하면 해당 페이지만 요청하며, 호출에 실패한 페이지는 None으로 전달되고 failed_pages에 남습니다.
+        """
+        max_workers = max_workers or self.max_workers
+        pages = list(pages) if pages is not None else range(1, page_limit + 1)
+        self.failed_pages = []
+
+        print(f"TMDB에서 {page_limit}페이지까지 수집을 시작합니다... (요청 대상: {len(pages)}페이지)")
+        # 순차 모드에서도 같은 세션을 써서 페이지마다 커넥션을 새로 맺지 않도록 합니다.
+        get = self._get_session().get
+        if max_workers > 1:
+            window = max_workers * 2
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                pending = deque()
+                page_iter = iter(pages)
+                for page in islice(page_iter, window):
+                    pending.append((page, executor.submit(self._fetch_page, page, get)))
+                while pending:
+                    page, future = pending.popleft()
+                    next_page = next(page_iter, None)
+                    if next_page is not None:
+                        pending.append((next_page, executor.submit(self._fetch_page, next_page, get)))
+                    results = future.result()
+                    if results is None:
+                        self.failed_pages.append(page)
+                    yield page, self._to_frame(results)
+                    if page % 5 == 0:
+                        print(f"진행 중: {page}/{page_limit} 페이지 완료")
+        else:
+            for page in pages:
+                results = self._fetch_page(page, get)
+                if results is None:
+                    self.failed_pages.append(page)
+                yield page, self._to_frame(results)
                 if page % 5 == 0:
                     print(f"진행 중: {page}/{page_limit} 페이지 완료")
-            else:
-                print(f"페이지 {page} 호출 실패 (Status Code: {response.status_code})")
-          
-        df = pd.DataFrame(movie_list)
+
+    def fetch_popular_movies(self, page_limit: int = 20, max_workers: int | None = None) -> pd.DataFrame:
+        """20페이지(약 400개)의 인기 영화 데이터를 수집합니다.
+
+        max_workers가 2 이상이면 공유 세션 위에서 페이지를 동시에 요청하며,
+        결과는 항상 페이지 순서대로 합쳐집니다.
+        """
+        batches = [
+            batch for _, batch in self.iter_popular_movies(page_limit=page_limit, max_workers=max_workers)
+            if batch is not None and not batch.empty
+        ]
+
+        df = pd.concat(batches, ignore_index=True) if batches else pd.DataFrame()
         print(f"총 {len(df)}개의 영화 데이터를 수집했습니다.")
         return df
 
-    def save_raw_data(self, df: pd.DataFrame, date_str: str) -> str:
-        """수집된 데이터를 날짜별 raw 경로에 저장합니다."""
-        save_path = Path(f"data/raw/{date_str}")
+    def save_raw_data(self, df: pd.DataFrame, date_str: str, fmt: str = "csv") -> str:
+        """수집된 데이터를 날짜별 raw 경로에 저장합니다. (fmt: csv/parquet/arrow)"""
+        save_path = self.data_dir / "raw" / date_str
         save_path.mkdir(parents=True, exist_ok=True)
-          
-        file_full_path = save_path / f"{date_str}.csv"
-        df.to_csv(file_full_path, index=False, encoding='utf-8-sig')
-        return str(file_full_path)
+
+        file_full_path = save_path / f"{date_str}{STORAGE_FORMATS[fmt]}"
+        with profile_step("write"):
+            return write_table(df, file_full_path, encoding='utf-8-sig')
+
+    def save_raw_stream(self, batches, date_str: str, fmt: str = "csv") -> tuple[str, int]:
+        """(page, DataFrame) 배치를 도착하는 대로 raw 파일에 이어 씁니다.
+
+        첫 배치의 컬럼 순서를 헤더로 고정하고 이후 배치는 해당 컬럼으로 맞춥니다.
+        저장 경로와 총 행 수를 반환합니다.
+        """
+        save_path = self.data_dir / "raw" / date_str
+        save_path.mkdir(parents=True, exist_ok=True)
+
+        file_full_path = save_path / f"{date_str}{STORAGE_FORMATS[fmt]}"
+        with TableWriter(file_full_path, encoding='utf-8-sig') as writer:
+            for _, batch in batches:
+                if batch is None or batch.empty:
+                    continue
+                writer.write(batch)
+
+        print(f"총 {writer.rows}개의 영화 데이터를 {file_full_path}에 저장했습니다.")
+        return str(file_full_path), writer.rows
+
+    def clear_checkpoint(self, date_str: str):
+        """date_str의 페이지 체크포인트를 삭제합니다. (체크포인트 없이 다시 수집할 때)"""
+        CollectCheckpoint(self.data_dir / "raw" / date_str).reset()
+
+    def collect_resumable(
+        self,
+        date_str: str,
+        page_limit: int = 20,
+        max_workers: int | None = None,
+        resume: bool = True,
+        fmt: str = "csv",
+    ) -> tuple[str, int]:
+        """페이지별 체크포인트를 남기며 수집하고, 재실행 시 누락된 페이지만 다시 받습니다.
+
+        완료된 페이지는 data/raw/{date}/pages/ 에 parquet으로(타입 유지) 저장되고 manifest.json 에 범위로 기록됩니다.
+        수집이 끝나면 완료된 페이지를 페이지 순서대로 합쳐 raw CSV를 만듭니다.
+        """
+        if not resume:
+            self.clear_checkpoint(date_str)
+        checkpoint = CollectCheckpoint(self.data_dir / "raw" / date_str)
+
+        missing = checkpoint.missing_pages(page_limit)
+        print(f"체크포인트: {page_limit - len(missing)}/{page_limit} 페이지 완료, {len(missing)}페이지 수집 필요")
+
+        if missing:
+            for page, batch in self.iter_popular_movies(page_limit, max_workers=max_workers, pages=missing):
+                if batch is not None:
+                    checkpoint.save_page(page, batch)
+
+        still_missing = checkpoint.missing_pages(page_limit)
+        self.failed_pages = still_missing
+        if still_missing:
+            print(f"경고: {len(still_missing)}페이지 수집 실패 {CollectCheckpoint.to_ranges(still_missing)}. "
+                  "같은 날짜로 다시 실행하면 해당 페이지만 재수집합니다.")
+
+        return self.save_raw_stream(checkpoint.iter_pages(page_limit), date_str, fmt=fmt)
+
+
+class CollectCheckpoint:
+    """수집 완료 페이지를 페이지 범위 manifest로 관리하는 체크포인트"""
+
+    def __init__(self, raw_dir: Path):
+        self.raw_dir = Path(raw_dir)
+        self.pages_dir = self.raw_dir / "pages"
+        self.manifest_path = self.raw_dir / "manifest.json"
+        self.completed = self._load()
+
+    @staticmethod
+    def to_ranges(pages) -> list[list[int]]:
+        """[1, 2, 3, 7] -> [[1, 3], [7, 7]]"""
+        ranges = []
+        for page in sorted(pages):
+            if ranges and page == ranges[-1][1] + 1:
+                ranges[-1][1] = page
+            else:
+                ranges.append([page, page])
+        return ranges
+
+    def _load(self) -> set[int]:
+        if not self.manifest_path.exists():
+            return set()
+        try:
+            with open(self.manifest_path, 'r') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"manifest 로드 실패, 처음부터 수집합니다: {e}")
+            return set()
+        # 파일이 실제로 남아 있는 페이지만 완료로 인정
+        return {
+            page
+            for start, end in manifest.get('completed', [])
+            for page in range(start, end + 1)
+            if self._page_path(page).exists()
+        }
+
+    def _page_path(self, page: int) -> Path:
+        return self.pages_dir / f"{page:05d}.parquet"
+
+    def _write_manifest(self):
+        tmp_path = self.manifest_path.with_suffix(".json.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump({"completed": self.to_ranges(self.completed)}, f)
+        os.replace(tmp_path, self.manifest_path)
+
+    def reset(self):
+        """기존 체크포인트를 삭제합니다."""
+        shutil.rmtree(self.pages_dir, ignore_errors=True)
+        self.manifest_path.unlink(missing_ok=True)
+        self.completed = set()
+
+    def missing_pages(self, page_limit: int) -> list[int]:
+        return [page for page in range(1, page_limit + 1) if page not in self.completed]
+
+    def save_page(self, page: int, batch: pd.DataFrame):
+        """페이지 파일을 원자적으로 쓴 뒤 manifest에 완료로 기록합니다."""
+        self.pages_dir.mkdir(parents=True, exist_ok=True)
+        page_path = self._page_path(page)
+        tmp_path = page_path.with_suffix(".parquet.tmp")
+        write_table(batch, tmp_path, fmt="parquet")
+        os.replace(tmp_path, page_path)
+        self.completed.add(page)
+        self._write_manifest()
+
+    def iter_pages(self, page_limit: int):
+        """완료된 페이지를 페이지 순서대로 (page, DataFrame)으로 읽어옵니다."""
+        for page in sorted(p for p in self.completed if p <= page_limit):
+            yield page, read_table(self._page_path(page))
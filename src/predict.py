@@ -0,0 +1,72 @@
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from core.metrics import ROWS_PROCESSED
+from core.profiler import profile_step
+from core.utils import TableWriter, iter_table
+from src.artifact import load_model
+from src.preprocessor import FEATURES
+
+# 예측 결과에 함께 남길 식별 컬럼 (입력에 있는 것만 사용)
+KEEP_COLUMNS = ("id", "title")
+PREDICTION_COLUMN = "prediction"
+
+
+class BatchPredictor:
+    """모델을 한 번 로드해 대용량 입력을 chunk 단위로 채점하는 batch 추론기"""
+
+    def __init__(self, model, feature_columns: list[str] | None = None, keep_columns=KEEP_COLUMNS):
+        self.model = model
+        # 학습 시 컬럼명이 기록된 모델이면 그 순서를 그대로 사용
+        if feature_columns is None:
+            names = getattr(model, "feature_names_in_", None)
+            feature_columns = [str(c) for c in names] if names is not None else list(FEATURES)
+        self.feature_columns = list(feature_columns)
+        self.keep_columns = list(keep_columns)
+
+    @classmethod
+    def from_path(cls, model_path: str, **kwargs) -> "BatchPredictor":
+        return cls(load_model(model_path), **kwargs)
+
+    def predict_frame(self, df: pd.DataFrame) -> np.ndarray:
+        """특성이 비어 있는 행은 NaN으로 두고 나머지를 한 번에 예측합니다."""
+        missing = [c for c in self.feature_columns if c not in df.columns]
+        if missing:
+            raise ValueError(f"입력에 특성 컬럼이 없습니다: {missing}")
+        X = df[self.feature_columns].apply(pd.to_numeric, errors="coerce")
+        valid = X.notna().all(axis=1).to_numpy()
+        predictions = np.full(len(df), np.nan)
+        if valid.any():
+            predictions[valid] = self.model.predict(X[valid])
+        return predictions
+
+    def score_file(self, input_path, output_path, chunksize: int = 100_000) -> dict:
+        """input_path(csv/parquet/arrow)를 chunk 단위로 읽어 예측하고 output_path에 이어 씁니다.
+
+        메모리 사용량은 입력 크기와 무관하게 chunksize에 비례합니다.
+        """
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        read_columns = self.feature_columns + [c for c in self.keep_columns if c not in self.feature_columns]
+
+        start = time.perf_counter()
+        with TableWriter(output_path) as writer:
+            for chunk in iter_table(input_path, columns=read_columns, chunksize=chunksize):
+                result = chunk[[c for c in self.keep_columns if c in chunk.columns]].copy()
+                with profile_step("predict"):
+                    result[PREDICTION_COLUMN] = self.predict_frame(chunk)
+                with profile_step("write"):
+                    writer.write(result)
+            rows = writer.rows
+        seconds = time.perf_counter() - start
+        ROWS_PROCESSED.inc(rows, stage="predict")
+
+        return {
+            "output": str(output_path),
+            "rows": rows,
+            "seconds": seconds,
+            "rows_per_sec": rows / seconds if seconds > 0 else 0.0,
+        }
@@ -0,0 +1,134 @@
+import json
+import shutil
+import threading
+import time
+from pathlib import Path
+
+from src.artifact import ARTIFACT_SUFFIX
+from src.predict import BatchPredictor
+
+CHAMPION_METRICS_KEY = "models/champion/champion_model.json"
+CHAMPION_MODEL_KEY = "models/champion/champion_model.pkl"
+# MODEL_FORMAT=mmap 일 때 .pkl과 함께 올라가는 메모리 매핑 아티팩트
+CHAMPION_ARTIFACT_KEY = f"models/champion/champion_model{ARTIFACT_SUFFIX}"
+LOAD_VERIFY_RETRIES = 3
+
+
+class ModelRegistry:
+    """S3 챔피언 모델을 주기적으로 확인해, 바뀌었으면 백그라운드에서 로드한 뒤 원자적으로 교체합니다.
+
+    champion_model.json의 ETag만 head로 확인하므로 폴링 비용은 요청 1회입니다.
+    (train은 pkl 업로드가 끝난 뒤 json을 올리므로 json이 바뀌었으면 새 pkl도 준비된 상태입니다.)
+    다운로드 도중 새 챔피언이 올라오면 json/pkl이 head의 ETag와 다른 버전일 수 있으므로,
+    다운로드 후 ETag를 다시 확인해 바뀌었으면 새 ETag로 다시 내려받습니다.
+    교체는 참조 하나를 바꾸는 것이라, 이미 모델을 잡고 진행 중인 예측은 이전 모델로 끝까지 처리됩니다.
+    """
+
+    def __init__(self, s3, local_dir: str, poll_interval: float = 30.0, loader=None,
+                 metrics_key: str = CHAMPION_METRICS_KEY, model_key: str = CHAMPION_MODEL_KEY,
+                 fallback_model_key: str | None = None):
+        self.s3 = s3
+        self.local_dir = Path(local_dir)
+        self.poll_interval = poll_interval
+        self.loader = loader or BatchPredictor.from_path
+        self.metrics_key = metrics_key
+        self.model_key = model_key
+        # model_key가 없으면 대신 받을 모델 (예: 아티팩트가 없는 이전 챔피언은 .pkl)
+        self.fallback_model_key = fallback_model_key
+
+        self.predictor = None
+        self.version = None
+        self.stats = {"checks": 0, "loads": 0, "swaps": 0, "failures": 0, "last_load_seconds": None}
+        self.history = []
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def check(self) -> bool:
+        """json ETag가 바뀌었으면 새 모델을 로드해 교체하고 True를 반환합니다."""
+        with self._lock:
+            self.stats["checks"] += 1
+            try:
+                head = self.s3.head(self.metrics_key)
+            except Exception as e:
+                self.stats["failures"] += 1
+                print(f"[registry] 챔피언 확인 실패: {e}")
+                return False
+            if head is None or (self.version and head["etag"] == self.version["etag"]):
+                return False
+            return self._load(head["etag"])
+
+    def _load(self, etag: str) -> bool:
+        started = time.perf_counter()
+        for attempt in range(LOAD_VERIFY_RETRIES):
+            version_dir = self.local_dir / etag.strip('"')
+            metrics_path = version_dir / Path(self.metrics_key).name
+            model_path = version_dir / Path(self.model_key).name
+
+            results = self.s3.download_many([(self.metrics_key, metrics_path), (self.model_key, model_path)])
+            if not results[1]["ok"] and self.fallback_model_key:
+                model_path = version_dir / Path(self.fallback_model_key).name
+                results[1:] = self.s3.download_many([(self.fallback_model_key, model_path)])
+            failed = [result for result in results if not result["ok"]]
+            if failed:
+                self.stats["failures"] += 1
+                print(f"[registry] 챔피언 다운로드 실패: {[(r['key'], r['error']) for r in failed]}")
+                return False
+            try:
+                head = self.s3.head(self.metrics_key)
+            except Exception as e:
+                head = None
+                print(f"[registry] 챔피언 확인 실패: {e}")
+            if head is not None and head["etag"] == etag:
+                break
+            shutil.rmtree(version_dir, ignore_errors=True)
+            if head is None:
+                self.stats["failures"] += 1
+                return False
+            print(f"[registry] 다운로드 중 챔피언이 바뀌었습니다. 다시 내려받습니다 ({attempt + 1}/{LOAD_VERIFY_RETRIES})")
+            etag = head["etag"]
+        else:
+            self.stats["failures"] += 1
+            print(f"[registry] 챔피언이 계속 바뀌어 로드하지 못했습니다 (etag={etag})")
+            return False
+        try:
+            predictor = self.loader(str(model_path))
+            with open(metrics_path, "r") as f:
+                metrics = json.load(f)
+        except Exception as e:
+            self.stats["failures"] += 1
+            print(f"[registry] 챔피언 로드 실패: {e}")
+            return False
+        seconds = time.perf_counter() - started
+
+        previous = self.version
+        self.predictor = predictor
+        self.version = {"etag": etag, "metrics": metrics, "loaded_at": time.time(), "path": str(model_path)}
+        self.stats["loads"] += 1
+        if previous is not None:
+            self.stats["swaps"] += 1
+            shutil.rmtree(Path(previous["path"]).parent, ignore_errors=True)
+        self.stats["last_load_seconds"] = seconds
+        self.history.append({"etag": etag, "seconds": seconds, "loaded_at": self.version["loaded_at"]})
+        print(f"[registry] 챔피언 모델 {'교체' if previous else '로드'} 완료 (etag={etag}, {seconds:.3f}s)")
+        return True
+
+    def _poll(self):
+        while not self._stopped.wait(self.poll_interval):
+            self.check()
+
+    def start(self):
+        """poll_interval마다 챔피언을 확인하는 백그라운드 스레드를 시작합니다."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._poll, name="model-registry", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def status(self) -> dict:
+        version = self.version or {}
+        return {"etag": version.get("etag"), "loaded_at": version.get("loaded_at"), **self.stats}
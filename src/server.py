@@ -0,0 +1,217 @@
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+from core.metrics import API_REQUEST_DURATION, API_REQUESTS, CONTENT_TYPE, REGISTRY
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # 동시 접속이 몰릴 때 기본값(5)으로는 accept 대기열이 넘쳐 연결이 reset 됩니다.
+    request_queue_size = 1024
+
+
+class MicroBatcher:
+    """동시에 들어온 예측 요청을 모아 한 번의 vectorized predict로 처리합니다.
+
+    첫 요청이 도착하면 max_wait_ms 동안(또는 max_batch_size 행이 찰 때까지) 뒤따르는 요청을 모아
+    한 배치로 예측한 뒤 요청별로 결과를 나눠 돌려줍니다.
+    """
+
+    def __init__(self, predict_fn, max_batch_size: int = 256, max_wait_ms: float = 2.0):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.stats = {"batches": 0, "rows": 0, "requests": 0}
+        self._queue = queue.Queue()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, rows: np.ndarray) -> Future:
+        """rows(2차원 특성 배열)를 큐에 넣고 예측 결과를 받을 Future를 반환합니다."""
+        future = Future()
+        self._queue.put((rows, future))
+        return future
+
+    def _collect(self) -> list:
+        try:
+            first = self._queue.get(timeout=0.1)
+        except queue.Empty:
+            return []
+        items, size = [first], len(first[0])
+        deadline = time.perf_counter() + self.max_wait
+        while size < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            items.append(item)
+            size += len(item[0])
+        return items
+
+    def _run(self):
+        while not self._stopped.is_set():
+            items = self._collect()
+            if not items:
+                continue
+            try:
+                predictions = self.predict_fn(np.concatenate([rows for rows, _ in items]))
+            except Exception as e:
+                for _, future in items:
+                    future.set_exception(e)
+                continue
+
+            offset = 0
+            for rows, future in items:
+                future.set_result(predictions[offset:offset + len(rows)])
+                offset += len(rows)
+            self.stats["batches"] += 1
+            self.stats["rows"] += offset
+            self.stats["requests"] += len(items)
+
+    def close(self):
+        self._stopped.set()
+        self._thread.join(timeout=1)
+
+
+class PredictionServer:
+    """챔피언 모델을 메모리에 올려 두고 HTTP로 예측을 제공하는 서버 (표준 라이브러리 ThreadingHTTPServer 기반)
+
+    GET /health: 프로세스 생존 확인 (liveness)
+    GET /ready: 모델이 로드되어 예측 가능한지 확인 (readiness, 모델이 없으면 503)
+    POST /predict: {"instances": [{"popularity": ..., "vote_count": ...}, ...]} -> {"predictions": [...]}
+    GET /metrics: Prometheus 지표 (요청 지연 시간 api_request_duration_seconds{api="predict"} 등)
+    """
+
+    def __init__(self, predictor=None, host: str = "0.0.0.0", port: int = 8000, max_batch_size: int = 256,
+                 max_wait_ms: float = 2.0, request_timeout: float = 10.0, registry=None):
+        # registry를 지정하면 매 배치마다 registry의 현재 모델을 사용 (무중단 교체)
+        self._predictor = predictor
+        self.registry = registry
+        self.request_timeout = request_timeout
+        self.batcher = MicroBatcher(self._predict_batch, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+        self.httpd = _HTTPServer((host, port), self._make_handler())
+
+    @property
+    def port(self) -> int:
+        return self.httpd.server_address[1]
+
+    @property
+    def predictor(self):
+        return self.registry.predictor if self.registry is not None else self._predictor
+
+    @property
+    def ready(self) -> bool:
+        return self.predictor is not None
+
+    def _predict_batch(self, rows: np.ndarray) -> np.ndarray:
+        # 배치 시작 시점의 모델을 잡아 두므로, 도중에 모델이 교체되어도 이 배치는 같은 모델로 끝납니다.
+        predictor = self.predictor
+        return predictor.predict_frame(pd.DataFrame(rows, columns=predictor.feature_columns))
+
+    def _parse_instances(self, payload) -> np.ndarray:
+        instances = payload.get("instances", [payload]) if isinstance(payload, dict) else payload
+        if not isinstance(instances, list) or not instances:
+            raise ValueError("instances must be a non-empty list")
+        features = self.predictor.feature_columns
+        rows = [
+            [instance.get(name) for name in features] if isinstance(instance, dict) else instance
+            for instance in instances
+        ]
+        rows = np.array(rows, dtype=np.float64)
+        if rows.ndim != 2 or rows.shape[1] != len(features):
+            raise ValueError(f"each instance needs features {features}")
+        return rows
+
+    def predict(self, payload) -> list:
+        rows = self._parse_instances(payload)
+        predictions = self.batcher.submit(rows).result(timeout=self.request_timeout)
+        return [None if np.isnan(p) else float(p) for p in predictions]
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # 헤더와 본문이 나뉘어 전송될 때 Nagle + delayed ACK로 수십 ms씩 지연되지 않도록 설정
+            disable_nagle_algorithm = True
+
+            def _send(self, status: int, body, content_type: str = "application/json"):
+                data = body.encode() if isinstance(body, str) else json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if self.path == "/health":
+                    self._send(200, {"status": "ok"})
+                elif self.path == "/ready":
+                    if server.ready:
+                        body = {"status": "ready"}
+                        if server.registry is not None:
+                            body["model"] = server.registry.status()
+                        self._send(200, body)
+                    else:
+                        self._send(503, {"status": "model not loaded"})
+                elif self.path == "/metrics":
+                    self._send(200, REGISTRY.render(), content_type=CONTENT_TYPE)
+                else:
+                    self._send(404, {"error": "not found"})
+
+            def do_POST(self):
+                if self.path != "/predict":
+                    self._send(404, {"error": "not found"})
+                    return
+                start = time.perf_counter()
+                length = int(self.headers.get("Content-Length", 0))
+                body = self.rfile.read(length)
+                if not server.ready:
+                    status, response = 503, {"error": "model not loaded"}
+                else:
+                    try:
+                        status, response = 200, {"predictions": server.predict(json.loads(body))}
+                    except (ValueError, TypeError) as e:
+                        status, response = 400, {"error": str(e)}
+                    except Exception as e:
+                        status, response = 500, {"error": str(e)}
+                self._send(status, response)
+                API_REQUEST_DURATION.observe(time.perf_counter() - start, api="predict")
+                API_REQUESTS.inc(api="predict", status=status)
+
+            def log_message(self, format, *args):
+                # 요청마다 출력하면 지연 시간이 늘어나므로 기본 access log는 끕니다.
+                pass
+
+        return Handler
+
+    def serve_forever(self):
+        print(f"Prediction server listening on {self.httpd.server_address[0]}:{self.port}")
+        try:
+            self.httpd.serve_forever()
+        finally:
+            self.close()
+
+    def start(self) -> threading.Thread:
+        """백그라운드 스레드에서 서버를 실행합니다. (테스트/부하 테스트용)"""
+        thread = threading.Thread(target=self.httpd.serve_forever, name="prediction-server", daemon=True)
+        thread.start()
+        return thread
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.batcher.close()
+        if self.registry is not None:
+            self.registry.stop()
@@ -0,0 +1,160 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+class SufficientStats:
+    """선형회귀의 충분통계 (샘플 수, 평균, 중심화된 XᵀX / Xᵀy / yᵀy)
+
+    스냅샷별로 계산해 두면 원본 데이터를 다시 읽지 않고 O(features²)로 병합할 수 있고,
+    병합된 통계만으로 회귀계수와 MSE/R²를 closed-form으로 구합니다.
+    (평균 중심화 + 병렬 분산 병합식을 사용해 큰 값의 특성에서도 수치적으로 안정적입니다.)
+    """
+
+    def __init__(self, features: list[str], n: int = 0, mean_x=None, mean_y: float = 0.0, cxx=None, cxy=None,
+                 cyy: float = 0.0):
+        k = len(features)
+        self.features = list(features)
+        self.n = int(n)
+        self.mean_x = np.zeros(k) if mean_x is None else np.asarray(mean_x, dtype=np.float64)
+        self.mean_y = float(mean_y)
+        self.cxx = np.zeros((k, k)) if cxx is None else np.asarray(cxx, dtype=np.float64)
+        self.cxy = np.zeros(k) if cxy is None else np.asarray(cxy, dtype=np.float64)
+        self.cyy = float(cyy)
+
+    @classmethod
+    def from_arrays(cls, X, y, features: list[str]) -> "SufficientStats":
+        X = np.asarray(X, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        if len(y) == 0:
+            return cls(features)
+        mean_x = X.mean(axis=0)
+        mean_y = y.mean()
+        Xc = X - mean_x
+        yc = y - mean_y
+        return cls(features, len(y), mean_x, mean_y, Xc.T @ Xc, Xc.T @ yc, yc @ yc)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, target_column: str, feature_columns: list[str]) -> "SufficientStats":
+        return cls.from_arrays(df[feature_columns].to_numpy(), df[target_column].to_numpy(), feature_columns)
+
+    def merge(self, other: "SufficientStats") -> "SufficientStats":
+        """두 통계를 합친 새 객체를 반환합니다."""
+        if other.features != self.features:
+            raise ValueError(f"특성 목록이 다른 통계는 병합할 수 없습니다: {self.features} != {other.features}")
+        if other.n == 0:
+            return self.copy()
+        if self.n == 0:
+            return other.copy()
+
+        n = self.n + other.n
+        weight = self.n * other.n / n
+        dx = other.mean_x - self.mean_x
+        dy = other.mean_y - self.mean_y
+        return SufficientStats(
+            self.features,
+            n,
+            self.mean_x + dx * other.n / n,
+            self.mean_y + dy * other.n / n,
+            self.cxx + other.cxx + np.outer(dx, dx) * weight,
+            self.cxy + other.cxy + dx * dy * weight,
+            self.cyy + other.cyy + dy * dy * weight,
+        )
+
+    __add__ = merge
+
+    def copy(self) -> "SufficientStats":
+        return SufficientStats(
+            self.features, self.n, self.mean_x.copy(), self.mean_y, self.cxx.copy(), self.cxy.copy(), self.cyy
+        )
+
+    @classmethod
+    def merge_all(cls, stats_list) -> "SufficientStats":
+        stats_list = list(stats_list)
+        if not stats_list:
+            raise ValueError("병합할 통계가 없습니다.")
+        merged = stats_list[0]
+        for stats in stats_list[1:]:
+            merged = merged.merge(stats)
+        return merged
+
+    def solve(self) -> tuple[np.ndarray, float]:
+        """(회귀계수, 절편)을 반환합니다. 특이 행렬이면 최소 노름 해를 사용합니다."""
+        if self.n == 0:
+            raise ValueError("샘플이 없는 통계로는 학습할 수 없습니다.")
+        # 특성 스케일 차이로 XᵀX의 조건수가 커지지 않도록 대각 성분으로 정규화한 뒤 풉니다.
+        scale = np.sqrt(np.diag(self.cxx))
+        scale[scale == 0] = 1.0
+        coef = np.linalg.lstsq(self.cxx / np.outer(scale, scale), self.cxy / scale, rcond=None)[0] / scale
+        return coef, float(self.mean_y - self.mean_x @ coef)
+
+    def metrics(self, coef: np.ndarray, intercept: float | None = None) -> dict:
+        """주어진 계수의 MSE와 R²
+
+        intercept를 생략하면 이 통계에 최적인 절편을 가정하고(학습 데이터 기준),
+        지정하면 다른 데이터로 학습한 모델을 이 통계의 데이터로 평가한 값(out-of-sample)을 반환합니다.
+        """
+        sse = self.cyy - 2 * coef @ self.cxy + coef @ self.cxx @ coef
+        if intercept is not None:
+            sse += self.n * (self.mean_y - intercept - self.mean_x @ coef) ** 2
+        sse = max(float(sse), 0.0)
+        r2 = 1.0 - sse / self.cyy if self.cyy > 0 else 0.0
+        return {"mse": sse / self.n, "r2": float(r2)}
+
+    def save(self, path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                features=np.array(self.features, dtype=str),
+                n=self.n,
+                mean_x=self.mean_x,
+                mean_y=self.mean_y,
+                cxx=self.cxx,
+                cxy=self.cxy,
+                cyy=self.cyy,
+            )
+        tmp_path.replace(path)
+        return path
+
+    @classmethod
+    def load(cls, path) -> "SufficientStats":
+        return cls.merge_all(cls.load_folds(path))
+
+    @staticmethod
+    def save_folds(fold_stats: list, path) -> Path:
+        """fold별 통계를 한 파일에 쌓아 저장합니다. (k-fold 검증을 다시 계산할 수 있도록)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                features=np.array(fold_stats[0].features, dtype=str),
+                n=np.array([stats.n for stats in fold_stats]),
+                mean_x=np.stack([stats.mean_x for stats in fold_stats]),
+                mean_y=np.array([stats.mean_y for stats in fold_stats]),
+                cxx=np.stack([stats.cxx for stats in fold_stats]),
+                cxy=np.stack([stats.cxy for stats in fold_stats]),
+                cyy=np.array([stats.cyy for stats in fold_stats]),
+            )
+        tmp_path.replace(path)
+        return path
+
+    @classmethod
+    def load_folds(cls, path) -> list["SufficientStats"]:
+        """save_folds()로 저장한 fold별 통계 목록 (save()로 저장한 파일은 fold 1개)"""
+        with np.load(path, allow_pickle=False) as data:
+            features = [str(f) for f in data["features"]]
+            if data["n"].ndim == 0:
+                return [cls(features, int(data["n"]), data["mean_x"], float(data["mean_y"]), data["cxx"], data["cxy"],
+                            float(data["cyy"]))]
+            return [
+                cls(features, int(n), mean_x, float(mean_y), cxx, cxy, float(cyy))
+                for n, mean_x, mean_y, cxx, cxy, cyy in zip(
+                    data["n"], data["mean_x"], data["mean_y"], data["cxx"], data["cxy"], data["cyy"]
+                )
+            ]
@@ -0,0 +1,77 @@
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from sklearn.ensemble import GradientBoostingRegressor, RandomForestRegressor
+from sklearn.linear_model import LinearRegression, Ridge
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import PolynomialFeatures, StandardScaler
+
+
+def default_candidates(random_state: int = 42) -> dict:
+    """sweep 기본 후보 (이름 -> 학습 전 estimator)"""
+    candidates = {"linear": LinearRegression()}
+    for alpha in (0.1, 1.0, 10.0):
+        candidates[f"ridge_a{alpha:g}"] = make_pipeline(StandardScaler(), Ridge(alpha=alpha))
+    for degree in (2, 3):
+        candidates[f"poly{degree}_ridge"] = make_pipeline(
+            PolynomialFeatures(degree), StandardScaler(), Ridge(alpha=1.0)
+        )
+    candidates["random_forest"] = RandomForestRegressor(
+        n_estimators=100, max_depth=10, min_samples_leaf=5, n_jobs=1, random_state=random_state
+    )
+    candidates["gradient_boosting"] = GradientBoostingRegressor(random_state=random_state)
+    return candidates
+
+
+def _fit_candidate(name: str, estimator, x_path: str, y_path: str, n_train: int) -> dict:
+    """프로세스 풀 워커: memmap으로 공유된 X/y의 앞 n_train행으로 학습하고 나머지 holdout으로 평가합니다."""
+    X = np.load(x_path, mmap_mode="r")
+    y = np.load(y_path, mmap_mode="r")
+
+    start = time.perf_counter()
+    estimator.fit(X[:n_train], y[:n_train])
+    fit_seconds = time.perf_counter() - start
+
+    y_holdout = np.asarray(y[n_train:])
+    residual = estimator.predict(X[n_train:]) - y_holdout
+    sse = float(residual @ residual)
+    sst = float(((y_holdout - y_holdout.mean()) ** 2).sum())
+    return {
+        "name": name,
+        "mse": sse / len(y_holdout),
+        "r2": 1.0 - sse / sst if sst > 0 else 0.0,
+        "fit_seconds": fit_seconds,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def run_sweep(X: np.ndarray, y: np.ndarray, candidates: dict, holdout: float = 0.2,
+              max_workers: int | None = None, random_state: int = 42) -> list[dict]:
+    """후보들을 프로세스 풀에서 병렬 학습하고 holdout MSE 오름차순으로 결과를 반환합니다.
+
+    X/y는 한 번 섞은 뒤 임시 .npy로 저장하고 워커는 memmap으로 읽으므로,
+    후보 수만큼 특성 행렬을 pickle로 복사해 보내지 않습니다.
+    """
+    if len(y) < 2:
+        raise ValueError("sweep에는 최소 2개 이상의 샘플이 필요합니다.")
+    order = np.random.default_rng(random_state).permutation(len(y))
+    n_train = min(max(int(len(y) * (1 - holdout)), 1), len(y) - 1)
+    max_workers = min(max_workers or os.cpu_count() or 1, len(candidates))
+
+    with tempfile.TemporaryDirectory(prefix="sweep-") as tmp:
+        x_path, y_path = str(Path(tmp) / "X.npy"), str(Path(tmp) / "y.npy")
+        np.save(x_path, np.ascontiguousarray(np.asarray(X, dtype=np.float64)[order]))
+        np.save(y_path, np.asarray(y, dtype=np.float64)[order])
+
+        args = [(name, estimator, x_path, y_path, n_train) for name, estimator in candidates.items()]
+        if max_workers == 1:
+            results = [_fit_candidate(*arg) for arg in args]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(_fit_candidate, *zip(*args)))
+
+    return sorted(results, key=lambda result: result["mse"])
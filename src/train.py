@@ -1,59 +1,294 @@
 import json
 import os
 import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
 
-import joblib
+import numpy as np
 import pandas as pd
+from sklearn.base import clone
+from sklearn.exceptions import NotFittedError
 from sklearn.linear_model import LinearRegression
 from sklearn.metrics import mean_squared_error
+from sklearn.utils.validation import check_is_fitted
+
+from core.metrics import track_training
+from core.profiler import profile_step
+from core.utils import iter_table, read_table
+from src.artifact import save_model_file
+from src.suffstats import SufficientStats
+from src.sweep import default_candidates, run_sweep
+from src.validation import cross_validate, cross_validate_stats
+
+
+def _shard_stats(path: str, target_column: str, feature_columns: list[str] | None, chunksize: int,
+                 n_folds: int = 1, seed: int = 0) -> list:
+    """map 단계 워커: 파일 하나를 chunk 단위로 읽으며 fold별 부분 충분통계를 누적합니다.
+
+    각 행은 seed로 정해지는 무작위 fold에 배정되며, 데이터가 없는 fold는 None 입니다.
+    """
+    columns = list(feature_columns) + [target_column] if feature_columns is not None else None
+    rng = np.random.default_rng(seed)
+    fold_stats = [None] * n_folds
+    for chunk in iter_table(path, columns=columns, chunksize=chunksize):
+        if target_column not in chunk.columns:
+            raise ValueError(f"Target column '{target_column}' not found in {path}.")
+        features = list(feature_columns) if feature_columns is not None else [
+            c for c in chunk.columns if c != target_column
+        ]
+        folds = rng.integers(0, n_folds, len(chunk))
+        for k in range(n_folds):
+            part = SufficientStats.from_frame(chunk[folds == k], target_column, features)
+            fold_stats[k] = part if fold_stats[k] is None else fold_stats[k].merge(part)
+    return fold_stats
+
+
+def metric_kind(metrics: dict) -> str:
+    """챔피언 비교에 쓰는 지표 종류
+
+    cv_mse가 있으면 검증 방식까지 포함한 "cv_mse/{cv_method}", 없으면 sweep은 holdout MSE("holdout_mse"),
+    그 외에는 학습 데이터 MSE("mse") 입니다. 종류가 다른 지표끼리는 비교하지 않습니다.
+    """
+    if "cv_mse" in metrics:
+        return f"cv_mse/{metrics.get('cv_method', 'kfold')}"
+    return "holdout_mse" if "candidates" in metrics else "mse"
+
+
+def _metric_value(metrics: dict, kind: str) -> float:
+    return metrics.get("cv_mse" if kind.startswith("cv_mse") else "mse", float("inf"))
 
 
 class ModelTrainer:
-    def __init__(self, target_column='vote_average'):
+    def __init__(self, target_column='vote_average', feature_columns: list[str] | None = None, cv_folds: int = 5,
+                 cv_method: str = "kfold", model_format: str = "joblib"):
         self.target_column = target_column
+        # None이면 타겟을 제외한 모든 컬럼을 특성으로 사용
+        self.feature_columns = feature_columns
         self.model = LinearRegression()
+        # 교차 검증 fold 수 (0이면 검증 생략) / 방식 (kfold: 무작위 k-fold, time: 행 순서 기준 expanding window)
+        self.cv_folds = cv_folds
+        self.cv_method = cv_method
+        # 모델 파일 포맷 (joblib: joblib compress=3, mmap: joblib과 함께 메모리 매핑 아티팩트(.mlmodel)도 저장)
+        self.model_format = model_format
 
-    def train(self, data_path: str) -> dict:
-        """데이터를 읽어 학습시키고 지표를 반환합니다."""
-        df = pd.read_csv(data_path)
+    def _load_frame(self, data_path: str | pd.DataFrame) -> pd.DataFrame:
+        """학습에 필요한 컬럼만 읽어옵니다. (파일 경로: csv/parquet/arrow, 또는 DataFrame)"""
+        columns = None
+        if self.feature_columns is not None:
+            columns = list(self.feature_columns) + [self.target_column]
+        if isinstance(data_path, pd.DataFrame):
+            df = data_path[data_path.columns.intersection(columns)] if columns else data_path
+        else:
+            with profile_step("read"):
+                df = read_table(data_path, columns=columns)
 
         # 타겟 컬럼이 존재하지 않을 경우를 대비한 안전 장치
         if self.target_column not in df.columns:
             raise ValueError(f"Target column '{self.target_column}' not found in dataset.")
+        return df
+
+    @track_training("full")
+    def train(self, data_path: str | pd.DataFrame) -> dict:
+        """데이터를 읽어 학습시키고 지표를 반환합니다. (파일 경로: csv/parquet/arrow, 또는 DataFrame)"""
+        df = self._load_frame(data_path)
 
         X = df.drop(columns=[self.target_column])
         y = df[self.target_column]
 
-        self.model.fit(X, y)
+        with profile_step("fit"):
+            self.model.fit(X, y)
 
         y_pred = self.model.predict(X)
         mse = mean_squared_error(y, y_pred)
         r2 = self.model.score(X, y)
 
-        return {
+        metrics = {
             "mse": float(mse),
             "r2": float(r2),
             "features": list(X.columns),
             "sample_count": len(df)
         }
 
+        # 학습에 쓰지 않은 fold로 평가한 out-of-sample 지표 (fold당 최소 2행이 필요)
+        if self.cv_folds and len(df) >= self.cv_folds * 2:
+            with profile_step("cv"):
+                metrics.update(cross_validate(self.model, X, y, n_splits=self.cv_folds, method=self.cv_method))
+            fold_times = ", ".join(f"{t:.3f}" for t in metrics["fold_times"])
+            print(
+                f"{self.cv_folds}-fold {self.cv_method} CV: mse={metrics['cv_mse']:.6f} r2={metrics['cv_r2']:.4f} "
+                f"({metrics['cv_seconds']:.2f}s, fold times: {fold_times})"
+            )
+        return metrics
+
+    @track_training("sweep")
+    def train_sweep(self, data_path: str | pd.DataFrame, candidates: dict | None = None, holdout: float = 0.2,
+                    max_workers: int | None = None) -> dict:
+        """여러 후보 모델을 병렬로 학습해 holdout MSE가 가장 낮은 후보를 전체 데이터로 다시 학습합니다.
+
+        반환 지표의 mse/r2는 최고 후보의 holdout 값이며, candidates에 후보별 지표와 학습 시간이 담깁니다.
+        """
+        df = self._load_frame(data_path)
+        X = df.drop(columns=[self.target_column])
+        y = df[self.target_column]
+        candidates = candidates or default_candidates()
+
+        start = time.perf_counter()
+        with profile_step("sweep"):
+            results = run_sweep(X.to_numpy(), y.to_numpy(), candidates, holdout=holdout, max_workers=max_workers)
+        print(f"Candidate sweep: {len(results)} candidates in {time.perf_counter() - start:.2f}s")
+        for rank, result in enumerate(results, start=1):
+            print(
+                f"  {rank}. {result['name']:<18} mse={result['mse']:.6f} r2={result['r2']:.4f} "
+                f"fit={result['fit_seconds']:.2f}s"
+            )
+
+        best = results[0]
+        with profile_step("fit"):
+            self.model = clone(candidates[best["name"]]).fit(X, y)
+        metrics = {
+            "mse": best["mse"],
+            "r2": best["r2"],
+            "features": list(X.columns),
+            "sample_count": len(df),
+            "model": best["name"],
+            "candidates": results,
+        }
+        # 다른 학습 경로와 같은 종류의 지표(cv_mse)로 챔피언을 비교할 수 있도록 최고 후보도 같은 방식으로 검증
+        if self.cv_folds and len(df) >= self.cv_folds * 2:
+            with profile_step("cv"):
+                metrics.update(cross_validate(self.model, X, y, n_splits=self.cv_folds, method=self.cv_method))
+        return metrics
+
+    def compute_stats(self, data_path: str | pd.DataFrame) -> SufficientStats:
+        """데이터 한 묶음(스냅샷)의 충분통계를 계산합니다."""
+        return SufficientStats.merge_all(self.compute_fold_stats(data_path, n_folds=1))
+
+    def compute_fold_stats(self, data_path: str | pd.DataFrame, n_folds: int, seed: int = 0) -> list[SufficientStats]:
+        """스냅샷의 각 행을 무작위 fold에 배정해 fold별 충분통계를 계산합니다. (train_sharded와 같은 배정 방식)"""
+        df = self._load_frame(data_path)
+        features = [c for c in df.columns if c != self.target_column]
+        folds = np.random.default_rng(seed).integers(0, n_folds, len(df))
+        return [SufficientStats.from_frame(df[folds == k], self.target_column, features) for k in range(n_folds)]
+
+    def train_from_stats(self, stats: SufficientStats) -> dict:
+        """병합된 충분통계에서 closed-form으로 LinearRegression을 구성하고 train()과 같은 형태의 지표를 반환합니다."""
+        with profile_step("fit"):
+            coef, intercept = stats.solve()
+        model = LinearRegression()
+        model.coef_ = coef
+        model.intercept_ = intercept
+        model.n_features_in_ = len(stats.features)
+        model.feature_names_in_ = np.array(stats.features, dtype=object)
+        self.model = model
+
+        metrics = stats.metrics(coef)
+        return {
+            "mse": metrics["mse"],
+            "r2": metrics["r2"],
+            "features": list(stats.features),
+            "sample_count": stats.n,
+        }
+
+    @track_training("sharded")
+    def train_sharded(self, data_paths: list, chunksize: int = 100_000, max_workers: int | None = None) -> dict:
+        """메모리에 다 올릴 수 없는 데이터를 파일(샤드)별로 나눠 학습합니다.
+
+        map: 프로세스 풀에서 파일마다 chunk 단위로 부분 충분통계를 계산
+        reduce: 부분 통계를 병합해 closed-form으로 풀고 train()과 같은 형태의 지표(k-fold 검증 포함)를 반환
+        """
+        data_paths = [str(p) for p in data_paths]
+        if not data_paths:
+            raise ValueError("학습할 파일이 없습니다.")
+        max_workers = min(max_workers or os.cpu_count() or 1, len(data_paths))
+
+        start = time.perf_counter()
+        n_folds = max(self.cv_folds, 1)
+        args = (
+            data_paths,
+            repeat(self.target_column),
+            repeat(self.feature_columns),
+            repeat(chunksize),
+            repeat(n_folds),
+            range(len(data_paths)),
+        )
+        with profile_step("shard_stats"):
+            if max_workers == 1:
+                partials = list(map(_shard_stats, *args))
+            else:
+                with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                    partials = list(executor.map(_shard_stats, *args))
+
+        # reduce: 샤드 간 같은 fold끼리 병합한 뒤 전체 통계로 학습, fold 통계로 k-fold 검증
+        fold_stats = [
+            SufficientStats.merge_all(shard[k] for shard in partials if shard[k] is not None)
+            for k in range(n_folds)
+            if any(shard[k] is not None for shard in partials)
+        ]
+        if not fold_stats:
+            raise ValueError("학습할 데이터가 없습니다.")
+        metrics = self.train_from_stats(SufficientStats.merge_all(fold_stats))
+        if self.cv_folds and len(fold_stats) == self.cv_folds and metrics["sample_count"] >= self.cv_folds * 2:
+            metrics.update(cross_validate_stats(fold_stats))
+        print(
+            f"Sharded training: {len(data_paths)} shards, {metrics['sample_count']} rows, "
+            f"{max_workers} workers, {time.perf_counter() - start:.2f}s"
+        )
+        return metrics
+
+    @track_training("incremental")
+    def train_incremental(self, data_path: str | pd.DataFrame, snapshot_id: str, stats_dir: str,
+                          window: int | None = None) -> dict:
+        """새 스냅샷의 충분통계를 {stats_dir}/{snapshot_id}.npz 로 저장하고,
+        snapshot_id 이하의 최근 window개(None이면 전체) 스냅샷 통계를 병합해 학습합니다.
+
+        과거 스냅샷의 원본 데이터는 다시 읽지 않습니다.
+        스냅샷 통계는 fold별로 저장하므로, 같은 fold끼리 병합해 train()/train_sharded()와 같은 k-fold 지표를 계산합니다.
+        """
+        n_folds = max(self.cv_folds, 1)
+        stats_path = Path(stats_dir) / f"{snapshot_id}.npz"
+        SufficientStats.save_folds(self.compute_fold_stats(data_path, n_folds), stats_path)
+
+        paths = sorted(p for p in Path(stats_dir).glob("*.npz") if p.stem <= str(snapshot_id))
+        if window:
+            paths = paths[-int(window):]
+        snapshot_folds = [SufficientStats.load_folds(p) for p in paths]
+
+        metrics = self.train_from_stats(SufficientStats.merge_all(s for folds in snapshot_folds for s in folds))
+        # fold 없이 저장된 이전 스냅샷이 섞여 있으면 검증을 생략
+        if self.cv_folds and all(len(folds) == self.cv_folds for folds in snapshot_folds):
+            fold_stats = [SufficientStats.merge_all(folds[k] for folds in snapshot_folds) for k in range(self.cv_folds)]
+            if all(stats.n > 0 for stats in fold_stats) and metrics["sample_count"] >= self.cv_folds * 2:
+                metrics.update(cross_validate_stats(fold_stats))
+        metrics["snapshots"] = [p.stem for p in paths]
+        print(f"Incremental training: merged {len(paths)} snapshots ({paths[0].stem} ~ {paths[-1].stem})")
+        return metrics
+
     def save_model(self, output_dir: str, metrics: dict):
         """학습된 모델과 지표를 로컬에 저장합니다."""
-        if not hasattr(self.model, "coef_"):
+        # sweep에서는 선형이 아닌 후보(coef_ 없음)도 선택될 수 있으므로 estimator 공통 방식으로 확인
+        try:
+            check_is_fitted(self.model)
+        except NotFittedError:
             raise ValueError("모델이 아직 학습되지 않았습니다.")
 
         path = Path(output_dir)
         path.mkdir(parents=True, exist_ok=True)
 
-        joblib.dump(self.model, path / "model.pkl", compress=3)
+        with profile_step("dump"):
+            save_model_file(self.model, path / "model.pkl", self.model_format, metadata=metrics)
         with open(path / "metrics.json", 'w') as f:
             json.dump(metrics, f, indent=4)
 
         print(f"Local model and metrics saved to: {output_dir}")
 
     def update_champion_if_better(self, champion_dir: str, new_metrics: dict) -> bool:
-        """기존 챔피언과 MSE를 비교하여 업데이트 여부를 결정합니다."""
+        """기존 챔피언과 MSE를 비교하여 업데이트 여부를 결정합니다.
+
+        비교에는 champion_dir의 champion_model.json만 사용하며, 승격되면 현재 모델로 pkl을 새로 씁니다.
+        (기존 챔피언 모델 파일은 필요하지 않음)
+        """
         path = Path(champion_dir)
         path.mkdir(parents=True, exist_ok=True)
 
@@ -76,15 +311,26 @@ class ModelTrainer:
                 with open(json_path, 'r') as f:
                     old_metrics = json.load(f)
 
-                old_mse = old_metrics.get('mse', float('inf'))
+                # 학습 MSE와 cv_mse처럼 종류가 다른 지표는 비교할 수 없으므로 현재 지표로 평가된 새 모델로 교체
+                # (metric_kind가 없는 이전 챔피언이나 검증 설정이 바뀐 경우에도 챔피언이 고정되지 않도록)
+                metric = metric_kind(new_metrics)
+                old_metric = old_metrics.get("metric_kind") or metric_kind(old_metrics)
+                old_mse = _metric_value(old_metrics, old_metric)
+                new_mse = _metric_value(new_metrics, metric)
                 
                 # [개선] 성능이 완벽히 같더라도 첫 등록 시에는 True가 되도록 하거나 
                 # 부동소수점 오차를 감안하여 비교
-                if new_metrics['mse'] < old_mse:
-                    print(f"SUCCESS: New model is better. (New: {new_metrics['mse']:.6f}, Old: {old_mse:.6f})")
+                if metric != old_metric:
+                    print(
+                        f"SUCCESS: Metric kinds differ (New: {metric}, Old: {old_metric}). "
+                        "Promoting current model so the champion is scored on the current metric."
+                    )
+                    is_better = True
+                elif new_mse < old_mse:
+                    print(f"SUCCESS: New model is better. ({metric} New: {new_mse:.6f}, Old: {old_mse:.6f})")
                     is_better = True
                 else:
-                    print(f"KEEP: Champion is still better or equal. (New: {new_metrics['mse']:.6f}, Old: {old_mse:.6f})")
+                    print(f"KEEP: Champion is still better or equal. ({metric} New: {new_mse:.6f}, Old: {old_mse:.6f})")
             
             except Exception as e:
                 print(f"Error comparing metrics: {e}. Defaulting to true.")
@@ -92,9 +338,10 @@ class ModelTrainer:
 
         # 2. 승격이 확정된 경우 로컬 파일 쓰기
         if is_better:
-            joblib.dump(self.model, model_path, compress=3)
+            with profile_step("dump"):
+                save_model_file(self.model, model_path, self.model_format, metadata=new_metrics)
             with open(json_path, 'w') as f:
-                json.dump(new_metrics, f, indent=4)
+                json.dump({**new_metrics, "metric_kind": metric_kind(new_metrics)}, f, indent=4)
             print(f"Champion files updated locally in {champion_dir}")
         
         return is_better
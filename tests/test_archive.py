@@ -0,0 +1,65 @@
+"""Unit tests for the archive index and leaderboard."""
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from core.s3_client import S3Manager
+from core.storage import MemoryStorageClient
+from src.archive import ARCHIVE_INDEX_KEY, ArchiveIndex, index_row
+
+
+@pytest.fixture
+def archive(tmp_path):
+    """ArchiveIndex over a private in-memory store."""
+    manager = S3Manager(backend="memory")
+    manager.s3 = MemoryStorageClient(store={})
+    return ArchiveIndex(manager, str(tmp_path / "archive"))
+
+
+class TestArchiveIndex:
+    """Test cases for ArchiveIndex."""
+
+    def test_leaderboard_orders_by_metric_within_window(self, archive):
+        """Test that the leaderboard keeps the window, the latest run per date and the metric order."""
+        archive.append([
+            index_row("20240101", "v1", {"mse": 0.5, "cv_mse": 0.6, "r2": 0.1}, recorded_at=1.0),
+            index_row("20240120", "v1", {"mse": 0.9, "cv_mse": 0.2, "r2": 0.3}, recorded_at=2.0),
+            index_row("20240120", "v2", {"mse": 0.3, "cv_mse": 0.4, "r2": 0.5}, recorded_at=3.0, promoted=True),
+            index_row("20240130", "v1", {"mse": 0.4, "r2": 0.4, "folds": [1, 2]}, recorded_at=4.0),
+            index_row("20231201", "v1", {"mse": 0.01}, recorded_at=0.5),
+        ])
+
+        rows = archive.leaderboard(days=30, metric="mse", end_date="20240130")
+        assert [(row["date"], row["mse"]) for row in rows] == [("20240120", 0.3), ("20240130", 0.4), ("20240101", 0.5)]
+        assert rows[0]["promoted"] == 1
+        assert "folds" not in json.loads(rows[1]["metrics"])
+
+        by_cv = archive.leaderboard(days=30, metric="cv_mse", end_date="20240130")
+        assert [row["date"] for row in by_cv] == ["20240120", "20240101"]
+        assert [row["date"] for row in archive.leaderboard(end_date="20240130", trend=True)] == [
+            "20240101", "20240120", "20240130"
+        ]
+        assert len(archive.leaderboard(days=30, end_date="20240130", limit=1)) == 1
+        with pytest.raises(ValueError):
+            archive.leaderboard(metric="accuracy")
+
+    def test_concurrent_appends_are_not_lost(self, archive):
+        """Test that concurrent writers retry instead of overwriting each other's rows."""
+        rows = [index_row(f"202401{day:02d}", "v1", {"mse": day / 100}) for day in range(1, 21)]
+        archive.max_retries = 100
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            assert all(executor.map(lambda row: archive.append([row]), rows))
+        assert len(archive.query("SELECT * FROM runs")) == 20
+
+    def test_rebuild_indexes_existing_archive(self, archive):
+        """Test that rebuild reads archived metrics.json files once and is idempotent."""
+        for date_str, mse in (("20240101", 0.2), ("20240102", 0.1)):
+            archive.s3.s3.put_object(
+                Bucket=archive.s3.bucket_name, Key=f"models/archive/{date_str}/metrics.json",
+                Body=json.dumps({"mse": mse, "r2": 0.5}).encode(),
+            )
+        assert archive.rebuild() == 2
+        assert archive.rebuild() == 0
+        rows = archive.leaderboard(days=7, end_date="20240103")
+        assert [row["date"] for row in rows] == ["20240102", "20240101"]
+        assert archive.s3.read_object(ARCHIVE_INDEX_KEY) is not None
@@ -0,0 +1,77 @@
+"""Unit tests for the memory-mappable model artifact format."""
+import joblib
+import numpy as np
+
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+from src.artifact import is_artifact, load_model, read_metadata, save_artifact, save_model_file
+
+
+@pytest.fixture
+def training_arrays():
+    """Create a small regression problem."""
+    rng = np.random.default_rng(0)
+    X = rng.random((300, 2))
+    return X, X @ np.array([1.5, -2.0]) + 0.3
+
+
+class TestModelArtifact:
+    """Test cases for save_artifact / load_model."""
+
+    def test_linear_roundtrip_is_zero_copy(self, training_arrays, tmp_path):
+        """Test that coefficients are mapped from the file instead of copied."""
+        X, y = training_arrays
+        model = LinearRegression().fit(X, y)
+        path = tmp_path / "model.pkl"
+        save_artifact(model, path, metadata={"mse": 0.0})
+
+        loaded = load_model(path)
+        assert is_artifact(path)
+        np.testing.assert_array_equal(loaded.coef_, model.coef_)
+        np.testing.assert_allclose(loaded.predict(X), model.predict(X))
+        assert not loaded.coef_.flags.owndata
+        assert not loaded.coef_.flags.writeable
+
+        header = read_metadata(path)
+        assert header["metadata"] == {"mse": 0.0}
+        assert header["model_class"].endswith("LinearRegression")
+
+    def test_tree_ensemble_roundtrip(self, training_arrays, tmp_path):
+        """Test that tree ensembles survive the out-of-band buffer layout."""
+        X, y = training_arrays
+        model = RandomForestRegressor(n_estimators=5, random_state=0).fit(X, y)
+        path = tmp_path / "forest.pkl"
+        save_artifact(model, path)
+
+        np.testing.assert_allclose(load_model(path).predict(X), model.predict(X))
+        np.testing.assert_allclose(load_model(path, mmap_mode=False).predict(X), model.predict(X))
+
+    def test_joblib_files_still_load(self, training_arrays, tmp_path):
+        """Test backward compatibility with joblib-compressed champions."""
+        X, y = training_arrays
+        model = LinearRegression().fit(X, y)
+        path = tmp_path / "champion_model.pkl"
+        save_model_file(model, path, model_format="joblib")
+
+        assert not is_artifact(path)
+        assert read_metadata(path) is None
+        np.testing.assert_allclose(load_model(path).predict(X), joblib.load(path).predict(X))
+
+    def test_mmap_format_keeps_pkl_joblib_loadable(self, training_arrays, tmp_path):
+        """Test that the mmap format writes the artifact next to a plain joblib .pkl."""
+        X, y = training_arrays
+        model = LinearRegression().fit(X, y)
+        paths = save_model_file(model, tmp_path / "model.pkl", model_format="mmap", metadata={"mse": 0.0})
+
+        assert paths == [tmp_path / "model.pkl", tmp_path / "model.mlmodel"]
+        np.testing.assert_allclose(joblib.load(paths[0]).predict(X), model.predict(X))
+        assert is_artifact(paths[1])
+        assert read_metadata(paths[1])["metadata"] == {"mse": 0.0}
+        np.testing.assert_allclose(load_model(paths[1]).predict(X), model.predict(X))
+
+    def test_unknown_format_raises(self, training_arrays, tmp_path):
+        """Test that unsupported model formats are rejected."""
+        X, y = training_arrays
+        with pytest.raises(ValueError):
+            save_model_file(LinearRegression().fit(X, y), tmp_path / "m.pkl", model_format="onnx")
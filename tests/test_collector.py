@@ -47,7 +47,7 @@ class TestTMDBCollector:
         assert tmdb_collector.api_key == "test_api_key"
         assert tmdb_collector.base_url == "https://api.themoviedb.org/3"
 
-    @patch("src.collector.requests.get")
+    @patch("src.collector.requests.Session.get")
     def test_fetch_popular_movies(self, mock_get, tmdb_collector, sample_movie_data):
         """Test fetching popular movies from TMDB API."""
         mock_response = Mock()
@@ -63,7 +63,7 @@ class TestTMDBCollector:
         assert "vote_average" in df.columns
         mock_get.assert_called()
 
-    @patch("src.collector.requests.get")
+    @patch("src.collector.requests.Session.get")
     def test_fetch_popular_movies_api_error(self, mock_get, tmdb_collector):
         """Test handling of API errors."""
         mock_response = Mock()
@@ -91,7 +91,7 @@ class TestTMDBCollector:
 
     def test_fetch_popular_movies_empty_result(self, tmdb_collector):
         """Test handling of empty results."""
-        with patch("src.collector.requests.get") as mock_get:
+        with patch("src.collector.requests.Session.get") as mock_get:
             mock_response = Mock()
             mock_response.json.return_value = {"results": []}
             mock_response.status_code = 200
@@ -101,6 +101,114 @@ class TestTMDBCollector:
             assert isinstance(df, pd.DataFrame)
             assert len(df) == 0
 
+    def test_fetch_popular_movies_concurrent_keeps_page_order(self):
+        """Test that concurrent fetching returns rows in page order."""
+        collector = TMDBCollector(api_key="test_api_key", max_workers=4)
+
+        def fake_get(url, timeout=None):
+            page = int(url.rsplit("page=", 1)[1])
+            response = Mock()
+            response.status_code = 200
+            response.json.return_value = {"results": [{"id": page, "title": f"Movie {page}"}]}
+            return response
+
+        with patch.object(collector, "_get_session") as mock_session:
+            mock_session.return_value.get.side_effect = fake_get
+            df = collector.fetch_popular_movies(page_limit=10)
+
+        assert df["id"].tolist() == list(range(1, 11))
+
+    def test_fetch_popular_movies_sequential_reuses_session(self, tmdb_collector, sample_movie_data):
+        """Test that the sequential path sends every page through the shared session."""
+        response = Mock(status_code=200)
+        response.json.return_value = sample_movie_data
+        with patch.object(tmdb_collector, "_get_session") as mock_session, \
+                patch("src.collector.requests.get") as mock_get:
+            mock_session.return_value.get.return_value = response
+            df = tmdb_collector.fetch_popular_movies(page_limit=3, max_workers=1)
+
+        assert len(df) == 6
+        assert mock_session.return_value.get.call_count == 3
+        mock_get.assert_not_called()
+
+    @patch("src.collector.time.sleep")
+    @patch("src.collector.requests.get")
+    def test_fetch_page_retries_on_rate_limit(self, mock_get, mock_sleep, tmdb_collector, sample_movie_data):
+        """Test that 429 responses are retried honouring Retry-After."""
+        limited = Mock(status_code=429, headers={"Retry-After": "2"})
+        ok = Mock(status_code=200, headers={})
+        ok.json.return_value = sample_movie_data
+        mock_get.side_effect = [limited, ok]
+
+        results = tmdb_collector._fetch_page(1)
+
+        assert len(results) == 2
+        mock_sleep.assert_called_once_with(2.0)
+
+    def test_save_raw_stream_appends_batches(self, tmdb_collector, tmp_path, monkeypatch):
+        """Test that streamed page batches are appended to a single raw CSV."""
+        monkeypatch.chdir(tmp_path)
+        batches = [
+            (1, pd.DataFrame({"id": [1, 2], "title": ["A", "B"]})),
+            (2, pd.DataFrame()),
+            (3, pd.DataFrame({"title": ["C"], "id": [3]})),
+        ]
+
+        file_path, total_rows = tmdb_collector.save_raw_stream(iter(batches), "20230101")
+
+        df = pd.read_csv(file_path, encoding="utf-8-sig")
+        assert total_rows == 3
+        assert df["id"].tolist() == [1, 2, 3]
+        assert df["title"].tolist() == ["A", "B", "C"]
+
+    def test_collect_resumable_fetches_only_missing_pages(self, tmdb_collector, tmp_path, monkeypatch):
+        """Test that a rerun for the same date only fetches pages missing from the checkpoint."""
+        monkeypatch.chdir(tmp_path)
+        requested = []
+        failing_pages = {3}
+
+        def fake_fetch(page, get=None):
+            requested.append(page)
+            return None if page in failing_pages else [{"id": page, "title": f"Movie {page}"}]
+
+        with patch.object(tmdb_collector, "_fetch_page", side_effect=fake_fetch):
+            _, first_rows = tmdb_collector.collect_resumable("20230101", page_limit=5)
+            requested.clear()
+            failing_pages.clear()
+            file_path, second_rows = tmdb_collector.collect_resumable("20230101", page_limit=5)
+
+        assert first_rows == 4
+        assert requested == [3]
+        assert second_rows == 5
+        assert pd.read_csv(file_path, encoding="utf-8-sig")["id"].tolist() == [1, 2, 3, 4, 5]
+
+    def test_collect_resumable_parquet_with_null_first_page(self, tmdb_collector, tmp_path, monkeypatch):
+        """Test that a column empty on the first page does not lock the parquet schema to double."""
+        monkeypatch.chdir(tmp_path)
+
+        def fake_fetch(page, get=None):
+            return [{"id": page, "backdrop_path": None if page == 1 else f"/b{page}.jpg"}]
+
+        with patch.object(tmdb_collector, "_fetch_page", side_effect=fake_fetch):
+            file_path, rows = tmdb_collector.collect_resumable("20230101", page_limit=3, fmt="parquet")
+
+        df = pd.read_parquet(file_path)
+        assert rows == 3
+        assert df["backdrop_path"].isna().tolist() == [True, False, False]
+        assert df["backdrop_path"].tolist()[1:] == ["/b2.jpg", "/b3.jpg"]
+
+    def test_save_raw_stream_widens_all_nan_column(self, tmdb_collector, tmp_path):
+        """Test that an all-NaN float column in the first batch accepts strings in later batches."""
+        tmdb_collector.data_dir = tmp_path
+        batches = [
+            (1, pd.DataFrame({"id": [1], "backdrop_path": [float("nan")]})),
+            (2, pd.DataFrame({"id": [2], "backdrop_path": ["/b2.jpg"]})),
+        ]
+        file_path, _ = tmdb_collector.save_raw_stream(iter(batches), "20230101", fmt="parquet")
+        column = pd.read_parquet(file_path)["backdrop_path"]
+        assert column.isna().tolist() == [True, False]
+        assert column[1] == "/b2.jpg"
+
 
 class TestTMDBCollectorIntegration:
     """Integration tests for TMDBCollector (marked as integration tests)."""
@@ -0,0 +1,96 @@
+"""Unit tests for the Prometheus metrics layer."""
+import math
+
+import pytest
+from core import config as cfg
+from core.metrics import (
+    PIPELINE_ERRORS,
+    PIPELINE_RUNS,
+    PIPELINE_STAGE_DURATION,
+    REGISTRY,
+    S3_DOWNLOAD_FAILURES,
+    S3_TRANSFER_BYTES,
+    S3_UPLOAD_FAILURES,
+    Counter,
+    Histogram,
+    MetricsRegistry,
+    Summary,
+    observe_model,
+    observe_s3_transfer,
+    track_stage,
+)
+
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    """Start every test from empty metric values."""
+    REGISTRY.reset()
+    yield
+    REGISTRY.reset()
+
+
+class TestMetrics:
+    """Test cases for metric types, exposition and instrumentation helpers."""
+
+    def test_text_exposition(self):
+        """Test counter, histogram and summary samples in the text format."""
+        registry = MetricsRegistry()
+        counter = Counter("jobs_total", "Jobs.", ["stage"], registry=registry)
+        histogram = Histogram("job_seconds", "Job time.", buckets=(0.1, 1.0), registry=registry)
+        summary = Summary("latency_seconds", "Latency.", ["api"], quantiles=(0.5, 0.99), registry=registry)
+
+        counter.inc(stage="train")
+        counter.inc(2, stage="train")
+        for value in (0.05, 0.5, 5.0):
+            histogram.observe(value)
+        for value in range(1, 101):
+            summary.observe(value / 100, api="tmdb")
+
+        text = registry.render()
+        assert "# TYPE jobs_total counter" in text
+        assert 'jobs_total{stage="train"} 3.0' in text
+        assert 'job_seconds_bucket{le="0.1"} 1' in text
+        assert 'job_seconds_bucket{le="1.0"} 2' in text
+        assert 'job_seconds_bucket{le="+Inf"} 3' in text
+        assert "job_seconds_count 3" in text
+        assert 'latency_seconds{api="tmdb",quantile="0.99"} 1.0' in text
+        assert 'latency_seconds_count{api="tmdb"} 100' in text
+
+        with pytest.raises(ValueError):
+            counter.inc(stage="train", extra="x")
+        with pytest.raises(ValueError):
+            counter.inc(-1, stage="train")
+
+    def test_track_stage_counts_failures(self, tmp_path, monkeypatch):
+        """Test that exceptions and None results count as stage failures and refresh the textfile."""
+        monkeypatch.setattr(cfg, "METRICS_TEXTFILE", str(tmp_path / "pipeline.prom"))
+
+        @track_stage("collect")
+        def stage(result):
+            if result == "boom":
+                raise RuntimeError(result)
+            return result
+
+        stage("ok")
+        stage(None)
+        with pytest.raises(RuntimeError):
+            stage("boom")
+
+        assert PIPELINE_RUNS.value(stage="collect") == 3
+        assert PIPELINE_ERRORS.value(stage="collect") == 2
+        assert PIPELINE_STAGE_DURATION.count(stage="collect") == 3
+        assert 'pipeline_errors_total{stage="collect"} 2.0' in (tmp_path / "pipeline.prom").read_text()
+
+    def test_transfer_and_model_helpers(self):
+        """Test S3 transfer accounting and model gauges."""
+        observe_s3_transfer("upload", True, 100, 0.1)
+        observe_s3_transfer("upload", False, 0, 0.1)
+        observe_s3_transfer("download", False, 0, 0.1, missing=True)
+        observe_model({"mse": 4.0, "cv_mse": 9.0, "r2": 0.5, "sample_count": 10}, "full", 0.2)
+
+        assert S3_TRANSFER_BYTES.value(direction="upload") == 100
+        assert S3_UPLOAD_FAILURES.value() == 1
+        assert S3_DOWNLOAD_FAILURES.value() == 0
+        assert REGISTRY.get("model_rmse").value() == 2.0
+        assert REGISTRY.get("model_cv_rmse").value() == 3.0
+        assert not math.isnan(REGISTRY.get("model_r2").value())
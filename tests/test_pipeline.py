@@ -0,0 +1,179 @@
+"""Unit tests for Pipeline stages on the in-memory storage backend."""
+import numpy as np
+
+import pytest
+from core import storage
+
+
+def fake_results(page, rows=20):
+    """TMDB /movie/popular results for one page."""
+    rng = np.random.default_rng(page)
+    return [
+        {
+            "id": page * 1000 + i,
+            "title": f"Title {page}-{i}",
+            "popularity": float(rng.gamma(2.0, 50.0)),
+            "vote_count": int(rng.integers(0, 30000)),
+            "vote_average": round(float(rng.uniform(0, 10)), 3),
+        }
+        for i in range(rows)
+    ]
+
+
+@pytest.fixture
+def make_pipeline(tmp_path, monkeypatch):
+    """Build Pipelines sharing one fresh in-memory bucket and a fake TMDB.
+
+    The module-level memory store is replaced, so Pipelines created internally (backfill) see the same bucket.
+    """
+    monkeypatch.setenv("WANDB_MODE", "disabled")
+    store = {}
+    monkeypatch.setattr(storage, "_SHARED_MEMORY_STORE", store)
+    from main import Pipeline
+
+    def make(date_str="20240101", work_dir="work", **kwargs):
+        pipeline = Pipeline(
+            storage="memory", date_str=date_str, work_dir=str(tmp_path / work_dir),
+            raw_format="csv", processed_format="csv", upload_compression=None, **kwargs
+        )
+        pipeline.calls = []
+
+        def fetch(page, get=None):
+            pipeline.calls.append(page)
+            return fake_results(page)
+        pipeline.collector._fetch_page = fetch
+        return pipeline
+
+    make.store = store
+    return make
+
+
+class TestPipeline:
+    """Test cases for Pipeline stage caching, resume and backfill."""
+
+    def test_collect_rerun_refetches_failed_page(self, make_pipeline):
+        """Test that a collect with a missing page is not cached, so the rerun fetches only that page."""
+        pipeline = make_pipeline()
+        fetch = pipeline.collector._fetch_page
+        pipeline.collector._fetch_page = lambda page, get=None: None if page == 2 else fetch(page, get)
+
+        pipeline.collect(page_limit=3, max_workers=1)
+        assert pipeline.collector.failed_pages == [2]
+        assert pipeline.cache.stats["collect"] == {"hit": 0, "miss": 1}
+
+        rerun = make_pipeline()
+        raw_path = rerun.collect(page_limit=3, max_workers=1)
+        assert rerun.calls == [2]
+        assert sum(1 for _ in open(raw_path, encoding="utf-8-sig")) == 1 + 3 * 20
+
+        cached = make_pipeline()
+        assert cached.collect(page_limit=3, max_workers=1) == raw_path
+        assert cached.calls == []
+
+    def test_collect_not_cached_when_upload_fails(self, make_pipeline, monkeypatch):
+        """Test that a failed raw upload leaves no cache marker behind."""
+        pipeline = make_pipeline()
+        monkeypatch.setattr(pipeline.s3, "upload_file", lambda *args, **kwargs: False)
+        pipeline.collect(page_limit=2, max_workers=1)
+
+        rerun = make_pipeline()
+        rerun.collect(page_limit=2, max_workers=1)
+        assert rerun.cache.stats["collect"] == {"hit": 0, "miss": 1}
+        assert any(key.startswith("raw/20240101/") for _, key in make_pipeline.store)
+
+    def test_collect_without_resume_clears_checkpoint(self, make_pipeline):
+        """Test that resume=False drops stale checkpoint pages and that stream=True still resumes by default."""
+        pipeline = make_pipeline(force=True)
+        fetch = pipeline.collector._fetch_page
+        pipeline.collector._fetch_page = lambda page, get=None: None if page == 3 else fetch(page, get)
+        pipeline.collect(page_limit=3, max_workers=1, stream=True)
+        assert pipeline.calls == [1, 2]
+
+        rerun = make_pipeline(force=True)
+        rerun.collect(page_limit=3, max_workers=1, stream=True)
+        assert rerun.calls == [3]
+
+        fresh = make_pipeline(force=True)
+        raw_path = fresh.collect(page_limit=2, max_workers=1, stream=True, resume=False)
+        assert fresh.calls == [1, 2]
+        assert not (fresh.collector.data_dir / "raw" / "20240101" / "manifest.json").exists()
+
+        later = make_pipeline(force=True)
+        later.collect(page_limit=2, max_workers=1)
+        assert later.calls == [1, 2]
+        assert sum(1 for _ in open(raw_path, encoding="utf-8-sig")) == 1 + 2 * 20
+
+    @pytest.mark.parametrize("stages", ["preprocess", "train", "preprocess,train"])
+    def test_backfill_stage_combinations(self, make_pipeline, stages):
+        """Test that each backfill stage combination runs in fresh per-date work dirs, reading inputs from storage."""
+        dates = ["20240101", "20240102"]
+        for date_str in dates:
+            seed = make_pipeline(date_str, work_dir="seed")
+            seed.collect(page_limit=2, max_workers=1)
+            if stages == "train":
+                seed.preprocess()
+
+        summary = make_pipeline(work_dir="orchestrator").backfill(dates[0], dates[-1], stages=stages, max_workers=1)
+
+        assert [item["status"] for item in summary] == ["success", "success"]
+        keys = {key for _, key in make_pipeline.store}
+        for date_str in dates:
+            assert f"processed/{date_str}/processed_data.csv" in keys
+            assert (f"models/archive/{date_str}/model.pkl" in keys) == ("train" in stages)
+        assert "models/champion/champion_model.json" not in keys
+
+    def test_train_without_processed_data_fails_cleanly(self, make_pipeline):
+        """Test that train reports a failure when the processed file is neither local nor in storage."""
+        assert make_pipeline().train() is None
+
+    def test_mmap_train_uploads_artifact_next_to_joblib_pkl(self, make_pipeline, tmp_path):
+        """Test that MODEL_FORMAT=mmap keeps champion/archive .pkl files joblib-loadable and adds .mlmodel."""
+        import joblib
+
+        pipeline = make_pipeline()
+        pipeline.trainer.model_format = "mmap"
+        pipeline.trainer.cv_folds = 0
+        pipeline.collect(page_limit=2, max_workers=1)
+        pipeline.preprocess()
+        assert pipeline.train() is not None
+
+        for key in ["models/champion/champion_model", "models/archive/20240101/model"]:
+            pipeline.s3.download_many([(f"{key}.pkl", tmp_path / "check.pkl")])
+            assert hasattr(joblib.load(tmp_path / "check.pkl"), "predict")
+            assert any(stored_key == f"{key}.mlmodel" for _, stored_key in make_pipeline.store)
+        assert pipeline.predict() is not None
+
+    def test_train_not_cached_when_upload_fails(self, make_pipeline, monkeypatch):
+        """Test that a train whose archive upload failed is retrained and re-uploaded on rerun."""
+        seed = make_pipeline(work_dir="seed")
+        seed.collect(page_limit=2, max_workers=1)
+        seed.preprocess()
+
+        pipeline = make_pipeline()
+        upload_many = pipeline.s3.upload_many
+        failed = lambda items, max_workers=None: [{"ok": False, "key": key, "error": "boom"} for _, key in items]
+        monkeypatch.setattr(pipeline.s3, "upload_many", failed)
+        assert pipeline.train() is not None
+        monkeypatch.setattr(pipeline.s3, "upload_many", upload_many)
+
+        rerun = make_pipeline()
+        assert rerun.train() is not None
+        assert rerun.cache.stats["train"] == {"hit": 0, "miss": 1}
+        assert "models/archive/20240101/model.pkl" in {key for _, key in make_pipeline.store}
+
+    def test_train_survives_archive_index_error(self, make_pipeline, monkeypatch):
+        """Test that an S3 error while appending to the archive index is reported instead of crashing train."""
+        seed = make_pipeline(work_dir="seed")
+        seed.collect(page_limit=2, max_workers=1)
+        seed.preprocess()
+
+        pipeline = make_pipeline()
+
+        def broken_write(*args, **kwargs):
+            raise RuntimeError("PutObject does not support IfMatch")
+        monkeypatch.setattr(pipeline.s3, "write_object", broken_write)
+        assert pipeline.train() is not None
+
+        rerun = make_pipeline()
+        rerun.train()
+        assert rerun.cache.stats["train"] == {"hit": 1, "miss": 0}
@@ -0,0 +1,76 @@
+"""Unit tests for batch scoring."""
+import joblib
+import numpy as np
+import pandas as pd
+
+import pytest
+from core.utils import read_table
+from src.predict import PREDICTION_COLUMN, BatchPredictor
+from src.train import ModelTrainer
+
+
+@pytest.fixture
+def trained_model_path(tmp_path):
+    """Train a small champion-like model and save it with joblib."""
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "popularity": rng.gamma(2.0, 50.0, 500),
+        "vote_count": rng.integers(0, 30000, 500),
+    })
+    df["vote_average"] = 5 + 0.004 * df["popularity"] + 0.0001 * df["vote_count"]
+    trainer = ModelTrainer(feature_columns=["popularity", "vote_count"], cv_folds=0)
+    trainer.train(df)
+    path = tmp_path / "champion_model.pkl"
+    joblib.dump(trainer.model, path)
+    return path
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    """Create a raw-like catalog snapshot with extra columns and a missing feature."""
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame({
+        "id": np.arange(1000),
+        "title": [f"Movie {i}" for i in range(1000)],
+        "overview": "text",
+        "popularity": rng.gamma(2.0, 50.0, 1000),
+        "vote_count": rng.integers(0, 30000, 1000).astype(float),
+    })
+    df.loc[3, "vote_count"] = np.nan
+    path = tmp_path / "catalog.csv"
+    df.to_csv(path, index=False)
+    return df, path
+
+
+class TestBatchPredictor:
+    """Test cases for BatchPredictor."""
+
+    def test_chunked_scoring_matches_full_predict(self, trained_model_path, catalog, tmp_path):
+        """Test that chunked scoring writes every row with the model's predictions."""
+        df, path = catalog
+        predictor = BatchPredictor.from_path(str(trained_model_path))
+        result = predictor.score_file(path, tmp_path / "out" / "predictions.csv", chunksize=128)
+
+        scored = read_table(result["output"])
+        assert result["rows"] == len(df)
+        assert result["rows_per_sec"] > 0
+        assert list(scored.columns) == ["id", "title", PREDICTION_COLUMN]
+        assert np.isnan(scored[PREDICTION_COLUMN].iloc[3])
+
+        valid = df["vote_count"].notna()
+        expected = joblib.load(trained_model_path).predict(df.loc[valid, ["popularity", "vote_count"]])
+        np.testing.assert_allclose(scored.loc[valid, PREDICTION_COLUMN], expected)
+
+    def test_parquet_output(self, trained_model_path, catalog, tmp_path):
+        """Test that the output format follows the output file extension."""
+        _, path = catalog
+        predictor = BatchPredictor.from_path(str(trained_model_path))
+        result = predictor.score_file(path, tmp_path / "predictions.parquet", chunksize=300)
+
+        assert len(pd.read_parquet(result["output"])) == 1000
+
+    def test_missing_feature_column_raises(self, trained_model_path):
+        """Test that inputs without the model's features are rejected."""
+        predictor = BatchPredictor.from_path(str(trained_model_path))
+        with pytest.raises(ValueError):
+            predictor.predict_frame(pd.DataFrame({"popularity": [1.0]}))
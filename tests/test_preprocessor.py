@@ -112,6 +112,49 @@ class TestPreprocessor:
         finally:
             os.unlink(temp_file)
 
+    def test_transform_parquet_matches_csv(self, preprocessor, sample_dataframe, tmp_path):
+        """Test that Parquet input yields the same processed data as CSV input."""
+        csv_path = tmp_path / "raw.csv"
+        parquet_path = tmp_path / "raw.parquet"
+        sample_dataframe.to_csv(csv_path, index=False)
+        sample_dataframe.to_parquet(parquet_path, index=False)
+
+        df_csv = preprocessor.transform(str(csv_path))
+        df_parquet = preprocessor.transform(str(parquet_path))
+
+        pd.testing.assert_frame_equal(df_csv.reset_index(drop=True), df_parquet.reset_index(drop=True))
+        assert list(df_parquet.columns) == ["vote_average", "popularity"]
+
+    def test_transform_chunked_matches_transform(self, preprocessor, tmp_path):
+        """Test that chunked transform writes the same rows as the in-memory transform."""
+        raw = pd.DataFrame({
+            "id": range(7),
+            "overview": ["text, with comma", "b", "c", "d", "e", "f", "g"],
+            "popularity": [10.5, 0.0, 3.25, None, 7.125, 1234.567, 2.0],
+            "vote_count": [100, 5, None, 3, 0, 42, 8],
+            "vote_average": [7.123, 6.5, 8.0, 5.5, 6.0, 9.25, 4.75],
+        })
+        raw_path = tmp_path / "raw.csv"
+        raw.to_csv(raw_path, index=False)
+        expected_path = preprocessor.processed_path("20230101").name
+        preprocessor.transform(str(raw_path)).to_csv(tmp_path / expected_path, index=False)
+
+        output_path = preprocessor.transform_chunked(str(raw_path), str(tmp_path / "chunked.csv"), chunksize=2)
+
+        assert (tmp_path / "chunked.csv").read_text() == (tmp_path / expected_path).read_text()
+        assert len(pd.read_csv(output_path)) == 3
+
+    def test_vote_average_round_trips_exactly(self, preprocessor, tmp_path):
+        """Test that 3-decimal ratings survive transform and the processed CSV unchanged."""
+        raw = pd.DataFrame({"popularity": [10.5, 3.25], "vote_count": [100, 8], "vote_average": [7.123, 6.789]})
+        raw_path = tmp_path / "raw.csv"
+        raw.to_csv(raw_path, index=False)
+
+        output_path = preprocessor.transform_chunked(str(raw_path), str(tmp_path / "processed.csv"))
+
+        assert pd.read_csv(output_path)["vote_average"].tolist() == [7.123, 6.789]
+        assert preprocessor.transform(str(raw_path))["vote_average"].tolist() == [7.123, 6.789]
+
     def test_empty_dataframe(self, preprocessor):
         """Test handling of empty DataFrame."""
         df_empty = pd.DataFrame()
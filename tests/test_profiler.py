@@ -0,0 +1,95 @@
+"""Unit tests for the per-stage profiler."""
+import json
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import numpy as np
+
+import pytest
+from core.profiler import PROFILER, profile_step
+
+
+@pytest.fixture
+def profiler(tmp_path):
+    """Enable the global profiler for one test."""
+    PROFILER.start(str(tmp_path / "profiles"), label="test")
+    yield PROFILER
+    PROFILER.stop()
+
+
+class TestProfiler:
+    """Test cases for Profiler and profile_step."""
+
+    def test_disabled_profiler_records_nothing(self):
+        """Test that profile_step is a no-op unless the profiler is started."""
+        PROFILER.sections = {}
+        with profile_step("train"):
+            pass
+        assert PROFILER.sections == {}
+
+    def test_nested_sections_and_report(self, profiler, tmp_path):
+        """Test section paths, aggregation of repeated steps and the JSON report."""
+
+        @profile_step("train")
+        def stage():
+            with profile_step("read"):
+                data = np.ones(2_000_000)
+            for _ in range(3):
+                with profile_step("upload"):
+                    pass
+            return data.sum()
+
+        assert stage() == 2_000_000
+        sections = profiler.sections
+        assert set(sections) == {"train", "train/read", "train/upload"}
+        assert sections["train/upload"]["calls"] == 3
+        assert sections["train/read"]["depth"] == 1
+        # the 16 MB array is allocated inside read and counted by its parent as well
+        assert sections["train/read"]["alloc_peak_mb"] >= 15
+        assert sections["train"]["alloc_peak_mb"] >= sections["train/read"]["alloc_peak_mb"]
+        assert sections["train"]["wall_seconds"] >= sections["train/read"]["wall_seconds"]
+
+        report_files = list((tmp_path / "profiles").glob("*.json"))
+        assert len(report_files) == 1
+        report = json.loads(report_files[0].read_text())
+        assert [s["path"] for s in report["sections"]] == ["train/read", "train/upload", "train"]
+        assert all("cpu_utilization" in s for s in report["sections"])
+
+    def test_worker_thread_sections_attach_to_main_stage(self, profiler):
+        """Test that steps run in worker threads are recorded under the current main-thread stage."""
+        with profile_step("train"):
+            worker = threading.Thread(target=lambda: profile_step("upload").__enter__().__exit__(None, None, None))
+            worker.start()
+            worker.join()
+        assert profiler.sections["train/upload"]["thread"] == "worker"
+
+    def test_cprofile_call_tree(self, tmp_path):
+        """Test that cprofile=True saves a .prof file and top functions per top-level stage."""
+        PROFILER.start(str(tmp_path / "profiles"), label="test", cprofile=True)
+        try:
+            with profile_step("fit"):
+                sorted(range(10_000), key=lambda x: -x)
+        finally:
+            PROFILER.stop()
+        tree = PROFILER.call_trees["fit"]
+        assert tree["file"].endswith(".fit.prof")
+        assert tree["top"] and {"function", "calls", "tottime", "cumtime"} <= set(tree["top"][0])
+
+    def test_profiler_without_resource_module(self, tmp_path):
+        """Test that the profiler and the modules using it import and run where resource/fcntl are missing."""
+        code = (
+            "import sys\n"
+            "sys.modules.update(resource=None, fcntl=None, psutil=None)\n"
+            "import core.s3_client, src.train\n"
+            "from core.profiler import PROFILER, profile_step\n"
+            f"PROFILER.start({str(tmp_path)!r}, label='test')\n"
+            "with profile_step('train'):\n"
+            "    pass\n"
+            "section = PROFILER.sections['train']\n"
+            "assert 'alloc_peak_mb' in section and 'rss_peak_mb' not in section, section\n"
+        )
+        root = Path(__file__).resolve().parents[1]
+        result = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True)
+        assert result.returncode == 0, result.stderr
@@ -0,0 +1,113 @@
+"""Unit tests for the champion model registry (hot reload)."""
+import json
+
+import joblib
+import numpy as np
+import pandas as pd
+
+import pytest
+from core.s3_client import S3Manager
+from core.storage import MemoryStorageClient
+from sklearn.linear_model import LinearRegression
+from src.registry import CHAMPION_ARTIFACT_KEY, CHAMPION_METRICS_KEY, CHAMPION_MODEL_KEY, ModelRegistry
+
+
+@pytest.fixture
+def storage():
+    """S3Manager backed by a private in-memory store."""
+    manager = S3Manager(backend="memory")
+    manager.s3 = MemoryStorageClient(store={})
+    return manager
+
+
+def publish_champion(storage, tmp_path, slope, mse):
+    """Upload a champion pickle first and its metrics json last, like Pipeline.train."""
+    X = pd.DataFrame({"popularity": np.arange(10.0), "vote_count": np.ones(10)})
+    model = LinearRegression().fit(X, slope * X["popularity"])
+    joblib.dump(model, tmp_path / "model.pkl")
+    (tmp_path / "metrics.json").write_text(json.dumps({"mse": mse}))
+    storage.upload_many([(tmp_path / "model.pkl", CHAMPION_MODEL_KEY)])
+    storage.upload_many([(tmp_path / "metrics.json", CHAMPION_METRICS_KEY)])
+
+
+def predict_one(predictor):
+    return predictor.predict_frame(pd.DataFrame({"popularity": [1.0], "vote_count": [1.0]}))[0]
+
+
+class TestModelRegistry:
+    """Test cases for ModelRegistry."""
+
+    def test_no_champion_keeps_registry_empty(self, storage, tmp_path):
+        """Test that a missing champion leaves the registry unloaded."""
+        registry = ModelRegistry(storage, str(tmp_path / "versions"))
+        assert registry.check() is False
+        assert registry.predictor is None
+
+    def test_reload_only_when_etag_changes(self, storage, tmp_path):
+        """Test that polling reloads once per new champion and swaps atomically."""
+        publish_champion(storage, tmp_path, slope=1.0, mse=1.0)
+        registry = ModelRegistry(storage, str(tmp_path / "versions"))
+
+        assert registry.check() is True
+        old_predictor = registry.predictor
+        assert predict_one(old_predictor) == pytest.approx(1.0)
+        assert registry.check() is False
+
+        publish_champion(storage, tmp_path, slope=2.0, mse=0.5)
+        assert registry.check() is True
+
+        # the previous model object stays usable for requests that already hold it
+        assert predict_one(old_predictor) == pytest.approx(1.0)
+        assert predict_one(registry.predictor) == pytest.approx(2.0)
+        assert registry.version["metrics"] == {"mse": 0.5}
+        assert registry.stats["loads"] == 2
+        assert registry.stats["swaps"] == 1
+        assert registry.stats["checks"] == 3
+        assert len(registry.history) == 2
+        assert all(event["seconds"] >= 0 for event in registry.history)
+
+    def test_background_polling(self, storage, tmp_path):
+        """Test that the polling thread picks up a newly published champion."""
+        registry = ModelRegistry(storage, str(tmp_path / "versions"), poll_interval=0.01)
+        registry.start()
+        try:
+            publish_champion(storage, tmp_path, slope=3.0, mse=0.1)
+            for _ in range(500):
+                if registry.predictor is not None:
+                    break
+                registry._stopped.wait(0.01)
+        finally:
+            registry.stop()
+        assert predict_one(registry.predictor) == pytest.approx(3.0)
+
+    def test_reload_when_champion_changes_during_download(self, storage, tmp_path, monkeypatch):
+        """Test that a champion published mid-download is detected and the loaded pair matches its ETag."""
+        publish_champion(storage, tmp_path, slope=1.0, mse=1.0)
+        download_many = storage.download_many
+        published = []
+
+        def racing_download_many(items, max_workers=None):
+            results = download_many(items, max_workers)
+            if not published:
+                published.append(True)
+                publish_champion(storage, tmp_path, slope=2.0, mse=0.5)
+            return results
+        monkeypatch.setattr(storage, "download_many", racing_download_many)
+
+        registry = ModelRegistry(storage, str(tmp_path / "versions"))
+        assert registry.check() is True
+        assert registry.version["etag"] == storage.head(CHAMPION_METRICS_KEY)["etag"]
+        assert registry.version["metrics"] == {"mse": 0.5}
+        assert predict_one(registry.predictor) == pytest.approx(2.0)
+        assert registry.check() is False
+        assert [p.name for p in (tmp_path / "versions").iterdir()] == [registry.version["etag"].strip('"')]
+
+    def test_artifact_key_falls_back_to_pkl(self, storage, tmp_path):
+        """Test that an mmap registry loads a champion published before artifacts existed from its .pkl."""
+        publish_champion(storage, tmp_path, slope=1.0, mse=1.0)
+        registry = ModelRegistry(
+            storage, str(tmp_path / "versions"), model_key=CHAMPION_ARTIFACT_KEY, fallback_model_key=CHAMPION_MODEL_KEY
+        )
+        assert registry.check() is True
+        assert registry.version["path"].endswith("champion_model.pkl")
+        assert predict_one(registry.predictor) == pytest.approx(1.0)
@@ -0,0 +1,317 @@
+"""Unit tests for S3Manager module."""
+import gzip
+import io
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from unittest.mock import MagicMock
+
+import pandas as pd
+
+import pytest
+from botocore.exceptions import ClientError
+from core.s3_cache import S3Cache
+from core.s3_client import S3Manager
+from core.s3_index import S3KeyIndex
+from core.storage import MemoryStorageClient
+
+
+@pytest.fixture
+def s3_manager():
+    """Create an S3Manager with a mocked boto3 client."""
+    manager = S3Manager(use_cache=False)
+    manager.s3 = MagicMock()
+    manager.bucket_name = "test-bucket"
+    manager.key_index = None
+    return manager
+
+
+def paginate_keys(keys, page_size=2):
+    """Fake list_objects_v2 paginator that honours Prefix and StartAfter."""
+    def paginate(Bucket, Prefix="", StartAfter=None, **kwargs):
+        selected = [k for k in sorted(keys) if k.startswith(Prefix) and (StartAfter is None or k > StartAfter)]
+        for i in range(0, len(selected), page_size):
+            yield {"Contents": [{"Key": k, "Size": 1} for k in selected[i:i + page_size]]}
+    return paginate
+
+
+@pytest.fixture
+def cached_s3_manager(s3_manager, tmp_path):
+    """S3Manager with a local download cache backed by a fake bucket."""
+    objects = {"models/champion/champion_model.json": b'{"mse": 1.0}'}
+
+    def head_object(Bucket, Key):
+        if Key not in objects:
+            raise not_found_error()
+        body = objects[Key]
+        return {"ETag": f'"{hash(body)}"', "ContentLength": len(body)}
+
+    def download_file(bucket, key, local, **kwargs):
+        with open(local, "wb") as f:
+            f.write(objects[key])
+
+    def get_object(Bucket, Key):
+        body = objects[Key]
+        return {"Body": io.BytesIO(body), "ETag": f'"{hash(body)}"', "ContentLength": len(body)}
+
+    s3_manager.s3.head_object.side_effect = head_object
+    s3_manager.s3.download_file.side_effect = download_file
+    s3_manager.s3.get_object.side_effect = get_object
+    s3_manager.cache = S3Cache(str(tmp_path / "cache"), max_bytes=1024)
+    s3_manager.objects = objects
+    return s3_manager
+
+
+def store_cache_entries(cache_dir, worker, count):
+    """Process-pool worker: add count entries to a cache directory shared with other processes."""
+    cache = S3Cache(cache_dir, max_bytes=1024 * 1024)
+    for i in range(count):
+        key = f"raw/{worker}/{i}.csv"
+        downloaded = cache.path_for("bucket", key).with_suffix(".tmp")
+        downloaded.write_bytes(key.encode())
+        cache.store("bucket", key, etag=key, size=len(key), dest=f"{cache_dir}/../out/{worker}", downloaded=downloaded)
+
+
+def not_found_error():
+    return ClientError({"Error": {"Code": "404", "Message": "Not Found"}}, "HeadObject")
+
+
+class TestS3Manager:
+    """Test cases for S3Manager."""
+
+    def test_upload_many_returns_per_file_results(self, s3_manager, tmp_path):
+        """Test that batch upload reports each file in input order."""
+        files = []
+        for name in ["model.pkl", "metrics.json", "missing.json"]:
+            path = tmp_path / name
+            if name != "missing.json":
+                path.write_text(name)
+            files.append((str(path), f"models/archive/20230101/{name}"))
+        s3_manager.s3.upload_file.side_effect = lambda local, *args, **kwargs: open(local).close()
+
+        results = s3_manager.upload_many(files)
+
+        assert [r["key"] for r in results] == [key for _, key in files]
+        assert [r["ok"] for r in results] == [True, True, False]
+        assert results[0]["bytes"] == len("model.pkl")
+        assert results[2]["error"]
+
+    def test_download_many_marks_missing_keys(self, s3_manager, tmp_path):
+        """Test that missing objects are reported as not found instead of raising."""
+        def fake_download(bucket, key, local, **kwargs):
+            if key.endswith(".pkl"):
+                raise not_found_error()
+            with open(local, "w") as f:
+                f.write("{}")
+
+        s3_manager.s3.download_file.side_effect = fake_download
+
+        results = s3_manager.download_many([
+            ("models/champion/champion_model.json", str(tmp_path / "champion" / "champion_model.json")),
+            ("models/champion/champion_model.pkl", str(tmp_path / "champion" / "champion_model.pkl")),
+        ])
+
+        assert results[0]["ok"] is True
+        assert results[1] == {**results[1], "ok": False, "error": "not found"}
+
+    def test_download_file_skips_head_object(self, s3_manager, tmp_path):
+        """Test that download_file goes straight to the download call."""
+        ok, path = s3_manager.download_file("raw/20230101/20230101.csv", str(tmp_path))
+
+        assert ok is True
+        assert path.endswith("20230101.csv")
+        s3_manager.s3.head_object.assert_not_called()
+
+    def test_cache_hit_after_etag_validation(self, cached_s3_manager, tmp_path):
+        """Test that an unchanged object is served from cache after one metadata check."""
+        key = "models/champion/champion_model.json"
+
+        cached_s3_manager.download_file(key, str(tmp_path / "a"))
+        ok, path = cached_s3_manager.download_file(key, str(tmp_path / "b"))
+
+        assert ok is True
+        assert open(path, "rb").read() == b'{"mse": 1.0}'
+        assert cached_s3_manager.s3.get_object.call_count == 1
+        # miss: head + GET, hit: one head
+        assert cached_s3_manager.s3.head_object.call_count == 2
+        stats = cached_s3_manager.cache_stats()
+        assert (stats["hits"], stats["misses"]) == (1, 1)
+
+    def test_cache_refreshes_changed_object(self, cached_s3_manager, tmp_path):
+        """Test that a changed ETag triggers a new download."""
+        key = "models/champion/champion_model.json"
+        cached_s3_manager.download_file(key, str(tmp_path))
+        cached_s3_manager.objects[key] = b'{"mse": 0.5}'
+
+        ok, path = cached_s3_manager.download_file(key, str(tmp_path))
+
+        assert open(path, "rb").read() == b'{"mse": 0.5}'
+        assert cached_s3_manager.cache_stats()["misses"] == 2
+
+    def test_cache_miss_stores_etag_of_downloaded_body(self, cached_s3_manager, tmp_path):
+        """Test that an object changed between head and GET is cached under the ETag returned with its body."""
+        key = "models/champion/champion_model.json"
+        objects = cached_s3_manager.objects
+        head_object = cached_s3_manager.s3.head_object.side_effect
+
+        def racing_head_object(Bucket, Key):
+            head = head_object(Bucket, Key)
+            objects[Key] = b'{"mse": 0.5}'
+            return head
+        cached_s3_manager.s3.head_object.side_effect = racing_head_object
+
+        ok, path = cached_s3_manager.download_file(key, str(tmp_path))
+
+        assert ok is True
+        assert open(path, "rb").read() == b'{"mse": 0.5}'
+        assert cached_s3_manager.s3.head_object.call_count == 1
+        entry = cached_s3_manager.cache.lookup("test-bucket", key)
+        assert (entry["etag"], entry["size"]) == (f'"{hash(objects[key])}"', len(b'{"mse": 0.5}'))
+
+    def test_cache_miss_pins_version_on_versioned_bucket(self, cached_s3_manager, tmp_path):
+        """Test that a versioned object is downloaded at the VersionId seen by the single head."""
+        key = "models/champion/champion_model.json"
+        head_object = cached_s3_manager.s3.head_object.side_effect
+        versioned = lambda Bucket, Key: {**head_object(Bucket, Key), "VersionId": "v1"}
+        cached_s3_manager.s3.head_object.side_effect = versioned
+
+        ok, path = cached_s3_manager.download_file(key, str(tmp_path))
+
+        assert ok is True
+        assert open(path, "rb").read() == b'{"mse": 1.0}'
+        assert cached_s3_manager.s3.download_file.call_args.kwargs["ExtraArgs"] == {"VersionId": "v1"}
+        assert cached_s3_manager.s3.head_object.call_count == 1
+        cached_s3_manager.s3.get_object.assert_not_called()
+
+    def test_cache_downloads_through_storage_client(self, tmp_path):
+        """Test that the cached download path works against a client enforcing boto3 ExtraArgs rules."""
+        manager = S3Manager(use_cache=False)
+        manager.s3 = MemoryStorageClient(store={})
+        manager.bucket_name = "test-bucket"
+        manager.cache = S3Cache(str(tmp_path / "cache"), max_bytes=1024)
+        manager.s3.put_object(Bucket="test-bucket", Key="raw/a.csv", Body=b"a,b\n1,2\n")
+
+        ok, path = manager.download_file("raw/a.csv", str(tmp_path / "out"))
+
+        assert ok is True
+        assert open(path, "rb").read() == b"a,b\n1,2\n"
+        assert manager.cache_stats()["misses"] == 1
+
+    def test_cache_ttl_skips_metadata_check(self, cached_s3_manager, tmp_path):
+        """Test that entries validated within the TTL need no S3 request."""
+        cached_s3_manager.cache.ttl = 60
+        key = "models/champion/champion_model.json"
+
+        cached_s3_manager.download_file(key, str(tmp_path))
+        heads = cached_s3_manager.s3.head_object.call_count
+        cached_s3_manager.download_file(key, str(tmp_path))
+
+        assert cached_s3_manager.s3.head_object.call_count == heads
+
+    def test_cache_evicts_least_recently_used(self, tmp_path):
+        """Test that the cache stays under its size cap by evicting LRU entries."""
+        cache = S3Cache(str(tmp_path / "cache"), max_bytes=10)
+        for key in ["a", "b", "c"]:
+            cache.path_for("bucket", key).write_bytes(b"12345")
+            cache.store("bucket", key, etag=key, size=5, dest=tmp_path / key)
+
+        assert cache.lookup("bucket", "a") is None
+        assert cache.lookup("bucket", "c") is not None
+        assert cache.stats["evictions"] == 1
+        assert cache.total_bytes() == 10
+
+    def test_cache_index_shared_across_processes(self, tmp_path):
+        """Test that concurrent processes sharing one cache dir do not lose each other's index entries."""
+        cache_dir = str(tmp_path / "cache")
+        with ProcessPoolExecutor(max_workers=4) as executor:
+            list(executor.map(store_cache_entries, repeat(cache_dir), range(4), repeat(25)))
+
+        cache = S3Cache(cache_dir, max_bytes=1024 * 1024)
+        missing = [
+            (worker, i) for worker in range(4) for i in range(25)
+            if cache.lookup("bucket", f"raw/{worker}/{i}.csv") is None
+        ]
+        assert missing == []
+        assert cache.path_for("bucket", "raw/3/24.csv").read_bytes() == b"raw/3/24.csv"
+
+    def test_cache_hit_falls_back_when_entry_replaced(self, cached_s3_manager, tmp_path):
+        """Test that a hit whose entry was replaced by another process after lookup is treated as a miss."""
+        key = "models/champion/champion_model.json"
+        cached_s3_manager.download_file(key, str(tmp_path / "a"))
+
+        assert cached_s3_manager.cache.hit("test-bucket", key, tmp_path / "b", etag='"other"') is None
+
+    def test_get_file_list_follows_pagination(self, s3_manager):
+        """Test that listing is not truncated at a single page of results."""
+        keys = [f"raw/2023010{i}/2023010{i}.csv" for i in range(1, 6)]
+        s3_manager.s3.get_paginator.return_value.paginate.side_effect = paginate_keys(keys)
+
+        assert s3_manager.get_file_list("raw") == keys
+        assert s3_manager.list_prefixes(["raw/20230101", "raw/20230105"]) == {
+            "raw/20230101": [keys[0]],
+            "raw/20230105": [keys[4]],
+        }
+
+    def test_latest_key_refreshes_index_incrementally(self, s3_manager, tmp_path):
+        """Test that the key index only lists keys after the last indexed one."""
+        keys = ["raw/20230101/20230101.csv", "raw/20230102/20230102.csv"]
+        paginate = MagicMock(side_effect=paginate_keys(keys))
+        s3_manager.s3.get_paginator.return_value.paginate = paginate
+        s3_manager.key_index = S3KeyIndex(str(tmp_path / "index.json"))
+
+        assert s3_manager.latest_key("raw/", suffix=".csv") == keys[1]
+        keys.append("raw/20230103/20230103.csv")
+        assert s3_manager.latest_key("raw/", suffix=".csv") == keys[2]
+
+        assert paginate.call_args.kwargs["StartAfter"] == keys[1]
+        assert S3KeyIndex(str(tmp_path / "index.json")).keys("raw/") == keys
+
+    def test_key_index_full_relist_finds_backfilled_keys(self, s3_manager, tmp_path):
+        """Test that keys older than the last indexed key appear after invalidate() or the full-refresh period."""
+        keys = ["processed/20230105/processed_data.csv"]
+        paginate = MagicMock(side_effect=paginate_keys(keys))
+        s3_manager.s3.get_paginator.return_value.paginate = paginate
+        s3_manager.key_index = S3KeyIndex(str(tmp_path / "index.json"), full_refresh_seconds=3600)
+
+        assert s3_manager.indexed_keys("processed/") == keys
+        keys.insert(0, "processed/20230101/processed_data.csv")
+        assert s3_manager.indexed_keys("processed/") == keys[1:]
+
+        s3_manager.invalidate_keys(["processed/"])
+        assert s3_manager.indexed_keys("processed/") == keys
+
+        keys.insert(0, "processed/20221231/processed_data.csv")
+        s3_manager.key_index._index["processed/"]["full_at"] -= 3600
+        assert s3_manager.indexed_keys("processed/") == keys
+        assert paginate.call_args.kwargs.get("StartAfter") is None
+
+    def test_upload_dataframe_streams_gzip_csv(self, s3_manager):
+        """Test that a DataFrame is serialized and compressed straight into the upload."""
+        uploaded = {}
+
+        def fake_upload_fileobj(fileobj, bucket, key, **kwargs):
+            uploaded[key] = b"".join(iter(lambda: fileobj.read(7), b""))
+
+        s3_manager.s3.upload_fileobj.side_effect = fake_upload_fileobj
+        df = pd.DataFrame({"popularity": [10.5, 3.25], "vote_count": [100, 42], "vote_average": [7.1, 8.0]})
+
+        result = s3_manager.upload_dataframe(df, "processed/20230101/processed_data.csv", compression="gzip")
+
+        assert result["ok"] is True
+        assert result["key"] == "processed/20230101/processed_data.csv.gz"
+        body = uploaded["processed/20230101/processed_data.csv.gz"]
+        assert result["bytes"] == len(body)
+        pd.testing.assert_frame_equal(pd.read_csv(io.BytesIO(gzip.decompress(body))), df)
+
+    def test_upload_stream_fails_when_writer_fails(self, s3_manager):
+        """Test that a failing serializer fails the upload instead of storing a truncated object."""
+        s3_manager.s3.upload_fileobj.side_effect = lambda fileobj, *args, **kwargs: fileobj.read()
+
+        def broken_writer(sink):
+            sink.write(b"partial")
+            raise RuntimeError("serialization failed")
+
+        result = s3_manager.upload_stream(broken_writer, "raw/20230101/20230101.csv")
+
+        assert result["ok"] is False
+        assert "serialization failed" in result["error"]
+
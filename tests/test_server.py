@@ -0,0 +1,87 @@
+"""Unit tests for the online prediction server."""
+import json
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import pytest
+from sklearn.linear_model import LinearRegression
+from src.predict import BatchPredictor
+from src.server import PredictionServer
+
+
+@pytest.fixture
+def model():
+    """Fit a small LinearRegression on the pipeline's feature columns."""
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame({"popularity": rng.gamma(2.0, 50.0, 200), "vote_count": rng.integers(0, 30000, 200)})
+    return LinearRegression().fit(X, 5 + 0.004 * X["popularity"] + 0.0001 * X["vote_count"])
+
+
+@pytest.fixture
+def server(model):
+    """Run a prediction server on a free local port."""
+    server = PredictionServer(BatchPredictor(model), host="127.0.0.1", port=0, max_wait_ms=20)
+    server.start()
+    yield server
+    server.close()
+
+
+def request(server, path, payload=None):
+    url = f"http://127.0.0.1:{server.port}{path}"
+    data = json.dumps(payload).encode() if payload is not None else None
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, data=data), timeout=5) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+class TestPredictionServer:
+    """Test cases for PredictionServer."""
+
+    def test_health_and_ready(self, server):
+        """Test the liveness and readiness probes."""
+        assert request(server, "/health") == (200, {"status": "ok"})
+        assert request(server, "/ready")[0] == 200
+
+    def test_ready_fails_without_model(self):
+        """Test that readiness and prediction report 503 until a model is loaded."""
+        server = PredictionServer(None, host="127.0.0.1", port=0)
+        server.start()
+        try:
+            assert request(server, "/health")[0] == 200
+            assert request(server, "/ready")[0] == 503
+            assert request(server, "/predict", {"popularity": 1.0, "vote_count": 1})[0] == 503
+        finally:
+            server.close()
+
+    def test_concurrent_requests_are_micro_batched(self, server, model):
+        """Test that concurrent requests are coalesced and each gets its own predictions."""
+        instances = [{"popularity": float(i), "vote_count": i * 10} for i in range(32)]
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            responses = list(executor.map(lambda inst: request(server, "/predict", {"instances": [inst]}), instances))
+
+        expected = model.predict(pd.DataFrame(instances))
+        assert all(status == 200 for status, _ in responses)
+        np.testing.assert_allclose([body["predictions"][0] for _, body in responses], expected)
+        assert server.batcher.stats["batches"] < len(instances)
+
+    def test_bad_payload_returns_400(self, server):
+        """Test that malformed instances are rejected."""
+        assert request(server, "/predict", {"instances": []})[0] == 400
+        assert request(server, "/predict", {"instances": [[1.0, 2.0, 3.0]]})[0] == 400
+
+    def test_metrics_endpoint_reports_request_latency(self, server):
+        """Test that /metrics exposes prediction request latency in Prometheus text format."""
+        assert request(server, "/predict", {"popularity": 10.0, "vote_count": 100})[0] == 200
+
+        url = f"http://127.0.0.1:{server.port}/metrics"
+        with urllib.request.urlopen(url, timeout=5) as response:
+            assert response.headers["Content-Type"].startswith("text/plain")
+            text = response.read().decode()
+        assert 'api_request_duration_seconds{api="predict",quantile="0.99"}' in text
+        assert 'api_requests_total{api="predict",status="200"}' in text
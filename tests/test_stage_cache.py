@@ -0,0 +1,56 @@
+"""Unit tests for StageCache module."""
+import pandas as pd
+import pytest
+from core.stage_cache import StageCache
+
+
+@pytest.fixture
+def input_file(tmp_path):
+    """Create an input file for hashing."""
+    path = tmp_path / "raw.csv"
+    path.write_text("popularity,vote_count,vote_average\n10.0,100,7.5\n")
+    return path
+
+
+class TestStageCache:
+    """Test cases for StageCache."""
+
+    def test_hit_after_record(self, tmp_path, input_file):
+        """Test that an unchanged input is a cache hit once recorded."""
+        cache = StageCache()
+        output = tmp_path / "processed.csv"
+        output.write_text("x\n")
+        key = cache.key([input_file], {"features": ["popularity"]})
+
+        assert cache.lookup("preprocess", key, tmp_path) is None
+        cache.record("preprocess", key, tmp_path, {"processed": output})
+        marker = cache.lookup("preprocess", key, tmp_path)
+
+        assert marker["outputs"]["processed"] == str(output)
+        assert cache.stats["preprocess"] == {"hit": 1, "miss": 1}
+
+    def test_changed_input_or_params_miss(self, input_file):
+        """Test that the key changes with input content and parameters."""
+        cache = StageCache()
+        key = cache.key([input_file], {"page_limit": 20})
+
+        assert cache.key([input_file], {"page_limit": 30}) != key
+        input_file.write_text("popularity,vote_count,vote_average\n11.0,100,7.5\n")
+        assert cache.key([input_file], {"page_limit": 20}) != key
+
+    def test_dataframe_input(self):
+        """Test that DataFrames hash by content."""
+        cache = StageCache()
+        df = pd.DataFrame({"a": [1, 2], "b": [3.0, 4.0]})
+
+        assert cache.key([df], {}) == cache.key([df.copy()], {})
+        assert cache.key([df], {}) != cache.key([df.assign(b=[3.0, 5.0])], {})
+
+    def test_force_always_misses(self, tmp_path, input_file):
+        """Test that force=True ignores recorded markers."""
+        cache = StageCache(force=True)
+        key = cache.key([input_file], {})
+        cache.record("train", key, tmp_path, {"metrics": input_file})
+
+        assert cache.lookup("train", key, tmp_path) is None
+        assert cache.stats["train"]["miss"] == 1
@@ -0,0 +1,112 @@
+"""Unit tests for local / in-memory storage backends."""
+import subprocess
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+import pytest
+from botocore.exceptions import ClientError
+from core import config as cfg
+from core.s3_client import S3Manager
+from core.storage import STORAGE_CLIENT_METHODS, LocalStorageClient, MemoryStorageClient
+
+
+@pytest.fixture(params=["local", "memory"])
+def storage_manager(request, tmp_path, monkeypatch):
+    """S3Manager backed by a local directory or a private in-memory store."""
+    monkeypatch.setattr(cfg, "LOCAL_STORAGE_ROOT", str(tmp_path / "storage"))
+    manager = S3Manager(backend=request.param)
+    if request.param == "memory":
+        manager.s3 = MemoryStorageClient(store={})
+    return manager
+
+
+class TestStorageBackends:
+    """Test cases for non-S3 storage backends behind S3Manager."""
+
+    def test_clients_implement_storage_interface(self, tmp_path):
+        """Test that every backend provides the boto3 methods S3Manager uses."""
+        for client in (LocalStorageClient(str(tmp_path)), MemoryStorageClient(store={})):
+            assert all(callable(getattr(client, name, None)) for name in STORAGE_CLIENT_METHODS)
+
+    def test_non_s3_backend_skips_cache_and_index(self, storage_manager):
+        """Test that local/memory backends do not build a boto3 client, cache or key index."""
+        assert not hasattr(storage_manager.s3, "meta")
+        assert storage_manager.cache is None
+        assert storage_manager.key_index is None
+
+    def test_upload_download_roundtrip(self, storage_manager, tmp_path):
+        """Test batch upload, download and listing through the backend."""
+        src = tmp_path / "a.csv"
+        src.write_text("x,y\n1,2\n")
+        uploads = storage_manager.upload_many([(src, "raw/20240101/a.csv"), (src, "raw/20240102/a.csv")])
+        assert all(item["ok"] for item in uploads)
+
+        assert storage_manager.latest_key("raw/", ".csv") == "raw/20240102/a.csv"
+        assert storage_manager.get_file_list("raw/20240101") == ["raw/20240101/a.csv"]
+
+        ok, path = storage_manager.download_file("raw/20240101/a.csv", str(tmp_path / "out"))
+        assert ok
+        assert open(path).read() == "x,y\n1,2\n"
+
+    def test_missing_key_is_not_found(self, storage_manager, tmp_path):
+        """Test that missing keys are reported the same way as S3 404s."""
+        results = storage_manager.download_many([("raw/missing.csv", tmp_path / "missing.csv")])
+        assert results[0]["ok"] is False
+        assert results[0]["error"] == "not found"
+
+    def test_upload_dataframe_streams_to_backend(self, storage_manager, tmp_path):
+        """Test that streaming uploads land in the backend."""
+        df = pd.DataFrame({"a": [1, 2, 3]})
+        result = storage_manager.upload_dataframe(df, "processed/a.csv")
+        assert result["ok"]
+
+        ok, path = storage_manager.download_file("processed/a.csv", str(tmp_path / "out"))
+        assert ok
+        pd.testing.assert_frame_equal(pd.read_csv(path), df)
+
+    def test_delimiter_groups_common_prefixes(self, tmp_path):
+        """Test list_objects_v2 Delimiter handling in the local backend."""
+        client = LocalStorageClient(str(tmp_path))
+        for key in ["raw/1/a.csv", "raw/2/a.csv", "raw/top.csv"]:
+            client.put_object(Bucket="b", Key=key, Body=b"x")
+        page = next(client.get_paginator("list_objects_v2").paginate(Bucket="b", Prefix="raw/", Delimiter="/"))
+        assert [p["Prefix"] for p in page["CommonPrefixes"]] == ["raw/1/", "raw/2/"]
+        assert [obj["Key"] for obj in page["Contents"]] == ["raw/top.csv"]
+
+    def test_conditional_write_detects_concurrent_change(self, storage_manager):
+        """Test that write_object only replaces the version that was read."""
+        assert storage_manager.read_object("models/archive/index.sqlite") is None
+        assert storage_manager.write_object("models/archive/index.sqlite", b"v1")
+        assert not storage_manager.write_object("models/archive/index.sqlite", b"v1-again")
+
+        data, etag = storage_manager.read_object("models/archive/index.sqlite")
+        assert data == b"v1"
+        assert storage_manager.write_object("models/archive/index.sqlite", b"v2", etag)
+        assert not storage_manager.write_object("models/archive/index.sqlite", b"stale", etag)
+        assert storage_manager.read_object("models/archive/index.sqlite")[0] == b"v2"
+
+    def test_transfer_rejects_extra_args_boto3_rejects(self, tmp_path):
+        """Test that download_file refuses ExtraArgs such as IfMatch, like s3transfer does, while get_object honours it."""
+        for client in (LocalStorageClient(str(tmp_path)), MemoryStorageClient(store={})):
+            etag = client.put_object(Bucket="b", Key="k", Body=b"x")["ETag"]
+            with pytest.raises(ValueError, match="IfMatch"):
+                client.download_file("b", "k", str(tmp_path / "out"), ExtraArgs={"IfMatch": etag})
+            assert client.get_object(Bucket="b", Key="k", IfMatch=etag)["Body"].read() == b"x"
+            with pytest.raises(ClientError):
+                client.get_object(Bucket="b", Key="k", IfMatch='"stale"')
+
+    def test_local_backend_works_without_fcntl(self, tmp_path):
+        """Test that storage imports and serialises conditional writes on platforms without fcntl (Windows)."""
+        code = (
+            "import sys; sys.modules['fcntl'] = None\n"
+            "from core.storage import LocalStorageClient, file_lock\n"
+            f"client = LocalStorageClient({str(tmp_path)!r})\n"
+            "etag = client.put_object(Bucket='b', Key='k', Body=b'v1', IfNoneMatch='*')['ETag']\n"
+            "client.put_object(Bucket='b', Key='k', Body=b'v2', IfMatch=etag)\n"
+            "assert client.get_object(Bucket='b', Key='k')['Body'].read() == b'v2'\n"
+        )
+        root = Path(__file__).resolve().parents[1]
+        result = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True)
+        assert result.returncode == 0, result.stderr
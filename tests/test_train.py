@@ -31,6 +31,20 @@ def sample_training_data():
     })
 
 
+@pytest.fixture
+def processed_training_data():
+    """Create preprocessed data with the pipeline's feature columns."""
+    rng = np.random.default_rng(7)
+    n_samples = 1200
+    popularity = rng.gamma(2.0, 50.0, n_samples)
+    vote_count = rng.integers(0, 30000, n_samples)
+    return pd.DataFrame({
+        "popularity": popularity,
+        "vote_count": vote_count,
+        "vote_average": 5 + 0.004 * popularity + 0.0001 * vote_count + rng.normal(0, 0.5, n_samples),
+    })
+
+
 class TestModelTrainer:
     """Test cases for ModelTrainer."""
 
@@ -57,6 +71,29 @@ class TestModelTrainer:
         finally:
             os.unlink(temp_file)
 
+    def test_train_from_dataframe(self, model_trainer, sample_training_data, tmp_path):
+        """Test that training on an in-memory DataFrame matches training on its file."""
+        csv_path = tmp_path / "processed.csv"
+        sample_training_data.to_csv(csv_path, index=False)
+
+        metrics_from_file = model_trainer.train(str(csv_path))
+        metrics_from_frame = ModelTrainer(target_column="vote_average").train(sample_training_data)
+
+        assert metrics_from_frame["features"] == metrics_from_file["features"]
+        assert metrics_from_frame["mse"] == pytest.approx(metrics_from_file["mse"])
+
+    def test_train_reads_compressed_csv(self, model_trainer, sample_training_data, tmp_path):
+        """Test that gzip-compressed processed data is decompressed transparently."""
+        csv_path = tmp_path / "processed_data.csv"
+        gz_path = tmp_path / "processed_data.csv.gz"
+        sample_training_data.to_csv(csv_path, index=False)
+        sample_training_data.to_csv(gz_path, index=False, compression="gzip")
+
+        metrics_plain = model_trainer.train(str(csv_path))
+        metrics_gzip = ModelTrainer(target_column="vote_average").train(str(gz_path))
+
+        assert metrics_gzip["mse"] == pytest.approx(metrics_plain["mse"])
+
     def test_model_prediction(self, model_trainer, sample_training_data):
         """Test model prediction."""
         import os
@@ -150,3 +187,223 @@ class TestModelTrainer:
             assert len(metric_keys & expected_keys) > 0, "No common metrics found"
         finally:
             os.unlink(temp_file)
+
+    def test_incremental_matches_full_refit(self, processed_training_data, tmp_path):
+        """Test that merged per-snapshot statistics reproduce a full refit."""
+        trainer = ModelTrainer(target_column="vote_average")
+        snapshots = [processed_training_data.iloc[i:i + 400] for i in range(0, 1200, 400)]
+        for i, snapshot in enumerate(snapshots):
+            metrics = trainer.train_incremental(snapshot, f"2024010{i + 1}", str(tmp_path / "stats"))
+
+        full = ModelTrainer(target_column="vote_average")
+        full_metrics = full.train(processed_training_data)
+
+        assert metrics["snapshots"] == ["20240101", "20240102", "20240103"]
+        assert metrics["sample_count"] == len(processed_training_data)
+        assert metrics["features"] == full_metrics["features"]
+        np.testing.assert_allclose(trainer.model.coef_, full.model.coef_, rtol=1e-6)
+        assert trainer.model.intercept_ == pytest.approx(full.model.intercept_)
+        assert metrics["mse"] == pytest.approx(full_metrics["mse"])
+        assert metrics["r2"] == pytest.approx(full_metrics["r2"])
+
+        test_data = processed_training_data.drop("vote_average", axis=1).iloc[:5]
+        np.testing.assert_allclose(trainer.model.predict(test_data), full.model.predict(test_data))
+
+    def test_incremental_window_uses_latest_snapshots(self, processed_training_data, tmp_path):
+        """Test that a window retrains on the most recent snapshots only."""
+        trainer = ModelTrainer(target_column="vote_average")
+        snapshots = [processed_training_data.iloc[i:i + 400] for i in range(0, 1200, 400)]
+        for i, snapshot in enumerate(snapshots):
+            metrics = trainer.train_incremental(snapshot, f"2024010{i + 1}", str(tmp_path / "stats"), window=2)
+
+        recent = ModelTrainer(target_column="vote_average")
+        recent_metrics = recent.train(pd.concat(snapshots[1:]))
+
+        assert metrics["snapshots"] == ["20240102", "20240103"]
+        np.testing.assert_allclose(trainer.model.coef_, recent.model.coef_, rtol=1e-6)
+        assert metrics["mse"] == pytest.approx(recent_metrics["mse"])
+
+    def test_sharded_fit_matches_full_refit(self, processed_training_data, tmp_path):
+        """Test that chunked partial statistics reduced across processes match a full refit."""
+        paths = []
+        for i, start in enumerate(range(0, 1200, 400)):
+            shard = processed_training_data.iloc[start:start + 400]
+            if i % 2:
+                path = tmp_path / f"shard{i}.parquet"
+                shard.to_parquet(path, index=False)
+            else:
+                path = tmp_path / f"shard{i}.csv"
+                shard.to_csv(path, index=False)
+            paths.append(path)
+
+        trainer = ModelTrainer(target_column="vote_average", feature_columns=["popularity", "vote_count"])
+        metrics = trainer.train_sharded(paths, chunksize=150, max_workers=2)
+
+        full = ModelTrainer(target_column="vote_average", feature_columns=["popularity", "vote_count"])
+        full_metrics = full.train(processed_training_data)
+
+        assert set(metrics) == set(full_metrics)
+        assert metrics["sample_count"] == full_metrics["sample_count"]
+        np.testing.assert_allclose(trainer.model.coef_, full.model.coef_, rtol=1e-6)
+        assert metrics["mse"] == pytest.approx(full_metrics["mse"])
+        assert metrics["r2"] == pytest.approx(full_metrics["r2"])
+
+    def test_sweep_selects_best_candidate(self, processed_training_data):
+        """Test that the sweep ranks candidates on holdout MSE and refits the winner."""
+        from sklearn.dummy import DummyRegressor
+        from sklearn.linear_model import LinearRegression
+
+        trainer = ModelTrainer(target_column="vote_average")
+        metrics = trainer.train_sweep(
+            processed_training_data,
+            candidates={"mean": DummyRegressor(), "linear": LinearRegression()},
+            max_workers=2,
+        )
+
+        assert metrics["model"] == "linear"
+        assert [c["name"] for c in metrics["candidates"]] == ["linear", "mean"]
+        assert metrics["mse"] == metrics["candidates"][0]["mse"]
+        assert all(c["fit_seconds"] >= 0 for c in metrics["candidates"])
+        assert isinstance(trainer.model, LinearRegression)
+        assert trainer.model.n_features_in_ == 2
+
+    def test_sweep_with_non_linear_winner_can_be_saved(self, processed_training_data, tmp_path):
+        """Test that a winning candidate without coef_ is saved and promoted like a linear one."""
+        from sklearn.tree import DecisionTreeRegressor
+        from src.artifact import load_model
+
+        trainer = ModelTrainer(target_column="vote_average")
+        metrics = trainer.train_sweep(
+            processed_training_data, candidates={"tree": DecisionTreeRegressor(max_depth=3)}, max_workers=1
+        )
+
+        trainer.save_model(str(tmp_path / "model"), metrics)
+        assert trainer.update_champion_if_better(str(tmp_path / "champion"), metrics)
+
+        X = processed_training_data.drop(columns=["vote_average"])
+        np.testing.assert_allclose(
+            load_model(tmp_path / "champion" / "champion_model.pkl").predict(X), trainer.model.predict(X)
+        )
+
+    def test_save_model_requires_fitted_model(self, tmp_path):
+        """Test that save_model still refuses an unfitted estimator."""
+        with pytest.raises(ValueError):
+            ModelTrainer().save_model(str(tmp_path), {})
+
+    def test_train_reports_cross_validation(self, processed_training_data):
+        """Test that train() adds out-of-sample k-fold metrics and per-fold timings."""
+        from sklearn.linear_model import LinearRegression
+        from sklearn.model_selection import KFold, cross_val_score
+
+        trainer = ModelTrainer(target_column="vote_average", cv_folds=4)
+        metrics = trainer.train(processed_training_data)
+
+        X = processed_training_data.drop(columns=["vote_average"])
+        y = processed_training_data["vote_average"]
+        expected = -cross_val_score(
+            LinearRegression(), X, y, cv=KFold(4, shuffle=True, random_state=42), scoring="neg_mean_squared_error"
+        )
+
+        assert metrics["cv_folds"] == 4
+        assert len(metrics["fold_times"]) == 4
+        np.testing.assert_allclose(metrics["fold_mse"], expected)
+        assert metrics["cv_mse"] == pytest.approx(expected.mean())
+        assert metrics["cv_mse"] >= metrics["mse"] * 0.9
+
+    def test_time_based_validation(self, processed_training_data):
+        """Test expanding-window validation evaluates only later rows."""
+        trainer = ModelTrainer(target_column="vote_average", cv_folds=3, cv_method="time")
+        metrics = trainer.train(processed_training_data)
+
+        assert metrics["cv_method"] == "time"
+        assert len(metrics["fold_mse"]) == 3
+
+    def test_champion_compared_on_cv_mse(self, model_trainer, sample_training_data, tmp_path):
+        """Test that champion comparison prefers cv_mse when both sides report it."""
+        import json
+
+        model_trainer.train(sample_training_data)
+        with open(tmp_path / "champion_model.json", "w") as f:
+            json.dump({"mse": 100.0, "cv_mse": 0.1}, f)
+
+        assert not model_trainer.update_champion_if_better(str(tmp_path), {"mse": 0.01, "cv_mse": 0.2})
+        assert model_trainer.update_champion_if_better(str(tmp_path), {"mse": 0.01, "cv_mse": 0.05})
+
+    def test_champion_promotion_needs_only_metrics(self, model_trainer, sample_training_data, tmp_path):
+        """Test that the champion weights are not needed locally to compare and promote."""
+        import json
+        from src.artifact import load_model
+
+        model_trainer.train(sample_training_data)
+        with open(tmp_path / "champion_model.json", "w") as f:
+            json.dump({"mse": 100.0}, f)
+
+        assert not (tmp_path / "champion_model.pkl").exists()
+        assert model_trainer.update_champion_if_better(str(tmp_path), {"mse": 0.01})
+        np.testing.assert_array_equal(load_model(tmp_path / "champion_model.pkl").coef_, model_trainer.model.coef_)
+        with open(tmp_path / "champion_model.json") as f:
+            assert json.load(f) == {"mse": 0.01, "metric_kind": "mse"}
+
+    def test_champion_replaced_when_metric_kinds_differ(self, model_trainer, sample_training_data, tmp_path):
+        """Test that a champion scored on another metric kind, e.g. a legacy mse-only record, is replaced."""
+        import json
+
+        model_trainer.train(sample_training_data)
+        with open(tmp_path / "champion_model.json", "w") as f:
+            json.dump({"mse": 5.0}, f)
+
+        assert model_trainer.update_champion_if_better(str(tmp_path), {"mse": 0.01, "cv_mse": 1e-4})
+        assert model_trainer.update_champion_if_better(
+            str(tmp_path), {"mse": 0.01, "cv_mse": 0.5, "cv_method": "time"}
+        )
+        with open(tmp_path / "champion_model.json") as f:
+            assert json.load(f)["metric_kind"] == "cv_mse/time"
+        assert not model_trainer.update_champion_if_better(
+            str(tmp_path), {"mse": 0.01, "cv_mse": 0.6, "cv_method": "time"}
+        )
+
+    def test_every_training_path_reports_same_metric_kind(self, processed_training_data, tmp_path):
+        """Test that full, sweep, incremental and sharded training all emit k-fold cv_mse."""
+        from sklearn.linear_model import LinearRegression
+        from src.train import metric_kind
+
+        features = ["popularity", "vote_count"]
+        path = tmp_path / "processed.csv"
+        processed_training_data.to_csv(path, index=False)
+        trainer = ModelTrainer(target_column="vote_average", feature_columns=features, cv_folds=3)
+
+        results = {
+            "full": trainer.train(processed_training_data),
+            "sweep": trainer.train_sweep(processed_training_data, candidates={"linear": LinearRegression()},
+                                         max_workers=1),
+            "sharded": trainer.train_sharded([path], max_workers=1),
+        }
+        for i in range(2):
+            snapshot = processed_training_data.iloc[i * 600:(i + 1) * 600]
+            results["incremental"] = trainer.train_incremental(snapshot, f"2024010{i + 1}", str(tmp_path / "stats"))
+
+        assert {metric_kind(metrics) for metrics in results.values()} == {"cv_mse/kfold"}
+        # the same data and model give comparable out-of-sample errors on every path
+        cv = [metrics["cv_mse"] for metrics in results.values()]
+        assert max(cv) / min(cv) < 1.5
+
+    def test_sharded_cross_validation_matches_refits(self, processed_training_data):
+        """Test that fold statistics give the same out-of-fold MSE as explicit refits."""
+        from sklearn.linear_model import LinearRegression
+        from src.suffstats import SufficientStats
+        from src.validation import cross_validate_stats
+
+        features = ["popularity", "vote_count"]
+        folds = np.arange(len(processed_training_data)) % 3
+        fold_stats = [
+            SufficientStats.from_frame(processed_training_data[folds == k], "vote_average", features)
+            for k in range(3)
+        ]
+        result = cross_validate_stats(fold_stats)
+
+        for k in range(3):
+            train, test = processed_training_data[folds != k], processed_training_data[folds == k]
+            model = LinearRegression().fit(train[features], train["vote_average"])
+            mse = ((model.predict(test[features]) - test["vote_average"]) ** 2).mean()
+            assert result["fold_mse"][k] == pytest.approx(mse)
+            assert result["fold_r2"][k] == pytest.approx(model.score(test[features], test["vote_average"]))